@@ -0,0 +1,260 @@
+"""
+Motor analítico em processo (DuckDB) para as views e consultas da pasta sql/.
+
+Executa sql/views_customer_behavior.sql, sql/materialized_net_sales.sql (tabela
+valor_liquido_vendas), sql/sales_performance.sql, sql/customer_behavior.sql e
+sql/returns_analysis.sql sem um servidor MySQL e sem etapa de ingestão: as seis tabelas são
+expostas ao DuckDB diretamente a partir do cache Arrow mapeado em memória (dataset_cache.py)
+ou do dataset Parquet gerado pelo data_generation.py (columnar_output.py).
+
+Cada consulta dos arquivos é identificada pelo comentário que a precede (ex.: "-- Top 10
+clientes por valor gasto" -> top_10_clientes_por_valor_gasto). As funções de data do MySQL
+usadas nas consultas (YEAR, MONTH) existem no DuckDB com a mesma semântica; a tradução de
+dialeto (traduzir_sql_mysql) cobre o que difere, como identificadores entre crases.
+
+Uso:
+    python scripts/analytics_engine.py --listar
+    python scripts/analytics_engine.py --consulta top_10_clientes_por_valor_gasto
+    python scripts/analytics_engine.py --fonte parquet  # executa todas as consultas
+    python scripts/analytics_engine.py --esquema sql/create_schema_compact.sql
+
+    from analytics_engine import MotorAnalitico
+
+    with MotorAnalitico() as motor:
+        df = motor.executar("desempenho_de_venda_por_canal_de_venda")
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+import unicodedata
+import duckdb
+from csv_reader import (
+    CAMINHO_ESQUEMA_SQL,
+    DIRETORIO_RAIZ,
+    adaptar_tipo_chave,
+    ler_esquema_sql,
+)
+from dataset_cache import DIRETORIO_CACHE, carregar_dados
+
+# Configurações Globais e Constantes
+DIRETORIO_SQL = os.path.join(DIRETORIO_RAIZ, "sql")
+DIRETORIO_PARQUET = os.path.join(DIRETORIO_RAIZ, "data", "parquet")
+ARQUIVOS_VIEWS = ["views_customer_behavior.sql", "materialized_net_sales.sql"]
+ARQUIVOS_CONSULTAS = [
+    "sales_performance.sql",
+    "customer_behavior.sql",
+    "returns_analysis.sql",
+]
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+_PADRAO_COMENTARIO = re.compile(r"^\s*--\s*(.+?)\s*$", re.MULTILINE)
+
+
+def _identificador(titulo):
+    """Converte o título de uma consulta em identificador (sem acentos, minúsculo, com _)."""
+    sem_acentos = (
+        unicodedata.normalize("NFKD", titulo).encode("ascii", "ignore").decode()
+    )
+    return re.sub(r"[^a-z0-9]+", "_", sem_acentos.lower()).strip("_")
+
+
+def traduzir_sql_mysql(sql):
+    """
+    Adapta um comando escrito para o MySQL ao dialeto do DuckDB. YEAR, MONTH, COALESCE,
+    CASE e LIMIT são compatíveis; identificadores entre crases passam a usar aspas duplas.
+    """
+    return re.sub(r"`([^`]*)`", r'"\1"', sql)
+
+
+def ler_comandos_sql(caminho_arquivo):
+    """
+    Separa um arquivo .sql em comandos, cada um identificado pelo primeiro comentário
+    que contém (o título da consulta).
+
+    Returns:
+        list: Tuplas (identificador, título, comando SQL).
+    """
+    with open(caminho_arquivo, "r", encoding="utf-8") as arquivo:
+        conteudo = arquivo.read()
+
+    comandos = []
+    for comando in conteudo.split(";"):
+        if not _PADRAO_COMENTARIO.sub("", comando).strip():
+            continue
+        comentario = _PADRAO_COMENTARIO.search(comando)
+        titulo = (
+            comentario.group(1)
+            if comentario
+            else f"{os.path.basename(caminho_arquivo)} #{len(comandos) + 1}"
+        )
+        comandos.append((_identificador(titulo), titulo, comando.strip()))
+    return comandos
+
+
+class MotorAnalitico:
+    """
+    Conexão DuckDB em memória com as seis tabelas, as views de sql/ e as consultas
+    nomeadas prontas para execução.
+
+    Args:
+        fonte (str): "csv" (tabelas lidas pelo cache Arrow de dataset_cache.py) ou
+            "parquet" (dataset Parquet de columnar_output.py, lido sob demanda).
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV, na fonte "csv".
+            Padrão: config/ingestion.json.
+        diretorio_parquet (str): Pasta do dataset Parquet, na fonte "parquet".
+        diretorio_cache (str): Pasta do cache Arrow, na fonte "csv".
+        diretorio_sql (str): Pasta com os arquivos de views e consultas.
+        caminho_esquema (str): DDL das tabelas (sql/create_schema_compact.sql para os
+            dados gerados no modo compacto).
+    """
+
+    def __init__(
+        self,
+        fonte="csv",
+        tabelas=None,
+        diretorio_parquet=DIRETORIO_PARQUET,
+        diretorio_cache=DIRETORIO_CACHE,
+        diretorio_sql=DIRETORIO_SQL,
+        caminho_esquema=CAMINHO_ESQUEMA_SQL,
+    ):
+        if fonte not in ("csv", "parquet"):
+            raise ValueError(f"Fonte '{fonte}' não suportada. Use 'csv' ou 'parquet'.")
+
+        self.conexao = duckdb.connect()
+        self._tabelas_arrow = {}
+        esquema = ler_esquema_sql(caminho_esquema)
+        if fonte == "csv":
+            self._tabelas_arrow = carregar_dados(
+                tabelas=tabelas,
+                esquema=esquema,
+                diretorio_cache=diretorio_cache,
+                saida="arrow",
+            )
+            for nome, tabela_arrow in self._tabelas_arrow.items():
+                self.conexao.register(nome, tabela_arrow)
+        else:
+            for nome, definicao in esquema.items():
+                padrao = os.path.join(diretorio_parquet, nome, "**", "*.parquet")
+                colunas = ", ".join(f'"{coluna}"' for coluna in definicao["colunas"])
+                self.conexao.execute(
+                    f'CREATE VIEW "{nome}" AS SELECT {colunas} '
+                    f"FROM read_parquet('{padrao}', hive_partitioning = true)"
+                )
+
+        for arquivo in ARQUIVOS_VIEWS:
+            for _, _, comando in ler_comandos_sql(os.path.join(diretorio_sql, arquivo)):
+                self.conexao.execute(
+                    traduzir_sql_mysql(adaptar_tipo_chave(comando, esquema))
+                )
+
+        self.consultas = {}
+        for arquivo in ARQUIVOS_CONSULTAS:
+            for identificador, titulo, comando in ler_comandos_sql(
+                os.path.join(diretorio_sql, arquivo)
+            ):
+                if identificador in self.consultas:
+                    identificador = f"{os.path.splitext(arquivo)[0]}.{identificador}"
+                self.consultas[identificador] = {
+                    "titulo": titulo,
+                    "arquivo": arquivo,
+                    "sql": traduzir_sql_mysql(comando),
+                }
+
+    def listar_consultas(self):
+        """Retorna (identificador, arquivo, título) de cada consulta disponível."""
+        return [
+            (identificador, consulta["arquivo"], consulta["titulo"])
+            for identificador, consulta in self.consultas.items()
+        ]
+
+    def executar_sql(self, sql):
+        """Executa um comando SQL (dialeto MySQL do projeto) e retorna um DataFrame."""
+        return self.conexao.execute(traduzir_sql_mysql(sql)).df()
+
+    def executar(self, consulta):
+        """
+        Executa uma consulta nomeada de sql/.
+
+        Args:
+            consulta (str): Identificador (ver listar_consultas) ou título da consulta.
+
+        Returns:
+            pd.DataFrame: Resultado da consulta.
+        """
+        if consulta not in self.consultas:
+            encontrados = [
+                identificador
+                for identificador, dados in self.consultas.items()
+                if dados["titulo"] == consulta
+            ]
+            if not encontrados:
+                raise KeyError(
+                    f"Consulta '{consulta}' não encontrada. Disponíveis: {', '.join(self.consultas)}."
+                )
+            consulta = encontrados[0]
+        return self.conexao.execute(self.consultas[consulta]["sql"]).df()
+
+    def executar_todas(self):
+        """Executa todas as consultas nomeadas. Retorna identificador -> DataFrame."""
+        return {
+            identificador: self.executar(identificador)
+            for identificador in self.consultas
+        }
+
+    def fechar(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Executa as views e consultas de sql/ em um DuckDB em memória."
+    )
+    parser.add_argument("--fonte", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--esquema", default=CAMINHO_ESQUEMA_SQL)
+    parser.add_argument(
+        "--consulta",
+        action="append",
+        help="Consulta a executar (identificador ou título). Padrão: todas.",
+    )
+    parser.add_argument(
+        "--listar", action="store_true", help="Lista as consultas disponíveis."
+    )
+    return parser.parse_args()
+
+
+# Fluxo Principal de Análise
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+
+    inicio = time.perf_counter()
+    motor = MotorAnalitico(fonte=argumentos.fonte, caminho_esquema=argumentos.esquema)
+    logging.info(
+        f"Motor analítico pronto em {time.perf_counter() - inicio:.2f}s ({len(motor.consultas)} consultas, fonte '{argumentos.fonte}')."
+    )
+
+    if argumentos.listar:
+        for identificador, arquivo, titulo in motor.listar_consultas():
+            print(f"{identificador}  [{arquivo}]  {titulo}")
+        motor.fechar()
+        exit()
+
+    for consulta in argumentos.consulta or list(motor.consultas):
+        inicio = time.perf_counter()
+        resultado = motor.executar(consulta)
+        logging.info(
+            f"Consulta {consulta}: {len(resultado)} linhas em {time.perf_counter() - inicio:.3f}s."
+        )
+        print(resultado.head(20).to_string(index=False), end="\n\n")
+    motor.fechar()
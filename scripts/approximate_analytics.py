@@ -0,0 +1,852 @@
+"""
+Consultas aproximadas sobre sketches combináveis, para painéis exploratórios que respondem
+em milissegundos sem varrer as tabelas.
+
+Os sketches são construídos uma vez (a partir do valor líquido de sales_insights.py) e
+mantidos por partição mês × canal_venda × categoria × regiao, considerando só as vendas
+válidas ('concluída' ou 'devolvida parcialmente', como num_vendas_validas de
+sql/sales_performance.sql):
+- vendas_distintas e clientes_distintos: HyperLogLog (COUNT(DISTINCT id_venda) e
+  COUNT(DISTINCT id_cliente));
+- valor_categoria: quantis do valor bruto de cada venda em uma categoria (soma de
+  preco_unitario dos seus itens da categoria);
+- ticket_liquido e valor_pedido: quantis do valor líquido e do valor bruto de cada venda.
+  Uma venda pode ter itens de várias categorias, então estes ficam nas partições
+  mês × canal_venda × regiao (cada venda em uma única partição) e só respondem a consultas
+  que não agrupam nem filtram por categoria.
+
+Qualquer roll-up (agrupar por um subconjunto das dimensões, com filtros) combina os sketches
+das partições selecionadas, e o resultado é idêntico ao do sketch construído diretamente
+sobre a união. Limites de erro:
+- HyperLogLog com 2**PRECISAO_HLL registradores (m) por partição, estimador de Ertl (2017),
+  sem viés em toda a faixa de cardinalidades: erro relativo padrão de 1.04 / sqrt(m)
+  (1,6% com m = 4096; ~95% das estimativas a menos de 3,3%). Em contagens pequenas (dezenas)
+  o erro é de uma ou duas unidades, das colisões de registradores.
+- Quantis por baldes logarítmicos (DDSketch, no lugar de t-digest/KLL): cada quantil
+  devolvido está a no máximo PRECISAO_QUANTIS (1%) de erro relativo do quantil exato
+  (o valor na posição floor(q * (n - 1)) dos valores ordenados), para qualquer
+  distribuição. A combinação soma as contagens dos baldes, sem perda.
+
+Uso:
+    python scripts/approximate_analytics.py --construir  # a partir dos CSVs de config/ingestion.json
+    python scripts/approximate_analytics.py --agrupar-por mes canal_venda
+    python scripts/approximate_analytics.py --agrupar-por categoria --filtro regiao=Sul
+    python scripts/approximate_analytics.py --verificar  # compara com os valores exatos
+
+    from approximate_analytics import SketchesVendas
+
+    sketches = SketchesVendas.carregar()
+    df = sketches.consultar(["mes"], filtros={"canal_venda": "app"})
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from csv_reader import CAMINHO_ESQUEMA_SQL, DIRETORIO_RAIZ
+from dataset_cache import DIRETORIO_CACHE
+from sales_insights import STATUS_VENDAS_VALIDAS, carregar_insights
+
+# Configurações Globais e Constantes
+DIRETORIO_SKETCHES = os.path.join(DIRETORIO_RAIZ, "data", "sketches")
+VERSAO_FORMATO = 1
+PRECISAO_HLL = 12  # log2 do número de registradores de cada HyperLogLog
+PRECISAO_QUANTIS = 0.01  # Erro relativo máximo dos quantis
+VALOR_MINIMO_QUANTIS = 0.01  # Valores menores (zero) ficam em um balde próprio
+QUANTIS_PADRAO = (0.5, 0.9, 0.99)
+DIMENSOES = ["mes", "canal_venda", "categoria", "regiao"]
+DIMENSOES_VENDA = ["mes", "canal_venda", "regiao"]  # Partições sem a categoria
+SKETCHES_HLL = {"vendas_distintas": "id_venda", "clientes_distintos": "id_cliente"}
+SKETCHES_QUANTIS_CATEGORIA = ["valor_categoria"]
+SKETCHES_QUANTIS_VENDA = ["ticket_liquido", "valor_pedido"]
+DESVIOS_VERIFICACAO_HLL = 4  # Erro aceito na verificação, em erros padrão
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _hashes_64(valores):
+    """Hash de 64 bits de cada valor (texto ou inteiro, esquema padrão ou compacto)."""
+    return pd.util.hash_pandas_object(pd.Series(valores), index=False).to_numpy()
+
+
+def _zeros_a_esquerda(valores):
+    """Número de bits zero à esquerda de cada uint64 (64 para o zero), por busca binária."""
+    valores = valores.copy()
+    zeros = np.zeros(len(valores), dtype=np.int64)
+    for bits in (32, 16, 8, 4, 2, 1):
+        deslocar = valores < np.uint64(1) << np.uint64(64 - bits)
+        zeros[deslocar] += bits
+        valores[deslocar] <<= np.uint64(bits)
+    zeros[valores == 0] += 1
+    return zeros
+
+
+def _reduzir_por_grupo(matriz, grupos, n_grupos, funcao):
+    """
+    Reduz as linhas de matriz de cada grupo com funcao (np.maximum ou np.add). As linhas
+    são ordenadas por grupo e cada fatia contígua é reduzida de uma vez (reduceat ao longo
+    das linhas é bem mais lento). Linhas com grupo -1 são descartadas.
+    """
+    resultado = np.zeros((n_grupos, matriz.shape[1]), dtype=matriz.dtype)
+    selecionadas = np.flatnonzero(grupos >= 0)
+    if not len(selecionadas):
+        return resultado
+    ordem = selecionadas[np.argsort(grupos[selecionadas], kind="stable")]
+    grupos_ordenados = grupos[ordem]
+    limites = np.flatnonzero(
+        np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1], True]
+    )
+    linhas = matriz[ordem]
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        resultado[grupos_ordenados[inicio]] = funcao.reduce(linhas[inicio:fim], axis=0)
+    return resultado
+
+
+def _sigma(x):
+    """Função sigma do estimador de Ertl: x + soma de x**(2**k) * 2**(k-1), k >= 1."""
+    resultado = x.copy()
+    potencia = x.copy()
+    peso = 1.0
+    for _ in range(64):
+        potencia = potencia * potencia
+        resultado += potencia * peso
+        peso += peso
+    resultado[x >= 1] = np.inf
+    return resultado
+
+
+def _tau(x):
+    """Função tau do estimador de Ertl: (1 - x - soma de (1 - x**(2**-k))**2 * 2**-k) / 3."""
+    resultado = 1 - x
+    raiz = x.copy()
+    peso = 1.0
+    for _ in range(64):
+        raiz = np.sqrt(raiz)
+        peso *= 0.5
+        resultado -= (1 - raiz) ** 2 * peso
+    resultado[(x <= 0) | (x >= 1)] = 0.0
+    return resultado / 3
+
+
+class SketchesHLL:
+    """
+    Um HyperLogLog por partição, como linhas de uma matriz de registradores
+    (partições × 2**precisao). Os primeiros bits do hash escolhem o registrador, que guarda
+    o maior posto (zeros à esquerda + 1) dos bits restantes. A união de partições é o
+    máximo dos registradores, então combinar não acrescenta erro.
+
+    Args:
+        registros (np.ndarray): Matriz uint8 de registradores.
+    """
+
+    def __init__(self, registros):
+        self.registros = registros
+        self.precisao = int(registros.shape[1]).bit_length() - 1
+
+    @classmethod
+    def construir(cls, particoes, hashes, n_particoes, precisao=PRECISAO_HLL):
+        """
+        Constrói os sketches a partir do hash de 64 bits de cada valor.
+
+        Args:
+            particoes (np.ndarray): Partição de cada valor.
+            hashes (np.ndarray): Hash uint64 de cada valor (ver _hashes_64).
+            n_particoes (int): Número de partições.
+            precisao (int): log2 do número de registradores.
+
+        Returns:
+            SketchesHLL: Um sketch por partição.
+        """
+        bits_posto = 64 - precisao
+        indices = (hashes >> np.uint64(bits_posto)).astype(np.intp)
+        postos = np.minimum(
+            _zeros_a_esquerda(hashes << np.uint64(precisao)) + 1, bits_posto + 1
+        ).astype(np.uint8)
+        registros = np.zeros((n_particoes, 1 << precisao), dtype=np.uint8)
+        np.maximum.at(registros, (particoes, indices), postos)
+        return cls(registros)
+
+    def combinar(self, grupos, n_grupos):
+        """Um sketch por grupo, união das partições de cada grupo (grupo -1: ignorada)."""
+        return SketchesHLL(
+            _reduzir_por_grupo(self.registros, grupos, n_grupos, np.maximum)
+        )
+
+    def estimar(self):
+        """
+        Cardinalidade estimada de cada sketch (estimador aprimorado de Ertl, a partir do
+        histograma dos registradores).
+
+        Returns:
+            np.ndarray: Uma estimativa (float) por sketch.
+        """
+        n_sketches, m = self.registros.shape
+        bits_posto = 64 - self.precisao
+        n_valores = bits_posto + 2
+        deslocamentos = (np.arange(n_sketches, dtype=np.int64) * n_valores)[:, None]
+        histograma = np.bincount(
+            (self.registros + deslocamentos).ravel(),
+            minlength=n_sketches * n_valores,
+        ).reshape(n_sketches, n_valores)
+
+        z = m * _tau(1 - histograma[:, bits_posto + 1] / m)
+        for posto in range(bits_posto, 0, -1):
+            z = 0.5 * (z + histograma[:, posto])
+        z = z + m * _sigma(histograma[:, 0] / m)
+        return m * m / (2 * np.log(2)) / z
+
+    def erro_padrao(self):
+        """Erro relativo padrão das estimativas (1.04 / sqrt(m))."""
+        return 1.04 / np.sqrt(self.registros.shape[1])
+
+
+class SketchesQuantis:
+    """
+    Um sketch de quantis com erro relativo garantido por partição (DDSketch), como linhas
+    de uma matriz de contagens por balde. O valor x > 0 cai no balde ceil(log_gama(x)),
+    com gama = (1 + alfa) / (1 - alfa), e cada balde é representado pelo valor a erro
+    relativo alfa de todos os seus valores. A coluna 0 conta os valores menores que
+    VALOR_MINIMO_QUANTIS. Combinar soma as contagens, sem perda.
+
+    Args:
+        contagens (np.ndarray): Matriz int64 (partições × (1 + baldes)).
+        indice_minimo (int): Índice logarítmico do primeiro balde (coluna 1).
+        precisao_relativa (float): Erro relativo máximo (alfa).
+    """
+
+    def __init__(self, contagens, indice_minimo, precisao_relativa):
+        self.contagens = contagens
+        self.indice_minimo = indice_minimo
+        self.precisao_relativa = precisao_relativa
+        self.gama = (1 + precisao_relativa) / (1 - precisao_relativa)
+
+    @classmethod
+    def construir(
+        cls, particoes, valores, n_particoes, precisao_relativa=PRECISAO_QUANTIS
+    ):
+        """
+        Constrói os sketches. Os baldes cobrem apenas a faixa de valores observada.
+
+        Args:
+            particoes (np.ndarray): Partição de cada valor.
+            valores (np.ndarray): Valores não negativos.
+            n_particoes (int): Número de partições.
+            precisao_relativa (float): Erro relativo máximo (alfa).
+
+        Returns:
+            SketchesQuantis: Um sketch por partição.
+        """
+        gama = (1 + precisao_relativa) / (1 - precisao_relativa)
+        positivos = valores >= VALOR_MINIMO_QUANTIS
+        indices = np.ceil(np.log(valores[positivos]) / np.log(gama)).astype(np.int64)
+        indice_minimo = int(indices.min()) if len(indices) else 0
+        n_colunas = (int(indices.max()) - indice_minimo + 2) if len(indices) else 1
+        colunas = np.zeros(len(valores), dtype=np.int64)
+        colunas[positivos] = indices - indice_minimo + 1
+        contagens = np.bincount(
+            particoes * n_colunas + colunas, minlength=n_particoes * n_colunas
+        ).reshape(n_particoes, n_colunas)
+        return cls(contagens, indice_minimo, precisao_relativa)
+
+    def combinar(self, grupos, n_grupos):
+        """Um sketch por grupo, soma das partições de cada grupo (grupo -1: ignorada)."""
+        return SketchesQuantis(
+            _reduzir_por_grupo(self.contagens, grupos, n_grupos, np.add),
+            self.indice_minimo,
+            self.precisao_relativa,
+        )
+
+    def quantis(self, quantis):
+        """
+        Quantis aproximados de cada sketch: para cada q, o valor na posição
+        floor(q * (n - 1)) dos valores ordenados, com erro relativo até alfa.
+
+        Args:
+            quantis (iterable): Quantis entre 0 e 1.
+
+        Returns:
+            np.ndarray: Matriz (sketches × quantis), NaN para sketches vazios.
+        """
+        acumuladas = np.cumsum(self.contagens, axis=1)
+        totais = acumuladas[:, -1]
+        centros = np.r_[
+            0.0,
+            2
+            * self.gama ** (self.indice_minimo + np.arange(self.contagens.shape[1] - 1))
+            / (self.gama + 1),
+        ]
+        resultado = np.full((len(self.contagens), len(quantis)), np.nan)
+        for j, q in enumerate(quantis):
+            posicoes = np.floor(q * (totais - 1))
+            colunas = np.argmax(acumuladas > posicoes[:, None], axis=1)
+            resultado[:, j] = np.where(totais > 0, centros[colunas], np.nan)
+        return resultado
+
+
+def _rotulo_quantil(metrica, q):
+    """Nome da coluna de um quantil (ex.: ticket_liquido_p90, valor_pedido_p99.9)."""
+    return f"{metrica}_p{q * 100:g}"
+
+
+def bases_dos_sketches(insights):
+    """
+    Monta as linhas de que os sketches são construídos: uma por venda válida (com a
+    região do cliente) e uma por par venda válida × categoria dos seus itens. Vendas de
+    clientes não cadastrados e itens de produtos desconhecidos ficam de fora (JOIN).
+
+    Args:
+        insights (InsightsVendas): Insights das seis tabelas (ver sales_insights.py).
+
+    Returns:
+        tuple: (por_venda, por_categoria), DataFrames com as dimensões (category),
+            id_venda, id_cliente e os valores de cada sketch de quantis.
+    """
+    tabelas = insights.tabelas
+    valor_liquido = insights.valor_liquido_vendas
+    clientes = tabelas["clientes"]
+    pos_cliente = pd.Index(clientes["id_cliente"]).get_indexer(
+        valor_liquido["id_cliente"]
+    )
+    validas = valor_liquido["status_venda"].isin(STATUS_VENDAS_VALIDAS).to_numpy() & (
+        pos_cliente >= 0
+    )
+    pos_validas = np.flatnonzero(validas)
+
+    datas = valor_liquido["data_venda"].dt
+    ano_mes = (datas.year * 100 + datas.month).to_numpy()[pos_validas]
+    codigos_mes, meses = pd.factorize(ano_mes, sort=True)
+    por_venda = pd.DataFrame(
+        {
+            "mes": pd.Categorical.from_codes(
+                codigos_mes, [f"{c // 100}-{c % 100:02d}" for c in meses]
+            ),
+            "canal_venda": pd.Categorical(
+                np.asarray(valor_liquido["canal_venda"].array.take(pos_validas), str)
+            ),
+            "regiao": pd.Categorical(
+                np.asarray(clientes["regiao"].array.take(pos_cliente[pos_validas]), str)
+            ),
+            "id_venda": valor_liquido["id_venda"].array.take(pos_validas),
+            "id_cliente": valor_liquido["id_cliente"].array.take(pos_validas),
+            "ticket_liquido": valor_liquido["total_venda_liquida"].to_numpy()[
+                pos_validas
+            ],
+            "valor_pedido": valor_liquido["total_venda_bruta"].to_numpy()[pos_validas],
+        }
+    )
+
+    # Itens das vendas válidas, somados por venda e categoria
+    itens_venda = tabelas["itens_venda"]
+    produtos = tabelas["produtos"]
+    linha_venda = np.full(len(valor_liquido), -1, dtype=np.int64)
+    linha_venda[pos_validas] = np.arange(len(pos_validas))
+    pos_venda = pd.Index(valor_liquido["id_venda"]).get_indexer(itens_venda["id_venda"])
+    pos_produto = pd.Index(produtos["id_produto"]).get_indexer(
+        itens_venda["id_produto"]
+    )
+    codigos_categoria, categorias = pd.factorize(
+        np.asarray(produtos["categoria"], str), sort=True
+    )
+    vinculados = (pos_venda >= 0) & (pos_produto >= 0)
+    vinculados[vinculados] = linha_venda[pos_venda[vinculados]] >= 0
+    linhas = linha_venda[pos_venda[vinculados]]
+    categorias_itens = codigos_categoria[pos_produto[vinculados]]
+    pares, posicao_par = np.unique(
+        linhas * len(categorias) + categorias_itens, return_inverse=True
+    )
+    valor_categoria = np.bincount(
+        posicao_par,
+        weights=itens_venda["preco_unitario"].to_numpy(dtype=np.float64)[vinculados],
+        minlength=len(pares),
+    )
+    linhas_pares = pares // len(categorias)
+    por_categoria = por_venda[
+        ["mes", "canal_venda", "regiao", "id_venda", "id_cliente"]
+    ]
+    por_categoria = por_categoria.iloc[linhas_pares].reset_index(drop=True)
+    por_categoria.insert(
+        2,
+        "categoria",
+        pd.Categorical.from_codes(pares % len(categorias), categorias),
+    )
+    por_categoria["valor_categoria"] = valor_categoria
+    return por_venda, por_categoria
+
+
+def _remapear_grupos(grupos, chaves, todas_chaves):
+    """Troca o grupo de cada partição pela posição da sua chave em todas_chaves."""
+    remapeados = np.full(len(grupos), -1, dtype=np.int64)
+    selecionadas = grupos >= 0
+    remapeados[selecionadas] = np.searchsorted(todas_chaves, chaves)[
+        grupos[selecionadas]
+    ]
+    return remapeados
+
+
+def _particionar(df, dimensoes):
+    """Partição de cada linha e as dimensões de cada partição, em ordem."""
+    agrupado = df.groupby(dimensoes, observed=True, sort=True)
+    particoes = agrupado.ngroup().to_numpy()
+    return particoes, agrupado.size().index.to_frame(index=False)
+
+
+class SketchesVendas:
+    """
+    Sketches de vendas válidas por partição, combinados sob demanda pelas consultas.
+
+    Args:
+        particoes (pd.DataFrame): Dimensões de cada partição mês × canal × categoria × região.
+        particoes_venda (pd.DataFrame): Dimensões de cada partição mês × canal × região.
+        sketches (dict): Nome -> SketchesHLL ou SketchesQuantis (SKETCHES_HLL e
+            SKETCHES_QUANTIS_CATEGORIA sobre particoes, SKETCHES_QUANTIS_VENDA sobre
+            particoes_venda).
+    """
+
+    def __init__(self, particoes, particoes_venda, sketches):
+        self.particoes = particoes
+        self.particoes_venda = particoes_venda
+        self.sketches = sketches
+        # Códigos inteiros das dimensões, em um só conjunto de rótulos para as duas
+        # grades, para que as consultas agrupem com numpy em vez de groupby/merge.
+        self._rotulos = {
+            dimensao: pd.Index(
+                sorted(
+                    set(particoes[dimensao]).union(particoes_venda.get(dimensao, ()))
+                )
+            )
+            for dimensao in DIMENSOES
+        }
+        self._codigos = self._codificar(particoes)
+        self._codigos_venda = self._codificar(particoes_venda)
+
+    def _codificar(self, particoes):
+        """Código de cada dimensão de cada partição, nos rótulos de self._rotulos."""
+        return {
+            dimensao: self._rotulos[dimensao].get_indexer(
+                np.asarray(particoes[dimensao], dtype=object)
+            )
+            for dimensao in particoes.columns
+        }
+
+    @classmethod
+    def construir(
+        cls,
+        por_venda,
+        por_categoria,
+        precisao_hll=PRECISAO_HLL,
+        precisao_quantis=PRECISAO_QUANTIS,
+    ):
+        """
+        Constrói os sketches a partir de bases_dos_sketches().
+
+        Args:
+            por_venda (pd.DataFrame): Uma linha por venda válida.
+            por_categoria (pd.DataFrame): Uma linha por venda válida × categoria.
+            precisao_hll (int): log2 dos registradores de cada HyperLogLog.
+            precisao_quantis (float): Erro relativo máximo dos quantis.
+
+        Returns:
+            SketchesVendas: Sketches de todas as partições.
+        """
+        particoes, df_particoes = _particionar(por_categoria, DIMENSOES)
+        particoes_venda, df_particoes_venda = _particionar(por_venda, DIMENSOES_VENDA)
+        sketches = {}
+        for nome, coluna in SKETCHES_HLL.items():
+            sketches[nome] = SketchesHLL.construir(
+                particoes,
+                _hashes_64(por_categoria[coluna]),
+                len(df_particoes),
+                precisao_hll,
+            )
+        for nome in SKETCHES_QUANTIS_CATEGORIA:
+            sketches[nome] = SketchesQuantis.construir(
+                particoes,
+                por_categoria[nome].to_numpy(),
+                len(df_particoes),
+                precisao_quantis,
+            )
+        for nome in SKETCHES_QUANTIS_VENDA:
+            sketches[nome] = SketchesQuantis.construir(
+                particoes_venda,
+                por_venda[nome].to_numpy(),
+                len(df_particoes_venda),
+                precisao_quantis,
+            )
+        return cls(df_particoes, df_particoes_venda, sketches)
+
+    def _grupos(self, codigos, agrupar_por, filtros):
+        """
+        Grupo de cada partição (-1 se filtrada) e a chave de cada grupo: o índice
+        combinado dos códigos das dimensões de agrupar_por, em ordem.
+        """
+        n_particoes = len(next(iter(codigos.values())))
+        selecionadas = np.ones(n_particoes, dtype=bool)
+        for dimensao, valores in filtros.items():
+            if isinstance(valores, str):
+                valores = [valores]
+            selecionadas &= np.isin(
+                codigos[dimensao], self._rotulos[dimensao].get_indexer(valores)
+            )
+        if agrupar_por:
+            combinados = np.ravel_multi_index(
+                [codigos[dimensao] for dimensao in agrupar_por],
+                [len(self._rotulos[dimensao]) for dimensao in agrupar_por],
+            )
+        else:
+            combinados = np.zeros(n_particoes, dtype=np.int64)
+        chaves, grupos_selecionadas = np.unique(
+            combinados[selecionadas], return_inverse=True
+        )
+        grupos = np.full(n_particoes, -1, dtype=np.int64)
+        grupos[selecionadas] = grupos_selecionadas
+        return grupos, chaves
+
+    def consultar(self, agrupar_por=(), filtros=None, quantis=QUANTIS_PADRAO):
+        """
+        Responde a uma consulta combinando os sketches das partições selecionadas.
+
+        Args:
+            agrupar_por (iterable): Dimensões do resultado (subconjunto de DIMENSOES).
+                Vazio: um total sobre as partições selecionadas.
+            filtros (dict, optional): Dimensão -> valor ou lista de valores aceitos
+                (ex.: {"mes": ["2025-01", "2025-02"], "canal_venda": "app"}).
+            quantis (iterable): Quantis de cada métrica de valor.
+
+        Returns:
+            pd.DataFrame: Uma linha por grupo, com vendas_distintas, clientes_distintos e
+                os quantis de valor_categoria (consultas com categoria) ou de
+                ticket_liquido e valor_pedido (demais consultas).
+
+        Raises:
+            ValueError: Se alguma dimensão não for de DIMENSOES.
+        """
+        agrupar_por = list(agrupar_por)
+        filtros = filtros or {}
+        desconhecidas = sorted(set(agrupar_por).union(filtros) - set(DIMENSOES))
+        if desconhecidas:
+            raise ValueError(
+                f"Dimensões desconhecidas: {', '.join(desconhecidas)}. Use {', '.join(DIMENSOES)}."
+            )
+
+        grupos, chaves = self._grupos(self._codigos, agrupar_por, filtros)
+        if "categoria" in agrupar_por or "categoria" in filtros:
+            grades = {nome: grupos for nome in SKETCHES_QUANTIS_CATEGORIA}
+        else:
+            # Os quantis por venda vêm da outra grade, cujos grupos podem não coincidir
+            grupos_venda, chaves_venda = self._grupos(
+                self._codigos_venda, agrupar_por, filtros
+            )
+            todas = np.union1d(chaves, chaves_venda)
+            grupos = _remapear_grupos(grupos, chaves, todas)
+            grupos_venda = _remapear_grupos(grupos_venda, chaves_venda, todas)
+            chaves = todas
+            grades = {nome: grupos_venda for nome in SKETCHES_QUANTIS_VENDA}
+
+        colunas = {}
+        if agrupar_por:
+            codigos_grupos = np.unravel_index(
+                chaves, [len(self._rotulos[dimensao]) for dimensao in agrupar_por]
+            )
+            for dimensao, codigos in zip(agrupar_por, codigos_grupos):
+                colunas[dimensao] = self._rotulos[dimensao].take(codigos)
+        for nome in SKETCHES_HLL:
+            estimativas = self.sketches[nome].combinar(grupos, len(chaves)).estimar()
+            colunas[nome] = np.rint(estimativas).astype(np.int64)
+        for nome, grupos_grade in grades.items():
+            valores = self.sketches[nome].combinar(grupos_grade, len(chaves))
+            valores = valores.quantis(quantis)
+            for j, q in enumerate(quantis):
+                colunas[_rotulo_quantil(nome, q)] = valores[:, j]
+        return pd.DataFrame(colunas)
+
+    def salvar(self, diretorio=DIRETORIO_SKETCHES):
+        """
+        Grava os sketches em diretorio: as partições em Feather, cada matriz em .npy e o
+        controle em JSON (por último, como em customer_rollup.py).
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        for nome_arquivo, df in (
+            ("particoes.feather", self.particoes),
+            ("particoes_venda.feather", self.particoes_venda),
+        ):
+            caminho = os.path.join(diretorio, nome_arquivo)
+            df.to_feather(f"{caminho}.tmp", compression="uncompressed")
+            os.replace(f"{caminho}.tmp", caminho)
+        indices_minimos = {}
+        for nome, sketch in self.sketches.items():
+            if isinstance(sketch, SketchesHLL):
+                matriz = sketch.registros
+            else:
+                matriz = sketch.contagens
+                indices_minimos[nome] = sketch.indice_minimo
+            caminho = os.path.join(diretorio, f"{nome}.npy")
+            with open(f"{caminho}.tmp", "wb") as arquivo:
+                np.save(arquivo, matriz)
+            os.replace(f"{caminho}.tmp", caminho)
+        caminho_controle = os.path.join(diretorio, "sketches.json")
+        with open(f"{caminho_controle}.tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(
+                {
+                    "versao": VERSAO_FORMATO,
+                    "precisao_hll": self.sketches["vendas_distintas"].precisao,
+                    "precisao_quantis": self.sketches["valor_pedido"].precisao_relativa,
+                    "indices_minimos": indices_minimos,
+                    "particoes": len(self.particoes),
+                    "particoes_venda": len(self.particoes_venda),
+                },
+                arquivo,
+                indent=2,
+            )
+        os.replace(f"{caminho_controle}.tmp", caminho_controle)
+        logging.info(
+            f"Sketches gravados em '{diretorio}': {len(self.particoes)} partições."
+        )
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_SKETCHES):
+        """Carrega os sketches gravados por salvar() (matrizes mapeadas em memória)."""
+        with open(
+            os.path.join(diretorio, "sketches.json"), encoding="utf-8"
+        ) as arquivo:
+            controle = json.load(arquivo)
+        if controle["versao"] != VERSAO_FORMATO:
+            raise ValueError(
+                f"Versão {controle['versao']} dos sketches em '{diretorio}' não suportada."
+            )
+        sketches = {}
+        for nome in SKETCHES_HLL:
+            sketches[nome] = SketchesHLL(
+                np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode="r")
+            )
+        for nome in SKETCHES_QUANTIS_CATEGORIA + SKETCHES_QUANTIS_VENDA:
+            sketches[nome] = SketchesQuantis(
+                np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode="r"),
+                controle["indices_minimos"][nome],
+                controle["precisao_quantis"],
+            )
+        return cls(
+            pd.read_feather(os.path.join(diretorio, "particoes.feather")),
+            pd.read_feather(os.path.join(diretorio, "particoes_venda.feather")),
+            sketches,
+        )
+
+
+def construir_sketches(
+    tabelas=None,
+    caminho_esquema=CAMINHO_ESQUEMA_SQL,
+    diretorio_cache=DIRETORIO_CACHE,
+    precisao_hll=PRECISAO_HLL,
+    precisao_quantis=PRECISAO_QUANTIS,
+):
+    """
+    Constrói os sketches a partir das seis tabelas, lidas pelo cache de dataset_cache.py.
+
+    Args:
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV. Padrão: config/ingestion.json.
+        caminho_esquema (str): DDL das tabelas (ex.: sql/create_schema_compact.sql).
+        diretorio_cache (str): Pasta do cache Arrow.
+        precisao_hll (int): log2 dos registradores de cada HyperLogLog.
+        precisao_quantis (float): Erro relativo máximo dos quantis.
+
+    Returns:
+        SketchesVendas: Sketches de todas as partições.
+    """
+    insights = carregar_insights(
+        tabelas=tabelas,
+        diretorio_cache=diretorio_cache,
+        caminho_esquema=caminho_esquema,
+    )
+    inicio = time.perf_counter()
+    sketches = SketchesVendas.construir(
+        *bases_dos_sketches(insights), precisao_hll, precisao_quantis
+    )
+    logging.info(
+        f"Sketches de {len(sketches.particoes)} partições construídos em {time.perf_counter() - inicio:.2f}s."
+    )
+    return sketches
+
+
+def _agrupar(df, agrupar_por):
+    """groupby pelas dimensões (ou um único grupo, sem dimensões)."""
+    chaves = agrupar_por or np.zeros(len(df), dtype=np.int64)
+    return df.groupby(chaves, observed=True, sort=True)
+
+
+def verificar_com_dados(sketches, insights, agrupamentos, quantis=QUANTIS_PADRAO):
+    """
+    Compara as consultas aproximadas com os valores exatos das mesmas bases: as contagens
+    distintas devem estar a DESVIOS_VERIFICACAO_HLL erros padrão (mais uma unidade, do
+    arredondamento das contagens pequenas) e os quantis dentro da precisão relativa.
+
+    Args:
+        sketches (SketchesVendas): Sketches a verificar.
+        insights (InsightsVendas): Insights das tabelas de que os sketches vieram.
+        agrupamentos (list): Listas de dimensões a consultar.
+        quantis (iterable): Quantis comparados.
+
+    Returns:
+        dict: Agrupamento -> {"erro_hll", "erro_quantis", "segundos_aproximado",
+            "segundos_exato", "divergencia"}; os erros são os maiores erros relativos.
+    """
+    por_venda, por_categoria = bases_dos_sketches(insights)
+    limite_hll = (
+        DESVIOS_VERIFICACAO_HLL * sketches.sketches["vendas_distintas"].erro_padrao()
+    )
+    limite_quantis = sketches.sketches["valor_pedido"].precisao_relativa + 1e-9
+    resultados = {}
+    for agrupar_por in agrupamentos:
+        agrupar_por = list(agrupar_por)
+        inicio = time.perf_counter()
+        aproximado = sketches.consultar(agrupar_por, quantis=quantis)
+        segundos_aproximado = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        if "categoria" in agrupar_por:
+            base, metricas_quantis = por_categoria, SKETCHES_QUANTIS_CATEGORIA
+        else:
+            base, metricas_quantis = por_venda, SKETCHES_QUANTIS_VENDA
+        exato = pd.DataFrame(
+            {
+                nome: _agrupar(por_categoria, agrupar_por)[coluna].nunique()
+                for nome, coluna in SKETCHES_HLL.items()
+            }
+        )
+        agrupado = _agrupar(base, agrupar_por)
+        for nome in metricas_quantis:
+            for q in quantis:
+                exato[_rotulo_quantil(nome, q)] = agrupado[nome].quantile(
+                    q, interpolation="lower"
+                )
+        segundos_exato = time.perf_counter() - inicio
+
+        if agrupar_por:
+            aproximado = aproximado.set_index(agrupar_por).reindex(exato.index)
+        else:
+            aproximado.index = exato.index
+        erros_hll = {
+            nome: np.abs(aproximado[nome] - exato[nome]) for nome in SKETCHES_HLL
+        }
+        erro_hll = max(np.max(erro / exato[nome]) for nome, erro in erros_hll.items())
+        erro_quantis = max(
+            np.max(
+                np.abs(aproximado[coluna] - exato[coluna])
+                / np.maximum(exato[coluna].abs(), VALOR_MINIMO_QUANTIS)
+            )
+            for coluna in exato.columns.difference(list(SKETCHES_HLL))
+        )
+        divergencias = []
+        if any(
+            (erro > limite_hll * exato[nome] + 1).any()
+            for nome, erro in erros_hll.items()
+        ):
+            divergencias.append(f"contagens distintas com erro de {erro_hll:.2%}")
+        if not erro_quantis <= limite_quantis:
+            divergencias.append(f"quantis com erro de {erro_quantis:.2%}")
+        resultados[", ".join(agrupar_por) or "total"] = {
+            "erro_hll": float(erro_hll),
+            "erro_quantis": float(erro_quantis),
+            "segundos_aproximado": segundos_aproximado,
+            "segundos_exato": segundos_exato,
+            "divergencia": "; ".join(divergencias) or None,
+        }
+    return resultados
+
+
+def _ler_filtros(filtros):
+    """Converte os --filtro dimensao=valor em {dimensao: [valores]}."""
+    resultado = {}
+    for filtro in filtros:
+        dimensao, _, valor = filtro.partition("=")
+        resultado.setdefault(dimensao, []).append(valor)
+    return resultado
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Consultas aproximadas (HyperLogLog e quantis) sobre sketches de vendas."
+    )
+    parser.add_argument("--diretorio", default=DIRETORIO_SKETCHES)
+    parser.add_argument("--esquema", default=CAMINHO_ESQUEMA_SQL)
+    parser.add_argument(
+        "--construir",
+        action="store_true",
+        help="Constrói os sketches a partir dos CSVs de config/ingestion.json.",
+    )
+    parser.add_argument("--precisao-hll", type=int, default=PRECISAO_HLL)
+    parser.add_argument("--precisao-quantis", type=float, default=PRECISAO_QUANTIS)
+    parser.add_argument(
+        "--agrupar-por", nargs="*", default=[], choices=DIMENSOES, metavar="DIMENSAO"
+    )
+    parser.add_argument(
+        "--filtro",
+        action="append",
+        default=[],
+        help="dimensao=valor (repetível; valores da mesma dimensão são alternativos).",
+    )
+    parser.add_argument(
+        "--quantis", nargs="+", type=float, default=list(QUANTIS_PADRAO)
+    )
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="Compara roll-ups aproximados com os valores exatos dos CSVs.",
+    )
+    return parser.parse_args()
+
+
+# Fluxo Principal das Consultas Aproximadas
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+    try:
+        if argumentos.construir:
+            sketches = construir_sketches(
+                caminho_esquema=argumentos.esquema,
+                precisao_hll=argumentos.precisao_hll,
+                precisao_quantis=argumentos.precisao_quantis,
+            )
+            sketches.salvar(argumentos.diretorio)
+        else:
+            sketches = SketchesVendas.carregar(argumentos.diretorio)
+    except Exception as e:
+        logging.error(f"Erro ao preparar os sketches: {e}")
+        exit(1)
+
+    if argumentos.verificar:
+        resultados = verificar_com_dados(
+            sketches,
+            carregar_insights(caminho_esquema=argumentos.esquema),
+            [[], ["mes"], ["canal_venda"], ["mes", "canal_venda"], ["categoria"]]
+            + [["regiao", "categoria"], DIMENSOES],
+            argumentos.quantis,
+        )
+        for agrupamento, resultado in resultados.items():
+            logging.info(
+                f"{agrupamento}: erro HLL {resultado['erro_hll']:.2%}, erro quantis {resultado['erro_quantis']:.2%}, "
+                f"aproximado {resultado['segundos_aproximado'] * 1000:.1f}ms, exato {resultado['segundos_exato'] * 1000:.1f}ms"
+                f" - {resultado['divergencia'] or 'ok'}"
+            )
+        if any(resultado["divergencia"] for resultado in resultados.values()):
+            logging.error("Consultas aproximadas fora dos limites de erro.")
+            exit(1)
+        exit()
+
+    inicio = time.perf_counter()
+    try:
+        df_resultado = sketches.consultar(
+            argumentos.agrupar_por,
+            _ler_filtros(argumentos.filtro),
+            argumentos.quantis,
+        )
+    except ValueError as e:
+        logging.error(str(e))
+        exit(1)
+    logging.info(
+        f"Consulta respondida em {(time.perf_counter() - inicio) * 1000:.1f}ms ({len(df_resultado)} linhas)."
+    )
+    print(df_resultado.to_string(index=False))
+    exit()
@@ -0,0 +1,258 @@
+"""
+Saída colunar (Parquet) para os dados gerados pelo script data_generation.py.
+
+Cada uma das seis tabelas é gravada como um dataset Parquet tipado em uma pasta própria
+(ex.: data/parquet/vendas/). As tabelas vendas e devolucoes são particionadas por ano e mês
+da data principal (data_venda / data_devolucao) no layout Hive (ano=2025/mes=3/), o que
+evita a conversão de datas em texto e permite ler apenas as partições de um período.
+
+Principais funcionalidades:
+- Esquemas Arrow de cada tabela, com tipos equivalentes aos de sql/create_schema.sql, e
+  a variante compacta (sql/create_schema_compact.sql): chaves int64 e colunas de domínio
+  codificadas com dicionário (lidas de volta como category no pandas).
+- Gravação de uma tabela (ou de um bloco dela, no modo streaming) em Parquet.
+- Leitura de uma tabela com poda de partições por intervalo de datas.
+"""
+
+import logging
+import os
+import shutil
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Esquemas Arrow das tabelas (tipos equivalentes aos de sql/create_schema.sql)
+ESQUEMAS_TABELAS = {
+    "clientes": pa.schema(
+        [
+            ("id_cliente", pa.string()),
+            ("nome_cliente", pa.string()),
+            ("email", pa.string()),
+            ("idade", pa.int32()),
+            ("regiao", pa.string()),
+            ("data_cadastro", pa.date32()),
+            ("numero_compras", pa.int32()),
+            ("total_gasto", pa.float64()),
+        ]
+    ),
+    "produtos": pa.schema(
+        [
+            ("id_produto", pa.string()),
+            ("nome_produto", pa.string()),
+            ("categoria", pa.string()),
+            ("preco", pa.float64()),
+        ]
+    ),
+    "vendas": pa.schema(
+        [
+            ("id_venda", pa.string()),
+            ("id_cliente", pa.string()),
+            ("data_venda", pa.date32()),
+            ("canal_venda", pa.string()),
+            ("status_venda", pa.string()),
+            ("total_venda", pa.float64()),
+        ]
+    ),
+    "itens_venda": pa.schema(
+        [
+            ("id_item_venda", pa.string()),
+            ("id_venda", pa.string()),
+            ("id_produto", pa.string()),
+            ("quantidade", pa.int32()),
+            ("preco_unitario", pa.float64()),
+        ]
+    ),
+    "devolucoes": pa.schema(
+        [
+            ("id_devolucao", pa.string()),
+            ("id_venda", pa.string()),
+            ("motivo_geral_devolucao", pa.string()),
+            ("data_devolucao", pa.date32()),
+            ("status_devolucao", pa.string()),
+        ]
+    ),
+    "itens_devolucao": pa.schema(
+        [
+            ("id_item_devolucao", pa.string()),
+            ("id_devolucao", pa.string()),
+            ("id_item_venda", pa.string()),
+            ("id_produto", pa.string()),
+            ("quantidade_devolvida", pa.int32()),
+            ("motivo_especifico_item", pa.string()),
+        ]
+    ),
+}
+
+# Colunas de domínio (poucos valores distintos), gravadas com dicionário no modo compacto
+COLUNAS_DOMINIO = {
+    "regiao",
+    "categoria",
+    "canal_venda",
+    "status_venda",
+    "motivo_geral_devolucao",
+    "status_devolucao",
+    "motivo_especifico_item",
+}
+
+
+def _esquema_compacto(esquema):
+    """Variante compacta de um esquema: chaves (id_*) int64 e domínios com dicionário."""
+    campos = []
+    for campo in esquema:
+        if campo.name.startswith("id_"):
+            campo = campo.with_type(pa.int64())
+        elif campo.name in COLUNAS_DOMINIO:
+            campo = campo.with_type(pa.dictionary(pa.int32(), pa.string()))
+        campos.append(campo)
+    return pa.schema(campos)
+
+
+# Esquemas do modo compacto (tipos equivalentes aos de sql/create_schema_compact.sql)
+ESQUEMAS_TABELAS_COMPACTOS = {
+    nome_tabela: _esquema_compacto(esquema)
+    for nome_tabela, esquema in ESQUEMAS_TABELAS.items()
+}
+
+# Tabelas particionadas e a coluna de data que define a partição
+COLUNAS_PARTICAO = {"vendas": "data_venda", "devolucoes": "data_devolucao"}
+ESQUEMA_PARTICAO = pa.schema([("ano", pa.int16()), ("mes", pa.int8())])
+
+
+def limpar_saida_parquet(diretorio_saida):
+    """
+    Remove os datasets Parquet existentes das seis tabelas, já que novos blocos são
+    acrescentados a eles.
+
+    Args:
+        diretorio_saida (str): Pasta raiz dos datasets (ex.: data/parquet).
+    """
+    for nome_tabela in ESQUEMAS_TABELAS:
+        caminho = os.path.join(diretorio_saida, nome_tabela)
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho)
+
+
+def salvar_tabela_parquet(
+    df, diretorio_saida, nome_tabela, identificador_parte="0000", compacto=False
+):
+    """
+    Grava um DataFrame (tabela inteira ou um bloco dela) no dataset Parquet da tabela.
+    Chamadas com identificadores de parte diferentes acrescentam arquivos ao dataset.
+
+    Args:
+        df (pd.DataFrame): Dados da tabela, com as colunas de ESQUEMAS_TABELAS.
+        diretorio_saida (str): Pasta raiz dos datasets (ex.: data/parquet).
+        nome_tabela (str): Nome da tabela (chave de ESQUEMAS_TABELAS).
+        identificador_parte (str): Identificador do bloco, usado no nome dos arquivos.
+        compacto (bool): Grava com ESQUEMAS_TABELAS_COMPACTOS (chaves inteiras).
+    """
+    esquema = (ESQUEMAS_TABELAS_COMPACTOS if compacto else ESQUEMAS_TABELAS)[
+        nome_tabela
+    ]
+    tabela = pa.Table.from_pandas(
+        df[esquema.names], schema=esquema, preserve_index=False
+    )
+    caminho_tabela = os.path.join(diretorio_saida, nome_tabela)
+
+    coluna_particao = COLUNAS_PARTICAO.get(nome_tabela)
+    if coluna_particao is None:
+        os.makedirs(caminho_tabela, exist_ok=True)
+        pq.write_table(
+            tabela, os.path.join(caminho_tabela, f"parte-{identificador_parte}.parquet")
+        )
+        return
+
+    datas = tabela.column(coluna_particao)
+    tabela = tabela.append_column("ano", pc.year(datas).cast(pa.int16())).append_column(
+        "mes", pc.month(datas).cast(pa.int8())
+    )
+    pq.write_to_dataset(
+        tabela,
+        caminho_tabela,
+        partitioning=ds.partitioning(ESQUEMA_PARTICAO, flavor="hive"),
+        basename_template=f"parte-{identificador_parte}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def salvar_tabelas_parquet(tabelas, diretorio_saida, compacto=False):
+    """
+    Grava várias tabelas completas em Parquet, substituindo datasets anteriores.
+
+    Args:
+        tabelas (dict): Nome da tabela -> DataFrame. DataFrames vazios são ignorados.
+        diretorio_saida (str): Pasta raiz dos datasets (ex.: data/parquet).
+        compacto (bool): Grava com ESQUEMAS_TABELAS_COMPACTOS (chaves inteiras).
+    """
+    limpar_saida_parquet(diretorio_saida)
+    for nome_tabela, df in tabelas.items():
+        if not df.empty:
+            salvar_tabela_parquet(df, diretorio_saida, nome_tabela, compacto=compacto)
+    logging.info(f"Dados salvos em Parquet na pasta '{diretorio_saida}'.")
+
+
+def _filtro_particoes(data_inicial, data_final):
+    """
+    Monta a expressão sobre as colunas de partição (ano, mes) que seleciona apenas os
+    meses entre data_inicial e data_final. Usa só comparações, para que o dataset
+    descarte as partições fora do período sem abrir os arquivos.
+    """
+    ano, mes = ds.field("ano"), ds.field("mes")
+    filtro = None
+    if data_inicial is not None:
+        filtro = (ano > data_inicial.year) | (
+            (ano == data_inicial.year) & (mes >= data_inicial.month)
+        )
+    if data_final is not None:
+        filtro_final = (ano < data_final.year) | (
+            (ano == data_final.year) & (mes <= data_final.month)
+        )
+        filtro = filtro_final if filtro is None else filtro & filtro_final
+    return filtro
+
+
+def ler_tabela_parquet(
+    diretorio_dados, nome_tabela, data_inicial=None, data_final=None, colunas=None
+):
+    """
+    Lê uma tabela do dataset Parquet. Para vendas e devolucoes, um intervalo de datas
+    restringe a leitura às partições (ano, mês) do período e filtra as datas exatas;
+    as demais partições não são abertas.
+
+    Args:
+        diretorio_dados (str): Pasta raiz dos datasets (ex.: data/parquet).
+        nome_tabela (str): Nome da tabela (chave de ESQUEMAS_TABELAS).
+        data_inicial (datetime.date, optional): Primeira data do período (inclusive).
+        data_final (datetime.date, optional): Última data do período (inclusive).
+        colunas (list, optional): Colunas a carregar. Padrão: todas as colunas da tabela.
+
+    Returns:
+        pd.DataFrame: Dados da tabela, com datas em datetime64.
+    """
+    coluna_particao = COLUNAS_PARTICAO.get(nome_tabela)
+    if coluna_particao is None and (data_inicial or data_final):
+        raise ValueError(f"A tabela '{nome_tabela}' não é particionada por data.")
+
+    dataset = ds.dataset(
+        os.path.join(diretorio_dados, nome_tabela),
+        format="parquet",
+        partitioning=(
+            ds.partitioning(ESQUEMA_PARTICAO, flavor="hive")
+            if coluna_particao
+            else None
+        ),
+    )
+
+    filtro = None
+    if coluna_particao and (data_inicial or data_final):
+        filtro = _filtro_particoes(data_inicial, data_final)
+        if data_inicial is not None:
+            filtro &= ds.field(coluna_particao) >= data_inicial
+        if data_final is not None:
+            filtro &= ds.field(coluna_particao) <= data_final
+
+    tabela = dataset.to_table(
+        columns=colunas or ESQUEMAS_TABELAS[nome_tabela].names, filter=filtro
+    )
+    return tabela.to_pandas(date_as_object=False)
@@ -0,0 +1,389 @@
+"""
+Leitura tipada dos CSVs do projeto com o motor CSV do pyarrow.
+
+Os tipos de cada coluna vêm de sql/create_schema.sql, de modo que nenhuma coluna passa por
+inferência: UUIDs e textos são lidos como string, inteiros e decimais com tipo explícito e
+datas com o formato fixo dd/mm/aaaa (sem a inferência de pd.to_datetime(dayfirst=True)).
+O BOM gravado pelo utf-8-sig é descartado uma única vez, pelo próprio leitor do Arrow, no
+início do arquivo. Cada bloco é validado enquanto é lido.
+
+Principais funcionalidades:
+- Leitura do esquema (tabelas, tipos, chaves primárias e estrangeiras) de sql/create_schema.sql
+  ou da variante compacta sql/create_schema_compact.sql (chaves bigint e colunas enum).
+- Conversão dos tipos SQL em tipos Arrow. Colunas enum viram colunas com dicionário fixo (os
+  valores do enum, na ordem declarada), lidas como category no pandas.
+- Leitura de um CSV inteiro ou em blocos (streaming), opcionalmente a partir de um byte,
+  de arquivos simples ou compactados (.gz, .zst).
+- Validação durante a leitura: colunas do cabeçalho, conversão de tipos, chave primária
+  não nula, tamanho dos textos char/varchar, valores dos enums e precisão dos decimais.
+"""
+
+import os
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+# Configurações Globais e Constantes
+DIRETORIO_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_ESQUEMA_SQL = os.path.join(DIRETORIO_RAIZ, "sql", "create_schema.sql")
+CAMINHO_ESQUEMA_COMPACTO_SQL = os.path.join(
+    DIRETORIO_RAIZ, "sql", "create_schema_compact.sql"
+)
+TIPO_CHAVE_PADRAO = "char(36)"  # Tipo das chaves em create_schema.sql
+FORMATO_DATA_CSV = "%d/%m/%Y"
+TAMANHO_BLOCO_ARROW = 4 << 20  # Bytes de CSV convertidos pelo Arrow por vez
+
+_PADRAO_CREATE_TABLE = re.compile(r"CREATE TABLE `(\w+)` \((.*?)\n\);", re.DOTALL)
+_PADRAO_COLUNA = re.compile(
+    r"`(\w+)`\s+(\w+(?:\(\d+(?:,\d+)?\)|\((?:'[^']*',?)+\))?)(.*)"
+)
+_PADRAO_CHAVE_ESTRANGEIRA = re.compile(
+    r"ALTER TABLE `(\w+)` ADD FOREIGN KEY \(`(\w+)`\) REFERENCES `(\w+)` \(`(\w+)`\)"
+)
+_PADRAO_TIPO_SQL = re.compile(r"(\w+)(?:\((\d+)(?:,(\d+))?\))?")
+_PADRAO_TIPO_ENUM = re.compile(r"enum\(((?:'[^']*',?)+)\)")
+
+
+def ler_esquema_sql(caminho_esquema=CAMINHO_ESQUEMA_SQL):
+    """
+    Lê as definições de tabelas e chaves estrangeiras de sql/create_schema.sql.
+
+    Args:
+        caminho_esquema (str): Caminho do arquivo DDL.
+
+    Returns:
+        dict: Nome da tabela -> {"colunas": {coluna: tipo SQL}, "chave_primaria": coluna,
+            "chaves_estrangeiras": [(coluna, tabela referenciada, coluna referenciada)]}.
+    """
+    with open(caminho_esquema, "r", encoding="utf-8") as arquivo:
+        ddl = arquivo.read()
+
+    esquema = {}
+    for tabela, corpo in _PADRAO_CREATE_TABLE.findall(ddl):
+        colunas = {}
+        chave_primaria = None
+        for linha in corpo.splitlines():
+            correspondencia = _PADRAO_COLUNA.match(linha.strip().rstrip(","))
+            if not correspondencia:
+                continue
+            coluna, tipo, restricoes = correspondencia.groups()
+            nome_tipo, parenteses, parametros = tipo.partition("(")
+            colunas[coluna] = nome_tipo.lower() + parenteses + parametros
+            if "PRIMARY KEY" in restricoes.upper():
+                chave_primaria = coluna
+        esquema[tabela] = {
+            "colunas": colunas,
+            "chave_primaria": chave_primaria,
+            "chaves_estrangeiras": [],
+        }
+
+    for tabela, coluna, tabela_ref, coluna_ref in _PADRAO_CHAVE_ESTRANGEIRA.findall(
+        ddl
+    ):
+        esquema[tabela]["chaves_estrangeiras"].append((coluna, tabela_ref, coluna_ref))
+    return esquema
+
+
+def valores_enum(tipo_sql):
+    """Valores permitidos de um tipo enum('a','b',...), ou None se o tipo não é enum."""
+    correspondencia = _PADRAO_TIPO_ENUM.fullmatch(tipo_sql)
+    if not correspondencia:
+        return None
+    return re.findall(r"'([^']*)'", correspondencia.group(1))
+
+
+def adaptar_tipo_chave(comando, esquema):
+    """
+    Troca o tipo das chaves (char(36)) de um DDL auxiliar, como sql/materialized_net_sales.sql,
+    pelo tipo de vendas.id_venda no esquema (ex.: bigint no esquema compacto).
+    """
+    tipo_chave = esquema["vendas"]["colunas"]["id_venda"]
+    if tipo_chave == TIPO_CHAVE_PADRAO:
+        return comando
+    return comando.replace(TIPO_CHAVE_PADRAO, tipo_chave)
+
+
+def tipo_arrow(tipo_sql):
+    """
+    Tipo Arrow equivalente a um tipo SQL de create_schema.sql. Decimais são lidos como
+    float64, como no restante do projeto (ver columnar_output.py), e enums como texto
+    com dicionário.
+    """
+    if valores_enum(tipo_sql) is not None:
+        return pa.dictionary(pa.int32(), pa.string())
+    nome = _PADRAO_TIPO_SQL.fullmatch(tipo_sql).group(1)
+    if nome in ("char", "varchar", "text"):
+        return pa.string()
+    if nome in ("integer", "int", "smallint"):
+        return pa.int32()
+    if nome == "bigint":
+        return pa.int64()
+    if nome in ("decimal", "numeric", "float", "double"):
+        return pa.float64()
+    if nome == "date":
+        return pa.date32()
+    raise ValueError(f"Tipo SQL '{tipo_sql}' sem equivalente Arrow.")
+
+
+def esquema_arrow(colunas_tipos):
+    """Esquema Arrow de uma tabela a partir do mapa coluna -> tipo SQL."""
+    return pa.schema(
+        [(coluna, tipo_arrow(tipo)) for coluna, tipo in colunas_tipos.items()]
+    )
+
+
+def ler_cabecalho_csv(caminho_arquivo):
+    """Retorna os nomes das colunas da primeira linha de um CSV do projeto (não compactado)."""
+    with open(caminho_arquivo, "r", encoding="utf-8-sig") as arquivo:
+        return arquivo.readline().rstrip("\r\n").split(";")
+
+
+def _opcoes_arrow(colunas_tipos, nomes_colunas=None):
+    """
+    Opções do leitor CSV do Arrow para uma tabela. Datas são lidas como timestamp com o
+    formato explícito e convertidas para date32 em _tipar_bloco; enums são lidos como texto
+    e codificados em _codificar_enums.
+    """
+    tipos_colunas = {
+        coluna: (
+            pa.timestamp("s")
+            if tipo == "date"
+            else pa.string() if valores_enum(tipo) is not None else tipo_arrow(tipo)
+        )
+        for coluna, tipo in colunas_tipos.items()
+    }
+    return (
+        pv.ReadOptions(column_names=nomes_colunas, block_size=TAMANHO_BLOCO_ARROW),
+        pv.ParseOptions(delimiter=";"),
+        pv.ConvertOptions(
+            column_types=tipos_colunas,
+            timestamp_parsers=[FORMATO_DATA_CSV],
+            strings_can_be_null=False,
+        ),
+    )
+
+
+def _tipar_bloco(tabela_arrow, colunas_tipos):
+    """Converte as colunas de data (lidas como timestamp) para date32."""
+    for coluna, tipo in colunas_tipos.items():
+        if tipo == "date" and coluna in tabela_arrow.column_names:
+            indice = tabela_arrow.schema.get_field_index(coluna)
+            tabela_arrow = tabela_arrow.set_column(
+                indice, coluna, pc.cast(tabela_arrow[coluna], pa.date32())
+            )
+    return tabela_arrow
+
+
+def _codificar_enums(tabela_arrow, colunas_tipos):
+    """
+    Codifica as colunas enum (lidas como texto) com o dicionário fixo dos valores do enum.
+    Todos os blocos têm o mesmo dicionário, o que permite gravá-los no mesmo arquivo Arrow
+    e concatená-los sem recodificar. Valores fora do enum viram nulos.
+    """
+    for coluna, tipo in colunas_tipos.items():
+        valores = valores_enum(tipo)
+        if valores is None or coluna not in tabela_arrow.column_names:
+            continue
+        dicionario = pa.array(valores, pa.string())
+        codificada = pa.chunked_array(
+            [
+                pa.DictionaryArray.from_arrays(
+                    pc.index_in(pedaco, value_set=dicionario), dicionario
+                )
+                for pedaco in tabela_arrow[coluna].chunks
+            ],
+            type=pa.dictionary(pa.int32(), pa.string()),
+        )
+        indice = tabela_arrow.schema.get_field_index(coluna)
+        tabela_arrow = tabela_arrow.set_column(indice, coluna, codificada)
+    return tabela_arrow
+
+
+def _problemas_do_bloco(tabela_arrow, definicao_tabela, primeiro_registro):
+    """
+    Verifica um bloco já tipado contra as restrições de create_schema.sql.
+
+    Returns:
+        list: Descrições dos problemas encontrados (vazia se o bloco é válido).
+    """
+    problemas = []
+
+    def primeira_ocorrencia(mascara, coluna):
+        posicao = pc.index(mascara, True).as_py()
+        return f"registro {primeiro_registro + posicao}: {tabela_arrow[coluna][posicao].as_py()!r}"
+
+    chave_primaria = definicao_tabela.get("chave_primaria")
+    if chave_primaria in tabela_arrow.column_names:
+        chaves = tabela_arrow[chave_primaria]
+        vazias = chaves.null_count
+        if pa.types.is_string(chaves.type):
+            vazias += pc.sum(pc.equal(chaves, "")).as_py() or 0
+        if vazias:
+            problemas.append(
+                f"{chave_primaria}: {vazias} valores vazios na chave primária"
+            )
+
+    for coluna, tipo in definicao_tabela["colunas"].items():
+        if coluna not in tabela_arrow.column_names:
+            continue
+        valores = tabela_arrow[coluna]
+        permitidos = valores_enum(tipo)
+        if permitidos is not None:
+            invalidos = pc.invert(pc.is_in(valores, value_set=pa.array(permitidos)))
+            n_invalidos = pc.sum(invalidos).as_py()
+            if n_invalidos:
+                problemas.append(
+                    f"{coluna}: {n_invalidos} valores fora de {tipo} "
+                    f"({primeira_ocorrencia(invalidos, coluna)})"
+                )
+            continue
+        nome, tamanho, escala = _PADRAO_TIPO_SQL.fullmatch(tipo).groups()
+        if nome in ("char", "varchar") and tamanho:
+            excedentes = pc.greater(pc.utf8_length(valores), int(tamanho))
+            n_excedentes = pc.sum(excedentes).as_py()
+            if n_excedentes:
+                problemas.append(
+                    f"{coluna}: {n_excedentes} textos com mais de {tamanho} caracteres "
+                    f"({primeira_ocorrencia(excedentes, coluna)})"
+                )
+        elif nome in ("decimal", "numeric") and tamanho:
+            limite = 10 ** (int(tamanho) - int(escala or 0))
+            excedentes = pc.greater_equal(pc.abs(valores), limite)
+            n_excedentes = pc.sum(excedentes).as_py()
+            if n_excedentes:
+                problemas.append(
+                    f"{coluna}: {n_excedentes} valores fora de {tipo} "
+                    f"({primeira_ocorrencia(excedentes, coluna)})"
+                )
+    return problemas
+
+
+def _lotes_arrow(leitor, caminho_arquivo):
+    """Lotes do leitor em streaming do Arrow; erros de conversão viram ValueError."""
+    while True:
+        try:
+            yield leitor.read_next_batch()
+        except StopIteration:
+            return
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"{caminho_arquivo}: {e}") from e
+
+
+def _reagrupar_lotes(lotes, linhas_por_bloco):
+    """
+    Reagrupa os lotes do Arrow (de tamanho definido em bytes) em tabelas de exatamente
+    linhas_por_bloco linhas; a última pode ser menor. Sem linhas_por_bloco, entrega cada
+    lote como está.
+    """
+    pendentes = []
+    n_pendentes = 0
+    for lote in lotes:
+        if not linhas_por_bloco:
+            yield pa.Table.from_batches([lote])
+            continue
+        pendentes.append(lote)
+        n_pendentes += lote.num_rows
+        if n_pendentes < linhas_por_bloco:
+            continue
+        acumulado = pa.Table.from_batches(pendentes)
+        inicio = 0
+        while n_pendentes - inicio >= linhas_por_bloco:
+            yield acumulado.slice(inicio, linhas_por_bloco)
+            inicio += linhas_por_bloco
+        pendentes = acumulado.slice(inicio).to_batches()
+        n_pendentes -= inicio
+    if n_pendentes:
+        yield pa.Table.from_batches(pendentes)
+
+
+def ler_csv_tipado_em_blocos(
+    caminho_arquivo,
+    definicao_tabela,
+    linhas_por_bloco=None,
+    a_partir_do_byte=0,
+    validar=True,
+    como_arrow=False,
+):
+    """
+    Lê um CSV do projeto em blocos com o leitor em streaming do Arrow e tipos explícitos.
+
+    Args:
+        caminho_arquivo (str): Caminho do CSV (pode estar compactado em .gz ou .zst).
+        definicao_tabela (dict): Definição da tabela em ler_esquema_sql.
+        linhas_por_bloco (int, optional): Linhas por bloco entregue. Padrão: um bloco por
+            bloco do Arrow (TAMANHO_BLOCO_ARROW bytes de CSV).
+        a_partir_do_byte (int): Posição (início de linha) a partir da qual ler, em arquivos
+            não compactados. O cabeçalho continua vindo da primeira linha.
+        validar (bool): Valida cada bloco (ver _problemas_do_bloco).
+        como_arrow (bool): Entrega pa.Table em vez de pd.DataFrame.
+
+    Yields:
+        pd.DataFrame ou pa.Table: Bloco tipado (datas como datetime64 no pandas).
+
+    Raises:
+        ValueError: Cabeçalho diferente do esquema, valor que não converte para o tipo da
+            coluna ou violação das restrições do esquema.
+    """
+    colunas_tipos = definicao_tabela["colunas"]
+    if a_partir_do_byte:
+        origem = open(caminho_arquivo, "rb")
+        origem.seek(a_partir_do_byte)
+        nomes_colunas = ler_cabecalho_csv(caminho_arquivo)
+    else:
+        origem = caminho_arquivo
+        nomes_colunas = None
+
+    try:
+        try:
+            leitor = pv.open_csv(origem, *_opcoes_arrow(colunas_tipos, nomes_colunas))
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"{caminho_arquivo}: {e}") from e
+        colunas_arquivo = leitor.schema.names
+        if validar and set(colunas_arquivo) != set(colunas_tipos):
+            faltantes = sorted(set(colunas_tipos) - set(colunas_arquivo))
+            extras = sorted(set(colunas_arquivo) - set(colunas_tipos))
+            raise ValueError(
+                f"{caminho_arquivo}: cabeçalho diferente do esquema "
+                f"(faltando: {faltantes or '-'}; não previstas: {extras or '-'})."
+            )
+
+        registros_lidos = 0
+        for bloco in _reagrupar_lotes(
+            _lotes_arrow(leitor, caminho_arquivo), linhas_por_bloco
+        ):
+            bloco = _tipar_bloco(bloco, colunas_tipos)
+            if validar:
+                problemas = _problemas_do_bloco(
+                    bloco, definicao_tabela, registros_lidos + 1
+                )
+                if problemas:
+                    raise ValueError(
+                        f"{caminho_arquivo}: dados fora do esquema:\n- "
+                        + "\n- ".join(problemas)
+                    )
+            bloco = _codificar_enums(bloco, colunas_tipos)
+            registros_lidos += bloco.num_rows
+            yield bloco if como_arrow else bloco.to_pandas(date_as_object=False)
+    finally:
+        if a_partir_do_byte:
+            origem.close()
+
+
+def ler_csv_tipado(caminho_arquivo, definicao_tabela, validar=True, como_arrow=False):
+    """
+    Lê um CSV do projeto inteiro com tipos explícitos (ver ler_csv_tipado_em_blocos).
+
+    Returns:
+        pd.DataFrame ou pa.Table: Tabela tipada, com as colunas na ordem do arquivo.
+    """
+    blocos = list(
+        ler_csv_tipado_em_blocos(
+            caminho_arquivo, definicao_tabela, validar=validar, como_arrow=True
+        )
+    )
+    if blocos:
+        tabela_arrow = pa.concat_tables(blocos)
+    else:
+        tabela_arrow = esquema_arrow(definicao_tabela["colunas"]).empty_table()
+    return tabela_arrow if como_arrow else tabela_arrow.to_pandas(date_as_object=False)
@@ -0,0 +1,905 @@
+"""
+Rollup incremental por cliente: compras válidas, gasto bruto e líquido, primeira e última
+compra válida, AOV e escores RFM, sem varrer o histórico de vendas a cada atualização.
+
+Cada venda contribui para os acumuladores do seu cliente conforme as regras de sql/
+(ver vw_valor_liquido_vendas e sql/customer_behavior.sql):
+- numero_compras e total_gasto: vendas válidas ('concluída' ou 'devolvida parcialmente'),
+  com o total bruto da venda (mesmos campos de clientes.csv);
+- total_liquido_gasto: total da venda menos os itens de devoluções aprovadas ou finalizadas,
+  zero para vendas canceladas (total_liquido_gasto da consulta SQL);
+- aov_liquido: média do valor líquido das vendas válidas;
+- primeira_compra_valida e ultima_compra_valida.
+
+Vendas novas, devoluções aprovadas e mudanças de status são aplicadas como deltas: a
+contribuição anterior da venda é subtraída e a nova somada. Para isso, as vendas que ainda
+podem receber devoluções (JANELA_DEVOLUCAO_DIAS a partir da venda mais recente, o prazo de
+data_generation.py) ficam abertas, com seus itens; as mais antigas são consolidadas e só
+permanecem nos acumuladores do cliente. Devoluções ou mudanças de status de vendas já
+consolidadas são ignoradas com aviso.
+
+Os rankings de clientes por valor líquido e por compras válidas são heaps com remoção
+preguiçosa (entradas desatualizadas são descartadas ao serem retiradas), de modo que o
+top-k custa O(k log n) amortizado. O estado é gravado em arquivos Feather e um JSON de
+controle (DIRETORIO_ROLLUP) e pode ser recarregado para aplicar os próximos deltas.
+
+Uso:
+    python scripts/customer_rollup.py --construir  # a partir dos CSVs de config/ingestion.json
+    python scripts/customer_rollup.py --aplicar data/delta/20250509_20250509
+    python scripts/customer_rollup.py --top 10 --por compras
+    python scripts/customer_rollup.py --rfm
+    python scripts/customer_rollup.py --verificar  # compara com sales_insights.py
+
+    from customer_rollup import RollupClientes
+
+    rollup = RollupClientes.carregar()
+    rollup.aplicar(vendas=df_vendas, itens_venda=df_itens)
+    rollup.top_por_valor(10)
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from csv_reader import CAMINHO_ESQUEMA_SQL, DIRETORIO_RAIZ, ler_esquema_sql
+from dataset_cache import DIRETORIO_CACHE, carregar_dados
+from sales_insights import (
+    N_TOP_CLIENTES,
+    STATUS_DEVOLUCOES_APROVADAS,
+    STATUS_VENDA_CANCELADA,
+    STATUS_VENDAS_VALIDAS,
+    TOLERANCIA_VERIFICACAO,
+)
+
+# Configurações Globais e Constantes
+DIRETORIO_ROLLUP = os.path.join(DIRETORIO_RAIZ, "data", "rollup_clientes")
+JANELA_DEVOLUCAO_DIAS = 30  # Prazo máximo de devolução em data_generation.py
+N_FAIXAS_RFM = 5  # Quintis
+VERSAO_FORMATO = 1
+_SEM_DATA_MINIMA = np.iinfo(np.int64).max  # Dias: "sem compra válida" em primeira
+_SEM_DATA_MAXIMA = np.iinfo(np.int64).min  # Dias: "sem compra válida" em última
+ACUMULADORES = {
+    "numero_compras": np.int64,
+    "total_gasto": np.float64,
+    "total_liquido_gasto": np.float64,
+    "liquido_compras_validas": np.float64,
+    "primeira_compra_valida": np.int64,
+    "ultima_compra_valida": np.int64,
+    "primeira_consolidada": np.int64,
+    "ultima_consolidada": np.int64,
+}
+COLUNAS_VENDAS_ABERTAS = {
+    "pos_cliente": np.int64,
+    "dia": np.int64,
+    "valida": bool,
+    "cancelada": bool,
+    "total_venda": np.float64,
+    "valor_devolvido": np.float64,
+}
+COLUNAS_ITENS_ABERTOS = {
+    "id_venda": object,
+    "dia": np.int64,
+    "preco_unitario": np.float64,
+}
+_VAZIOS = {
+    "primeira_compra_valida": _SEM_DATA_MINIMA,
+    "ultima_compra_valida": _SEM_DATA_MAXIMA,
+    "primeira_consolidada": _SEM_DATA_MINIMA,
+    "ultima_consolidada": _SEM_DATA_MAXIMA,
+}
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _dias(datas):
+    """Datas (datetime64 ou texto ISO) em dias desde 1970-01-01 (int64)."""
+    return (
+        pd.to_datetime(pd.Series(datas))
+        .to_numpy(dtype="datetime64[D]")
+        .astype(np.int64)
+    )
+
+
+def _datas(dias, vazio):
+    """Dias (int64) em datetime64, com NaT no lugar do sentinela vazio."""
+    return pd.to_datetime(
+        np.where(dias == vazio, np.iinfo(np.int64).min, dias).astype("datetime64[D]")
+    )
+
+
+def _contribuicoes(valida, cancelada, total, devolvido):
+    """
+    Contribuição de cada venda para os acumuladores aditivos do cliente.
+
+    Returns:
+        dict: Acumulador -> array por venda.
+    """
+    liquido = np.where(cancelada, 0.0, total - devolvido)
+    return {
+        "numero_compras": valida.astype(np.int64),
+        "total_gasto": np.where(valida, total, 0.0),
+        "total_liquido_gasto": liquido,
+        "liquido_compras_validas": np.where(valida, liquido, 0.0),
+    }
+
+
+class _TabelaAberta:
+    """
+    Linhas abertas (vendas ou itens) em arrays NumPy com capacidade dobrada e um dicionário
+    chave -> linha, de modo que inclusões e buscas custam O(lote) em vez de reconstruir um
+    índice do pandas a cada lote. Linhas removidas são só desmarcadas e a tabela é
+    compactada quando elas passam a ser maioria (custo amortizado constante por linha).
+
+    Args:
+        chave (str): Nome da coluna chave (ex.: "id_venda").
+        tipos (dict): Coluna -> dtype NumPy.
+    """
+
+    def __init__(self, chave, tipos):
+        self.chave = chave
+        self.tipos = tipos
+        self.n = 0  # Linhas ocupadas, incluindo as removidas
+        self.linhas = {}
+        self._chaves = np.empty(0, dtype=object)
+        self._ativas = np.empty(0, dtype=bool)
+        self._colunas = {nome: np.empty(0, dtype=tipo) for nome, tipo in tipos.items()}
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def __getitem__(self, coluna):
+        """Coluna sobre as linhas ocupadas (visão; escrever nela altera a tabela)."""
+        return self._colunas[coluna][: self.n]
+
+    def ativas(self):
+        return self._ativas[: self.n]
+
+    def _realocar(self, capacidade, linhas=None):
+        """Copia as linhas informadas (padrão: as ocupadas) para arrays de nova capacidade."""
+        linhas = slice(0, self.n) if linhas is None else linhas
+        arrays = {"_chaves": self._chaves, "_ativas": self._ativas}
+        for nome, valores in arrays.items():
+            novos = np.empty(capacidade, dtype=valores.dtype)
+            mantidos = valores[linhas]
+            novos[: len(mantidos)] = mantidos
+            setattr(self, nome, novos)
+        for nome, valores in self._colunas.items():
+            novos = np.empty(capacidade, dtype=valores.dtype)
+            mantidos = valores[linhas]
+            novos[: len(mantidos)] = mantidos
+            self._colunas[nome] = novos
+
+    def acrescentar(self, chaves, valores):
+        """
+        Acrescenta linhas ao final.
+
+        Args:
+            chaves (list): Chaves novas (não presentes na tabela).
+            valores (dict): Coluna -> array com um valor por chave.
+
+        Returns:
+            np.ndarray: Linhas ocupadas pelas chaves.
+        """
+        quantidade = len(chaves)
+        if self.n + quantidade > len(self._chaves):
+            self._realocar(max(2 * len(self._chaves), self.n + quantidade, 1_024))
+        linhas = np.arange(self.n, self.n + quantidade)
+        self._chaves[linhas] = chaves
+        self._ativas[linhas] = True
+        for nome, coluna in self._colunas.items():
+            coluna[linhas] = valores[nome]
+        self.linhas.update(zip(chaves, linhas.tolist()))
+        self.n += quantidade
+        return linhas
+
+    def localizar(self, chaves):
+        """Linhas das chaves (-1 para as ausentes)."""
+        return np.fromiter(
+            (self.linhas.get(chave, -1) for chave in chaves),
+            dtype=np.int64,
+            count=len(chaves),
+        )
+
+    def remover(self, linhas):
+        """Remove as linhas (todas ativas) e compacta a tabela se preciso."""
+        self._ativas[linhas] = False
+        for chave in self._chaves[linhas]:
+            del self.linhas[chave]
+        if self.n > 1_024 and 2 * len(self.linhas) < self.n:
+            ativas = np.flatnonzero(self.ativas())
+            self._realocar(max(2 * len(ativas), 1_024), ativas)
+            self.n = len(ativas)
+            self.linhas = dict(zip(self._chaves[: self.n], range(self.n)))
+
+    def para_dataframe(self):
+        ativas = self.ativas()
+        return pd.DataFrame(
+            {
+                self.chave: self._chaves[: self.n][ativas],
+                **{nome: self[nome][ativas] for nome in self._colunas},
+            }
+        )
+
+    @classmethod
+    def de_dataframe(cls, df, chave, tipos):
+        tabela = cls(chave, tipos)
+        tabela.acrescentar(
+            df[chave].tolist(),
+            {nome: df[nome].to_numpy(dtype=tipo) for nome, tipo in tipos.items()},
+        )
+        return tabela
+
+
+class RollupClientes:
+    """
+    Acumuladores por cliente, atualizados incrementalmente por vendas, devoluções e
+    mudanças de status.
+
+    Args:
+        janela_devolucao_dias (int): Dias, contados da venda mais recente, em que uma venda
+            permanece aberta para devoluções e mudanças de status.
+    """
+
+    def __init__(self, janela_devolucao_dias=JANELA_DEVOLUCAO_DIAS):
+        self.janela_devolucao_dias = janela_devolucao_dias
+        self.ids_clientes = []
+        self._posicoes_clientes = {}
+        self._acumuladores = {
+            nome: np.full(0, _VAZIOS.get(nome, 0), dtype=tipo)
+            for nome, tipo in ACUMULADORES.items()
+        }
+        self.ultimo_dia = _SEM_DATA_MAXIMA
+        # Vendas abertas e seus itens (com o dia da venda, para consolidá-los juntos)
+        self._vendas = _TabelaAberta("id_venda", COLUNAS_VENDAS_ABERTAS)
+        self._itens = _TabelaAberta("id_item_venda", COLUNAS_ITENS_ABERTOS)
+        self._heap_valor = []
+        self._heap_compras = []
+
+    @property
+    def n_clientes(self):
+        return len(self.ids_clientes)
+
+    @property
+    def n_vendas_abertas(self):
+        return len(self._vendas)
+
+    def _posicoes(self, ids_clientes):
+        """Posições dos clientes nos acumuladores, incluindo os clientes novos."""
+        posicoes = np.empty(len(ids_clientes), dtype=np.int64)
+        novos = 0
+        for i, id_cliente in enumerate(ids_clientes):
+            posicao = self._posicoes_clientes.get(id_cliente)
+            if posicao is None:
+                posicao = len(self.ids_clientes)
+                self._posicoes_clientes[id_cliente] = posicao
+                self.ids_clientes.append(id_cliente)
+                novos += 1
+            posicoes[i] = posicao
+        if novos:
+            self._acumuladores = {
+                nome: np.concatenate(
+                    [valores, np.full(novos, _VAZIOS.get(nome, 0), dtype=valores.dtype)]
+                )
+                for nome, valores in self._acumuladores.items()
+            }
+        return posicoes
+
+    def _aplicar_contribuicoes(self, pos_cliente, contribuicoes, sinal=1):
+        for nome, valores in contribuicoes.items():
+            np.add.at(self._acumuladores[nome], pos_cliente, sinal * valores)
+
+    def _empilhar(self, posicoes):
+        """Empilha os valores atuais dos clientes nos rankings."""
+        liquido = self._acumuladores["total_liquido_gasto"]
+        compras = self._acumuladores["numero_compras"]
+        for posicao in np.unique(posicoes):
+            id_cliente = self.ids_clientes[posicao]
+            heapq.heappush(
+                self._heap_valor, (-liquido[posicao], id_cliente, int(posicao))
+            )
+            heapq.heappush(
+                self._heap_compras, (-compras[posicao], id_cliente, int(posicao))
+            )
+        # Compactação: remove as entradas desatualizadas quando elas dominam os heaps
+        if len(self._heap_valor) > 2 * self.n_clientes + 1_000:
+            self._reconstruir_rankings()
+
+    def _reconstruir_rankings(self):
+        """Reconstrói os heaps apenas com os valores atuais (O(n))."""
+        liquido = self._acumuladores["total_liquido_gasto"]
+        compras = self._acumuladores["numero_compras"]
+        self._heap_valor = [
+            (-liquido[i], id_cliente, i)
+            for i, id_cliente in enumerate(self.ids_clientes)
+        ]
+        self._heap_compras = [
+            (-compras[i], id_cliente, i)
+            for i, id_cliente in enumerate(self.ids_clientes)
+        ]
+        heapq.heapify(self._heap_valor)
+        heapq.heapify(self._heap_compras)
+
+    def _recalcular_datas(self, posicoes):
+        """
+        Recalcula primeira e última compra válida dos clientes informados a partir das
+        datas consolidadas e das vendas abertas (usado quando uma venda deixa de ser válida).
+        """
+        posicoes = np.unique(posicoes)
+        primeira = self._acumuladores["primeira_consolidada"][posicoes].copy()
+        ultima = self._acumuladores["ultima_consolidada"][posicoes].copy()
+        vendas = self._vendas
+        selecao = (
+            vendas.ativas()
+            & vendas["valida"]
+            & np.isin(vendas["pos_cliente"], posicoes)
+        )
+        if selecao.any():
+            indice = np.searchsorted(posicoes, vendas["pos_cliente"][selecao])
+            dias = vendas["dia"][selecao]
+            np.minimum.at(primeira, indice, dias)
+            np.maximum.at(ultima, indice, dias)
+        self._acumuladores["primeira_compra_valida"][posicoes] = primeira
+        self._acumuladores["ultima_compra_valida"][posicoes] = ultima
+
+    def registrar_vendas(self, df_vendas, df_itens_venda=None):
+        """
+        Acrescenta vendas novas (com o status atual) e seus itens. Vendas já abertas são
+        ignoradas, para que a reaplicação de um lote não conte a venda duas vezes.
+
+        Args:
+            df_vendas (pd.DataFrame): id_venda, id_cliente, data_venda, status_venda e total_venda.
+            df_itens_venda (pd.DataFrame, optional): id_item_venda, id_venda e preco_unitario,
+                necessários para valorar devoluções futuras.
+        """
+        if df_vendas is None or df_vendas.empty:
+            return
+        ids_vendas = df_vendas["id_venda"].tolist()
+        repetidas = self._vendas.localizar(ids_vendas) >= 0
+        if repetidas.any():
+            df_vendas = df_vendas[~repetidas]
+            ids_vendas = df_vendas["id_venda"].tolist()
+            logging.warning(f"{int(repetidas.sum())} vendas já registradas ignoradas.")
+            if df_vendas.empty:
+                return
+
+        pos_cliente = self._posicoes(df_vendas["id_cliente"].tolist())
+        dias = _dias(df_vendas["data_venda"])
+        status = df_vendas["status_venda"].astype(str)
+        valida = status.isin(STATUS_VENDAS_VALIDAS).to_numpy()
+        cancelada = (status == STATUS_VENDA_CANCELADA).to_numpy()
+        total = df_vendas["total_venda"].to_numpy(dtype=np.float64)
+        devolvido = np.zeros(len(df_vendas))
+
+        self._aplicar_contribuicoes(
+            pos_cliente, _contribuicoes(valida, cancelada, total, devolvido)
+        )
+        np.minimum.at(
+            self._acumuladores["primeira_compra_valida"],
+            pos_cliente[valida],
+            dias[valida],
+        )
+        np.maximum.at(
+            self._acumuladores["ultima_compra_valida"],
+            pos_cliente[valida],
+            dias[valida],
+        )
+        self.ultimo_dia = max(self.ultimo_dia, int(dias.max()))
+
+        linhas_novas = self._vendas.acrescentar(
+            ids_vendas,
+            {
+                "pos_cliente": pos_cliente,
+                "dia": dias,
+                "valida": valida,
+                "cancelada": cancelada,
+                "total_venda": total,
+                "valor_devolvido": devolvido,
+            },
+        )
+        if df_itens_venda is not None and not df_itens_venda.empty:
+            ids_vendas_itens = df_itens_venda["id_venda"].tolist()
+            linhas_vendas = self._vendas.localizar(ids_vendas_itens)
+            # Só os itens das vendas registradas agora
+            novos = linhas_vendas >= linhas_novas[0]
+            self._itens.acrescentar(
+                df_itens_venda["id_item_venda"][novos].tolist(),
+                {
+                    "id_venda": np.asarray(ids_vendas_itens, dtype=object)[novos],
+                    "dia": self._vendas["dia"][linhas_vendas[novos]],
+                    "preco_unitario": df_itens_venda["preco_unitario"].to_numpy(
+                        dtype=np.float64
+                    )[novos],
+                },
+            )
+        self._empilhar(pos_cliente)
+
+    def _alterar_vendas(self, linhas_vendas, novos_valores):
+        """Substitui campos de vendas abertas, aplicando a diferença de contribuição."""
+        vendas = self._vendas
+        colunas = ["valida", "cancelada", "total_venda", "valor_devolvido"]
+        anteriores = {c: vendas[c][linhas_vendas] for c in colunas}
+        atuais = {**anteriores, **novos_valores}
+        pos_cliente = vendas["pos_cliente"][linhas_vendas]
+        self._aplicar_contribuicoes(
+            pos_cliente, _contribuicoes(*anteriores.values()), sinal=-1
+        )
+        self._aplicar_contribuicoes(pos_cliente, _contribuicoes(*atuais.values()))
+        for coluna, valores in novos_valores.items():
+            vendas[coluna][linhas_vendas] = valores
+        return pos_cliente
+
+    def registrar_devolucoes(self, df_devolucoes, df_itens_devolucao):
+        """
+        Desconta do valor líquido os itens de devoluções aprovadas ou finalizadas, pelo
+        preço do item de venda (mesma regra de vw_valor_itens_devolvidos_aprovados_por_venda).
+
+        Args:
+            df_devolucoes (pd.DataFrame): id_devolucao e status_devolucao.
+            df_itens_devolucao (pd.DataFrame): id_devolucao e id_item_venda (uma linha por unidade).
+        """
+        if df_devolucoes is None or df_devolucoes.empty or df_itens_devolucao.empty:
+            return
+        aprovadas = df_devolucoes.loc[
+            df_devolucoes["status_devolucao"]
+            .astype(str)
+            .isin(STATUS_DEVOLUCOES_APROVADAS),
+            "id_devolucao",
+        ]
+        itens = df_itens_devolucao[df_itens_devolucao["id_devolucao"].isin(aprovadas)]
+        if itens.empty:
+            return
+        linhas_itens = self._itens.localizar(itens["id_item_venda"].tolist())
+        fora_da_janela = linhas_itens < 0
+        if fora_da_janela.any():
+            logging.warning(
+                f"{int(fora_da_janela.sum())} itens devolvidos de vendas já consolidadas ignorados."
+            )
+            linhas_itens = linhas_itens[~fora_da_janela]
+        if not len(linhas_itens):
+            return
+
+        linhas_vendas, indice = np.unique(
+            self._vendas.localizar(self._itens["id_venda"][linhas_itens]),
+            return_inverse=True,
+        )
+        devolvido = self._vendas["valor_devolvido"][linhas_vendas] + np.bincount(
+            indice,
+            weights=self._itens["preco_unitario"][linhas_itens],
+            minlength=len(linhas_vendas),
+        )
+        pos_cliente = self._alterar_vendas(
+            linhas_vendas, {"valor_devolvido": devolvido}
+        )
+        self._empilhar(pos_cliente)
+
+    def atualizar_status_vendas(self, df_status):
+        """
+        Aplica o novo status de vendas abertas (ex.: após uma devolução).
+
+        Args:
+            df_status (pd.DataFrame): id_venda e status_venda (vale a última linha de cada venda).
+        """
+        if df_status is None or df_status.empty:
+            return
+        df_status = df_status.drop_duplicates("id_venda", keep="last")
+        linhas_vendas = self._vendas.localizar(df_status["id_venda"].tolist())
+        encontradas = linhas_vendas >= 0
+        if not encontradas.all():
+            logging.warning(
+                f"{int((~encontradas).sum())} mudanças de status de vendas já consolidadas ignoradas."
+            )
+        status = df_status["status_venda"].astype(str)[encontradas]
+        linhas_vendas = linhas_vendas[encontradas]
+        if not len(linhas_vendas):
+            return
+        pos_cliente = self._alterar_vendas(
+            linhas_vendas,
+            {
+                "valida": status.isin(STATUS_VENDAS_VALIDAS).to_numpy(),
+                "cancelada": (status == STATUS_VENDA_CANCELADA).to_numpy(),
+            },
+        )
+        self._recalcular_datas(pos_cliente)
+        self._empilhar(pos_cliente)
+
+    def consolidar(self):
+        """
+        Fecha as vendas anteriores à janela de devolução: suas datas válidas passam para
+        as datas consolidadas do cliente e a venda e seus itens deixam o estado aberto.
+
+        Returns:
+            int: Número de vendas consolidadas.
+        """
+        corte = self.ultimo_dia - self.janela_devolucao_dias
+        vendas = self._vendas
+        fechadas = vendas.ativas() & (vendas["dia"] < corte)
+        if not fechadas.any():
+            return 0
+        validas = fechadas & vendas["valida"]
+        pos_cliente = vendas["pos_cliente"][validas]
+        dias = vendas["dia"][validas]
+        np.minimum.at(self._acumuladores["primeira_consolidada"], pos_cliente, dias)
+        np.maximum.at(self._acumuladores["ultima_consolidada"], pos_cliente, dias)
+        linhas_fechadas = np.flatnonzero(fechadas)
+        vendas.remover(linhas_fechadas)
+        self._itens.remover(
+            np.flatnonzero(self._itens.ativas() & (self._itens["dia"] < corte))
+        )
+        return len(linhas_fechadas)
+
+    def aplicar(
+        self,
+        vendas=None,
+        itens_venda=None,
+        devolucoes=None,
+        itens_devolucao=None,
+        status_venda=None,
+    ):
+        """
+        Aplica um lote (vendas novas, devoluções e mudanças de status, nessa ordem) e
+        consolida as vendas que saíram da janela de devolução. Aceita os lotes de
+        event_producer.py (aplicar(**lote)) e as tabelas de um delta de data_generation.py.
+        """
+        self.registrar_vendas(vendas, itens_venda)
+        self.registrar_devolucoes(devolucoes, itens_devolucao)
+        self.atualizar_status_vendas(status_venda)
+        return self.consolidar()
+
+    def _top(self, heap, valores, k):
+        """Retira os k maiores valores atuais do heap, descartando os desatualizados."""
+        selecionados = []
+        vistos = set()
+        while heap and len(selecionados) < k:
+            entrada = heapq.heappop(heap)
+            posicao = entrada[2]
+            if posicao in vistos or valores[posicao] != -entrada[0]:
+                continue
+            vistos.add(posicao)
+            selecionados.append(entrada)
+        for entrada in selecionados:
+            heapq.heappush(heap, entrada)
+        return selecionados
+
+    def top_por_valor(self, k=N_TOP_CLIENTES):
+        """Clientes com maior valor líquido gasto (empates pelo id_cliente)."""
+        selecionados = self._top(
+            self._heap_valor, self._acumuladores["total_liquido_gasto"], k
+        )
+        return pd.DataFrame(
+            {
+                "id_cliente": [e[1] for e in selecionados],
+                "total_liquido_gasto_cliente": np.round(
+                    [-e[0] for e in selecionados], 2
+                ),
+            }
+        )
+
+    def top_por_compras(self, k=N_TOP_CLIENTES):
+        """Clientes com mais compras válidas (empates pelo id_cliente)."""
+        selecionados = self._top(
+            self._heap_compras, self._acumuladores["numero_compras"], k
+        )
+        return pd.DataFrame(
+            {
+                "id_cliente": [e[1] for e in selecionados],
+                "num_compras_validas_cliente": np.array(
+                    [-e[0] for e in selecionados], dtype=np.int64
+                ),
+            }
+        )
+
+    def metricas(self):
+        """
+        Métricas atuais de todos os clientes.
+
+        Returns:
+            pd.DataFrame: id_cliente, numero_compras, total_gasto, total_liquido_gasto,
+                aov_liquido, primeira_compra_valida e ultima_compra_valida.
+        """
+        acumuladores = self._acumuladores
+        numero_compras = acumuladores["numero_compras"]
+        return pd.DataFrame(
+            {
+                "id_cliente": self.ids_clientes,
+                "numero_compras": numero_compras,
+                "total_gasto": np.round(acumuladores["total_gasto"], 2),
+                "total_liquido_gasto": np.round(acumuladores["total_liquido_gasto"], 2),
+                "aov_liquido": np.round(
+                    acumuladores["liquido_compras_validas"]
+                    / np.where(numero_compras > 0, numero_compras, np.nan),
+                    2,
+                ),
+                "primeira_compra_valida": _datas(
+                    acumuladores["primeira_compra_valida"], _SEM_DATA_MINIMA
+                ),
+                "ultima_compra_valida": _datas(
+                    acumuladores["ultima_compra_valida"], _SEM_DATA_MAXIMA
+                ),
+            }
+        )
+
+    def rfm(self, data_referencia=None, n_faixas=N_FAIXAS_RFM):
+        """
+        Escores RFM (1 a n_faixas, maior é melhor) dos clientes com compras válidas, por
+        faixas de mesmo tamanho: recência (dias desde a última compra válida, menor é
+        melhor), frequência (compras válidas) e valor monetário (total líquido). Calculado
+        sobre os acumuladores, em O(n log n), sem ler vendas.
+
+        Args:
+            data_referencia (date, optional): Padrão: dia seguinte à venda mais recente.
+            n_faixas (int): Número de faixas de cada escore.
+
+        Returns:
+            pd.DataFrame: Métricas, recencia_dias, escores r, f, m e o código rfm (ex.: "545").
+        """
+        df = self.metricas()
+        df = df[df["numero_compras"] > 0].reset_index(drop=True)
+        if data_referencia is None:
+            referencia = self.ultimo_dia + 1
+        else:
+            referencia = int(_dias([data_referencia])[0])
+        df["recencia_dias"] = referencia - _dias(df["ultima_compra_valida"])
+
+        def faixas(valores, crescente):
+            # Postos sem empates (ordem estável) divididos em faixas de mesmo tamanho
+            postos = valores.rank(method="first", ascending=crescente).to_numpy()
+            return np.ceil(postos * n_faixas / max(len(valores), 1)).astype(np.int64)
+
+        df["r"] = faixas(df["recencia_dias"], False)
+        df["f"] = faixas(df["numero_compras"], True)
+        df["m"] = faixas(df["total_liquido_gasto"], True)
+        df["rfm"] = df["r"].astype(str) + df["f"].astype(str) + df["m"].astype(str)
+        return df
+
+    def salvar(self, diretorio=DIRETORIO_ROLLUP):
+        """
+        Grava o estado em diretorio (acumuladores, vendas e itens abertos em Feather e o
+        controle em JSON). Cada arquivo é trocado de forma atômica, e o JSON por último.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        clientes = pd.DataFrame({"id_cliente": self.ids_clientes, **self._acumuladores})
+        arquivos = {
+            "clientes.feather": clientes,
+            "vendas_abertas.feather": self._vendas.para_dataframe(),
+            "itens_abertos.feather": self._itens.para_dataframe(),
+        }
+        for nome_arquivo, df in arquivos.items():
+            caminho = os.path.join(diretorio, nome_arquivo)
+            df.to_feather(f"{caminho}.tmp", compression="uncompressed")
+            os.replace(f"{caminho}.tmp", caminho)
+        caminho_controle = os.path.join(diretorio, "rollup.json")
+        with open(f"{caminho_controle}.tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(
+                {
+                    "versao": VERSAO_FORMATO,
+                    "janela_devolucao_dias": self.janela_devolucao_dias,
+                    "ultimo_dia": self.ultimo_dia,
+                    "clientes": self.n_clientes,
+                    "vendas_abertas": self.n_vendas_abertas,
+                },
+                arquivo,
+                indent=2,
+            )
+        os.replace(f"{caminho_controle}.tmp", caminho_controle)
+        logging.info(
+            f"Rollup gravado em '{diretorio}': {self.n_clientes} clientes e {self.n_vendas_abertas} vendas abertas."
+        )
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_ROLLUP):
+        """Carrega um estado gravado por salvar(). Os rankings são reconstruídos em O(n)."""
+        with open(os.path.join(diretorio, "rollup.json"), encoding="utf-8") as arquivo:
+            controle = json.load(arquivo)
+        if controle["versao"] != VERSAO_FORMATO:
+            raise ValueError(
+                f"Versão {controle['versao']} do rollup em '{diretorio}' não suportada."
+            )
+        rollup = cls(controle["janela_devolucao_dias"])
+        rollup.ultimo_dia = controle["ultimo_dia"]
+        clientes = pd.read_feather(os.path.join(diretorio, "clientes.feather"))
+        rollup.ids_clientes = clientes["id_cliente"].tolist()
+        rollup._posicoes_clientes = {
+            id_cliente: i for i, id_cliente in enumerate(rollup.ids_clientes)
+        }
+        rollup._acumuladores = {
+            nome: clientes[nome].to_numpy(dtype=tipo).copy()
+            for nome, tipo in ACUMULADORES.items()
+        }
+        rollup._vendas = _TabelaAberta.de_dataframe(
+            pd.read_feather(os.path.join(diretorio, "vendas_abertas.feather")),
+            "id_venda",
+            COLUNAS_VENDAS_ABERTAS,
+        )
+        rollup._itens = _TabelaAberta.de_dataframe(
+            pd.read_feather(os.path.join(diretorio, "itens_abertos.feather")),
+            "id_item_venda",
+            COLUNAS_ITENS_ABERTOS,
+        )
+        rollup._reconstruir_rankings()
+        return rollup
+
+
+def construir_rollup(
+    tabelas=None,
+    caminho_esquema=CAMINHO_ESQUEMA_SQL,
+    diretorio_cache=DIRETORIO_CACHE,
+    janela_devolucao_dias=JANELA_DEVOLUCAO_DIAS,
+):
+    """
+    Constrói o rollup a partir do histórico completo (uma única passada), lido pelo
+    cache de dataset_cache.py.
+
+    Args:
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV. Padrão: config/ingestion.json.
+        caminho_esquema (str): DDL das tabelas (ex.: sql/create_schema_compact.sql).
+        diretorio_cache (str): Pasta do cache Arrow.
+        janela_devolucao_dias (int): Ver RollupClientes.
+
+    Returns:
+        RollupClientes: Rollup com todas as vendas aplicadas e consolidadas.
+    """
+    dados = carregar_dados(
+        ["vendas", "itens_venda", "devolucoes", "itens_devolucao"],
+        tabelas=tabelas,
+        esquema=ler_esquema_sql(caminho_esquema),
+        diretorio_cache=diretorio_cache,
+    )
+    rollup = RollupClientes(janela_devolucao_dias)
+    rollup.aplicar(
+        vendas=dados["vendas"],
+        itens_venda=dados["itens_venda"],
+        devolucoes=dados["devolucoes"],
+        itens_devolucao=dados["itens_devolucao"],
+    )
+    return rollup
+
+
+def aplicar_delta(rollup, diretorio_delta):
+    """
+    Aplica ao rollup as tabelas de uma pasta de delta de data_generation.py
+    (SAIDA_INCREMENTAL = "delta").
+    """
+    from data_generation import TABELAS_EM_BLOCOS, ler_csv_do_projeto
+
+    tabelas = {
+        nome: ler_csv_do_projeto(
+            os.path.join(diretorio_delta, f"{nome}.csv"), colunas_data
+        )
+        for nome, colunas_data in TABELAS_EM_BLOCOS.items()
+    }
+    return rollup.aplicar(**tabelas)
+
+
+def verificar_com_insights(rollup, insights, k=N_TOP_CLIENTES):
+    """
+    Compara as métricas do rollup com os insights equivalentes de sales_insights.py
+    (calculados sobre o histórico completo).
+
+    Returns:
+        dict: Nome do insight -> descrição da divergência (None se iguais).
+    """
+    metricas = rollup.metricas().set_index("id_cliente")
+    comparacoes = {
+        "total_liquido_por_cliente": ("total_liquido_gasto", "total_liquido_gasto"),
+        "frequencia_de_compras": ("num_compras_validas", "numero_compras"),
+        "aov_por_cliente": ("aov_liquido_cliente", "aov_liquido"),
+        "ultima_compra_por_cliente": (
+            "data_ultima_compra_valida",
+            "ultima_compra_valida",
+        ),
+    }
+    resultados = {}
+    for metodo, (coluna_insight, coluna_rollup) in comparacoes.items():
+        esperado = getattr(insights, metodo)().set_index("id_cliente")[coluna_insight]
+        obtido = metricas[coluna_rollup].reindex(esperado.index)
+        if pd.api.types.is_datetime64_any_dtype(esperado):
+            iguais = (
+                esperado.astype("datetime64[s]") == obtido.astype("datetime64[s]")
+            ).all()
+        else:
+            iguais = np.allclose(
+                esperado.to_numpy(dtype=np.float64),
+                obtido.to_numpy(dtype=np.float64),
+                atol=TOLERANCIA_VERIFICACAO,
+            )
+        resultados[metodo] = None if iguais else f"{coluna_rollup} difere"
+
+    tops = {
+        "top_clientes_por_valor": (
+            rollup.top_por_valor(k),
+            "total_liquido_gasto_cliente",
+        ),
+        "top_clientes_por_compras": (
+            rollup.top_por_compras(k),
+            "num_compras_validas_cliente",
+        ),
+    }
+    for metodo, (df_rollup, coluna) in tops.items():
+        esperado = getattr(insights, metodo)(k)[coluna].to_numpy(dtype=np.float64)
+        obtido = df_rollup[coluna].to_numpy(dtype=np.float64)
+        iguais = len(esperado) == len(obtido) and np.allclose(
+            esperado, obtido, atol=TOLERANCIA_VERIFICACAO
+        )
+        resultados[metodo] = None if iguais else f"{coluna} difere"
+    return resultados
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Rollup incremental de métricas por cliente (RFM, última compra, valor)."
+    )
+    parser.add_argument("--diretorio", default=DIRETORIO_ROLLUP)
+    parser.add_argument("--esquema", default=CAMINHO_ESQUEMA_SQL)
+    parser.add_argument(
+        "--construir",
+        action="store_true",
+        help="Constrói o rollup a partir dos CSVs de config/ingestion.json.",
+    )
+    parser.add_argument(
+        "--aplicar",
+        nargs="+",
+        default=[],
+        help="Pastas de delta de data_generation.py a aplicar, em ordem.",
+    )
+    parser.add_argument("--top", type=int, help="Mostra os k melhores clientes.")
+    parser.add_argument("--por", choices=("valor", "compras"), default="valor")
+    parser.add_argument(
+        "--rfm", help="Grava os escores RFM de todos os clientes neste CSV."
+    )
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="Compara o rollup com os insights de sales_insights.py.",
+    )
+    return parser.parse_args()
+
+
+# Fluxo Principal do Rollup
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+    try:
+        if argumentos.construir:
+            rollup = construir_rollup(caminho_esquema=argumentos.esquema)
+        else:
+            rollup = RollupClientes.carregar(argumentos.diretorio)
+        for diretorio_delta in argumentos.aplicar:
+            consolidadas = aplicar_delta(rollup, diretorio_delta)
+            logging.info(
+                f"Delta '{diretorio_delta}' aplicado ({consolidadas} vendas consolidadas)."
+            )
+        if argumentos.construir or argumentos.aplicar:
+            rollup.salvar(argumentos.diretorio)
+    except Exception as e:
+        logging.error(f"Erro no rollup de clientes: {e}")
+        exit(1)
+
+    if argumentos.top:
+        df_top = (
+            rollup.top_por_valor(argumentos.top)
+            if argumentos.por == "valor"
+            else rollup.top_por_compras(argumentos.top)
+        )
+        logging.info(f"Top {argumentos.top} clientes por {argumentos.por}:\n{df_top}")
+    if argumentos.rfm:
+        df_rfm = rollup.rfm()
+        df_rfm.to_csv(argumentos.rfm, sep=";", index=False, encoding="utf-8-sig")
+        logging.info(
+            f"Escores RFM de {len(df_rfm)} clientes gravados em '{argumentos.rfm}'."
+        )
+    if argumentos.verificar:
+        from sales_insights import carregar_insights
+
+        resultados = verificar_com_insights(
+            rollup, carregar_insights(caminho_esquema=argumentos.esquema)
+        )
+        for metodo, divergencia in resultados.items():
+            logging.info(f"{metodo}: {divergencia or 'ok'}")
+        if any(resultados.values()):
+            logging.error("Rollup divergente dos insights de vendas.")
+            exit(1)
+    exit()
@@ -10,19 +10,48 @@ Principais funcionalidades:
 - Geração de clientes com dados fictícios, incluindo e-mails e datas de cadastro realistas (primeira compra).
 - Geração de produtos organizados por categorias, com nomes e preços variados.
 - Geração de vendas, cada uma podendo conter múltiplos itens, com datas em 2025.
+  Para grandes volumes há um modo vetorizado (NumPy), ativado por MODO_VETORIZADO,
+  que também se aplica à geração de devoluções e de clientes (nomes e e-mails compostos
+  a partir de pools do Faker montados uma única vez).
 - Atualização dos clientes com número de compras realizadas e total gasto.
 - Geração de devoluções com base em uma fração das vendas, incluindo motivos e status variados, com datas em 2025.
 - Atualização do status das vendas para refletir devoluções parciais ou totais.
 - Exportação dos seguintes arquivos CSV: clientes.csv, produtos.csv, vendas.csv,
-  itens_venda.csv, devolucoes.csv, itens_devolucao.csv.
+  itens_venda.csv, devolucoes.csv, itens_devolucao.csv. As tabelas são gravadas em paralelo
+  (uma thread por tabela), opcionalmente compactadas em gzip ou zstd (COMPRESSAO_SAIDA).
+- Modo streaming (MODO_STREAMING): geração e gravação em blocos mensais, com memória limitada,
+  em arquivos únicos ou em shards numerados.
+- Saída colunar opcional (FORMATO_SAIDA = "parquet"): datasets Parquet tipados em data/parquet/,
+  com vendas e devoluções particionadas por ano/mês (ver columnar_output.py).
+- Modo paralelo (MODO_PARALELO): shards por período processados em um pool de processos,
+  com sementes derivadas por shard (saída determinística para o mesmo SEED e N_SHARDS).
+- Modo compacto (MODO_COMPACTO): chaves inteiras (int64) em vez de UUIDs e colunas de domínio
+  (região, canal, status, categoria e motivos) como category em memória, gravadas como texto
+  no CSV e com dicionário no Parquet. Os arquivos seguem sql/create_schema_compact.sql.
+- Instrumentação (INSTRUMENTACAO): spans por etapa com duração, linhas de entrada/saída, RSS e
+  alocações (tracemalloc), perfil opcional por etapa (PERFILADOR = "cProfile" ou "pyinstrument")
+  e relatório JSON ao fim da execução em CAMINHO_RELATORIO_INSTRUMENTACAO.
+- Modo incremental (MODO_INCREMENTAL): carrega clientes, produtos e a última data gerada
+  (ARQUIVO_ESTADO_GERACAO) e gera apenas os novos dias, anexando as linhas aos CSVs ou
+  gravando arquivos de delta (ver gerar_dados_incrementais).
 """
 
+import atexit
 import logging
+import numpy as np
 import pandas as pd
 import random
+import string
 from faker import Faker
+from faker.utils.text import slugify
 import os
+import gzip
+import io
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import timedelta, date
+from instrumentation import contar_linhas, instrumentacao
 
 # Configurações Globais e Constantes
 SEED = 42  # Para reprodutibilidade (dados gerados sempre serão os mesmos)
@@ -32,6 +61,36 @@ N_VENDAS_A_GERAR = (
 )
 FRACAO_DEVOLUCAO = 0.05  # 5% das vendas concluídas podem gerar devolução
 DATA_OUTPUT_DIR = "data"
+MODO_VETORIZADO = (
+    False  # True: gera clientes, vendas, itens e devoluções em lote com NumPy
+)
+MODO_STREAMING = False  # True: gera e grava os dados em blocos mensais
+SAIDA_EM_SHARDS = False  # Grava um arquivo numerado por bloco/shard
+TAMANHO_MAXIMO_CHUNK_VENDAS = 500_000  # Máximo de vendas mantidas em memória por bloco
+MODO_PARALELO = False  # True: shards por período em um pool de processos
+N_SHARDS = 8  # Mesma saída para o mesmo SEED e N_SHARDS, qualquer N_PROCESSOS
+N_PROCESSOS = os.cpu_count()
+FORMATO_DATA_CSV = "%d/%m/%Y"
+FORMATO_SAIDA = "csv"  # "csv" ou "parquet" (requer pyarrow; ver columnar_output.py)
+DIRETORIO_SAIDA_PARQUET = os.path.join(DATA_OUTPUT_DIR, "parquet")
+COMPRESSAO_SAIDA = None  # None, "gzip" (.csv.gz) ou "zstd" (.csv.zst, requer zstandard)
+MODO_COMPACTO = False  # True: chaves inteiras e domínios como category (sql/create_schema_compact.sql)
+LINHAS_POR_LOTE_EXPORTACAO = (
+    250_000  # Linhas formatadas e gravadas por vez na exportação
+)
+INSTRUMENTACAO = False  # True: spans por etapa e relatório JSON (instrumentation.py)
+PERFILADOR = None  # None, "cProfile" ou "pyinstrument" (requer pyinstrument), por etapa
+RASTREAR_ALOCACOES = True  # Alocações por etapa (tracemalloc; deixa a geração lenta)
+CAMINHO_RELATORIO_INSTRUMENTACAO = os.path.join(DATA_OUTPUT_DIR, "instrumentacao.json")
+DIRETORIO_PERFIS = os.path.join(DATA_OUTPUT_DIR, "perfis")  # .prof/.html de cada etapa
+MODO_INCREMENTAL = False  # True: estende os CSVs de DATA_OUTPUT_DIR com novos dias
+N_DIAS_INCREMENTAL = 1  # Dias gerados após a última data já existente
+N_VENDAS_POR_DIA_INCREMENTAL = 60
+N_CLIENTES_NOVOS_POR_DIA = 5  # Novos IDs no sorteio; viram clientes se comprarem
+SAIDA_INCREMENTAL = (
+    "anexar"  # "anexar" (acrescenta aos CSVs) ou "delta" (pasta separada)
+)
+ARQUIVO_ESTADO_GERACAO = "estado_geracao.json"  # Última data gerada e deltas gravados
 
 # Definição das datas de referência para o ano de 2025
 HOJE_DEFINIDO = date(2025, 5, 8)
@@ -42,6 +101,17 @@ random.seed(SEED)
 Faker.seed(SEED)
 fake = Faker("pt_BR")  # Dados brasileiros
 
+# Pools de nomes da geração vetorizada de clientes (atributos dos provedores do Faker)
+POOLS_NOMES_FAKER = {
+    "nomes_feminino": "first_names_female",
+    "nomes_masculino": "first_names_male",
+    "sobrenomes": "last_names",
+    "prefixos_feminino": "prefixes_female",
+    "prefixos_masculino": "prefixes_male",
+}
+FRACAO_NOMES_COM_PREFIXO = 1 / 6  # Um dos seis formatos de nome do Faker pt_BR
+DOMINIOS_EMAIL = ["example.org", "example.com", "example.net"]  # Os de fake.email()
+
 # Configuração do logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -112,25 +182,253 @@ produtos_por_categoria = {
 }
 
 
-def gerar_clientes_desde_vendas(df_vendas_todas, n_target_clientes):
+# Domínios sorteados na geração de clientes e vendas
+REGIOES = ["Norte", "Nordeste", "Sudeste", "Sul", "Centro-Oeste"]
+CANAIS_VENDA = ["site", "marketplace", "app"]
+STATUS_VENDA = [
+    "concluída",
+    "cancelada",
+    "devolvida parcialmente",
+    "devolvida totalmente",
+]
+
+# Domínios sorteados na geração de devoluções
+MOTIVOS_DEVOLUCAO = [
+    "Produto com defeito",
+    "Arrependimento da compra",
+    "Tamanho/cor inadequado",
+    "Produto diferente do anunciado",
+    "Entrega atrasada e não mais necessário",
+]
+STATUS_DEVOLUCAO = ["em processamento", "aprovada", "rejeitada", "finalizada"]
+MOTIVOS_ITEM_DEVOLUCAO = [
+    "Cor diferente",
+    "Danificado",
+    "Tamanho diferente",
+    "Não gostei",
+]
+COLUNAS_DEVOLUCOES = [
+    "id_devolucao",
+    "id_venda",
+    "motivo_geral_devolucao",
+    "data_devolucao",
+    "status_devolucao",
+]
+COLUNAS_ITENS_DEVOLUCAO = [
+    "id_item_devolucao",
+    "id_devolucao",
+    "id_item_venda",
+    "id_produto",
+    "quantidade_devolvida",
+    "motivo_especifico_item",
+]
+
+# Valores possíveis de cada coluna de domínio, na ordem dos ENUMs de
+# sql/create_schema_compact.sql (categorias do pandas no modo compacto)
+DOMINIOS_CATEGORICOS = {
+    "regiao": REGIOES,
+    "categoria": list(produtos_por_categoria),
+    "canal_venda": CANAIS_VENDA,
+    "status_venda": STATUS_VENDA,
+    "motivo_geral_devolucao": MOTIVOS_DEVOLUCAO,
+    "status_devolucao": STATUS_DEVOLUCAO,
+    "motivo_especifico_item": MOTIVOS_ITEM_DEVOLUCAO + MOTIVOS_DEVOLUCAO,
+}
+
+# Código de cada entidade no espaço de IDs (não alterar: muda todos os IDs gerados)
+ENTIDADES_ID = {
+    "cliente": 1,
+    "venda": 2,
+    "item_venda": 3,
+    "devolucao": 4,
+    "item_devolucao": 5,
+}
+_BITS_CONTADOR_ID = 40  # Até ~1,1 trilhão de IDs por entidade e namespace
+_BITS_NAMESPACE_ID = 16
+
+
+def _misturar_64_bits(valores):
     """
-    Gera um DataFrame com dados de clientes, onde a data de cadastro é a primeira data de compra.
-    Seleciona até n_target_clientes.
+    Função de mistura do splitmix64 aplicada a um array uint64. É uma bijeção
+    (xor-shift e multiplicação por constante ímpar são inversíveis), portanto
+    entradas distintas sempre produzem saídas distintas.
+    """
+    z = valores.copy()
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def _formatar_uuids(brutos):
+    """
+    Converte uma matriz (n, 16) de bytes no texto canônico dos UUIDs (8-4-4-4-12).
+
+    Returns:
+        np.ndarray: Array de objetos str com os UUIDs.
+    """
+    digitos_hex = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+    hexa = np.empty((len(brutos), 32), dtype=np.uint8)
+    hexa[:, 0::2] = digitos_hex[brutos >> 4]
+    hexa[:, 1::2] = digitos_hex[brutos & 0x0F]
+
+    texto = np.full((len(brutos), 36), ord("-"), dtype=np.uint8)
+    for n_hifens, (inicio, fim) in enumerate(
+        ((0, 8), (8, 12), (12, 16), (16, 20), (20, 32))
+    ):
+        texto[:, inicio + n_hifens : fim + n_hifens] = hexa[:, inicio:fim]
+
+    return texto.view("S36").ravel().astype(str).astype(object)
+
+
+class GeradorIds:
+    """
+    Gera IDs em lote, reprodutíveis e sem colisão, em substituição a fake.unique.uuid4().
+
+    Cada ID é derivado de (entidade, namespace, contador sequencial). Esse valor de 64 bits
+    passa por uma mistura bijetiva com chave derivada da semente e ocupa 64 dos 122 bits
+    livres do UUID; os bits restantes vêm de uma segunda mistura do mesmo valor. Assim,
+    não há colisão entre IDs do mesmo gerador nem entre geradores com namespaces
+    diferentes (ex.: shards da geração paralela), e nenhum conjunto de IDs já emitidos
+    precisa ser mantido em memória.
 
     Args:
-        df_vendas_todas (pd.DataFrame): DataFrame de todas as vendas geradas.
-        n_target_clientes (int): Número desejado de clientes.
+        semente (int): Semente que define a chave da mistura.
+        namespace (int): Espaço de IDs (0 a 65535), ex.: número do shard.
+        compacto (bool, optional): Se True, chaves() gera inteiros em vez de UUIDs.
+            Padrão: MODO_COMPACTO.
+    """
+
+    def __init__(self, semente=SEED, namespace=0, compacto=None):
+        if not 0 <= namespace < 2**_BITS_NAMESPACE_ID:
+            raise ValueError(
+                f"Namespace {namespace} fora do intervalo [0, {2**_BITS_NAMESPACE_ID})."
+            )
+        chaves = np.random.SeedSequence(semente).generate_state(2, dtype=np.uint64)
+        self.chave_principal, self.chave_complementar = chaves
+        self.namespace = namespace
+        self.compacto = MODO_COMPACTO if compacto is None else compacto
+        self.contadores = dict.fromkeys(ENTIDADES_ID, 0)
+
+    def _proximos_valores(self, entidade, n):
+        """
+        Reserva os próximos n contadores da entidade e devolve os valores de 64 bits
+        (entidade | namespace | contador) correspondentes.
+        """
+        if entidade not in ENTIDADES_ID:
+            raise ValueError(
+                f"Entidade '{entidade}' desconhecida. Use uma de: {list(ENTIDADES_ID)}."
+            )
+        inicio = self.contadores[entidade]
+        if inicio + n > 2**_BITS_CONTADOR_ID:
+            raise OverflowError(f"Contador de IDs da entidade '{entidade}' esgotado.")
+        self.contadores[entidade] = inicio + n
+
+        prefixo = (ENTIDADES_ID[entidade] << _BITS_NAMESPACE_ID) | self.namespace
+        return np.uint64(prefixo << _BITS_CONTADOR_ID) | np.arange(
+            inicio, inicio + n, dtype=np.uint64
+        )
+
+    def inteiros(self, entidade, n):
+        """
+        Gera n chaves inteiras compactas (int64), sequenciais dentro do namespace:
+        namespace * 2**40 + contador + 1. São únicas dentro da entidade.
+
+        Args:
+            entidade (str): Uma das chaves de ENTIDADES_ID.
+            n (int): Quantidade de chaves.
+
+        Returns:
+            np.ndarray: Array int64 com as chaves.
+        """
+        valores = self._proximos_valores(entidade, n)
+        return (
+            valores & np.uint64(2 ** (_BITS_CONTADOR_ID + _BITS_NAMESPACE_ID) - 1)
+        ).astype(np.int64) + 1
+
+    def uuids(self, entidade, n):
+        """
+        Gera n UUIDs (versão 4, formato texto) únicos e reprodutíveis.
+
+        Args:
+            entidade (str): Uma das chaves de ENTIDADES_ID.
+            n (int): Quantidade de UUIDs.
+
+        Returns:
+            np.ndarray: Array de objetos str com os UUIDs.
+        """
+        valores = self._proximos_valores(entidade, n)
+        unicos = _misturar_64_bits(valores ^ self.chave_principal)
+        complemento = _misturar_64_bits(valores ^ self.chave_complementar)
+
+        bytes_unicos = unicos.astype(">u8").view(np.uint8).reshape(n, 8)
+        bytes_complemento = complemento.astype(">u8").view(np.uint8).reshape(n, 8)
+        brutos = np.empty((n, 16), dtype=np.uint8)
+        brutos[:, 0:6] = bytes_complemento[:, 0:6]
+        brutos[:, 6] = (bytes_complemento[:, 6] & 0x0F) | 0x40  # versão 4
+        brutos[:, 7] = bytes_unicos[:, 0]
+        brutos[:, 8] = (bytes_complemento[:, 7] & 0x3F) | 0x80  # variante RFC 4122
+        brutos[:, 9:16] = bytes_unicos[:, 1:8]
+        return _formatar_uuids(brutos)
+
+    def chaves(self, entidade, n):
+        """
+        Gera n chaves primárias da entidade: inteiros (int64) no modo compacto, UUIDs
+        caso contrário.
+        """
+        if self.compacto:
+            return self.inteiros(entidade, n)
+        return self.uuids(entidade, n)
+
+
+gerador_ids = GeradorIds(SEED)  # Gerador padrão de IDs do processo
+
+
+def _coluna_dominio(coluna, codigos):
+    """
+    Valores de uma coluna de domínio a partir dos códigos sorteados (posições em
+    DOMINIOS_CATEGORICOS[coluna]). No modo compacto, monta a coluna category direto dos
+    códigos, sem criar um texto por linha.
+    """
+    if MODO_COMPACTO:
+        return pd.Categorical.from_codes(
+            codigos, dtype=pd.CategoricalDtype(DOMINIOS_CATEGORICOS[coluna])
+        )
+    return np.array(DOMINIOS_CATEGORICOS[coluna], dtype=object)[codigos]
+
+
+def compactar_tabela(df):
+    """
+    Converte as colunas de domínio presentes no DataFrame para category, com as
+    categorias fixas de DOMINIOS_CATEGORICOS (iguais em todos os blocos e shards, o que
+    mantém pd.concat e a gravação em Parquet com o mesmo dicionário). Sem efeito fora
+    do modo compacto.
+
+    Args:
+        df (pd.DataFrame): Tabela gerada.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados dos clientes.
+        pd.DataFrame: O mesmo DataFrame, com as colunas convertidas.
     """
-    logging.info(
-        f"Gerando clientes baseados nas vendas. Alvo: {n_target_clientes} clientes."
-    )
-    if df_vendas_todas.empty:
-        logging.warning("Nenhuma venda fornecida para gerar clientes.")
-        return pd.DataFrame()
+    if not MODO_COMPACTO:
+        return df
+    for coluna in df.columns.intersection(list(DOMINIOS_CATEGORICOS)):
+        df[coluna] = df[coluna].astype(
+            pd.CategoricalDtype(DOMINIOS_CATEGORICOS[coluna])
+        )
+    return df
+
+
+def _selecionar_clientes_das_vendas(df_vendas_todas, n_target_clientes):
+    """
+    Primeira compra de cada cliente das vendas (data_cadastro), com amostra de até
+    n_target_clientes clientes (mesma seleção nas versões em loop e vetorizada).
 
+    Returns:
+        pd.DataFrame: id_cliente e data_cadastro dos clientes selecionados.
+    """
     if not pd.api.types.is_datetime64_any_dtype(df_vendas_todas["data_venda"]):
         df_vendas_todas["data_venda"] = pd.to_datetime(df_vendas_todas["data_venda"])
 
@@ -142,15 +440,39 @@ def gerar_clientes_desde_vendas(df_vendas_todas, n_target_clientes):
     )
 
     if len(primeira_compra_por_cliente) > n_target_clientes:
-        clientes_selecionados_df = primeira_compra_por_cliente.sample(
+        return primeira_compra_por_cliente.sample(
             n=n_target_clientes, random_state=SEED
         )
-    else:
-        clientes_selecionados_df = primeira_compra_por_cliente
-        if len(clientes_selecionados_df) < n_target_clientes:
-            logging.warning(
-                f"Gerados {len(clientes_selecionados_df)} clientes, menos que o alvo de {n_target_clientes}, pois houve menos clientes únicos nas vendas."
-            )
+    if len(primeira_compra_por_cliente) < n_target_clientes:
+        logging.warning(
+            f"Gerados {len(primeira_compra_por_cliente)} clientes, menos que o alvo de {n_target_clientes}, pois houve menos clientes únicos nas vendas."
+        )
+    return primeira_compra_por_cliente
+
+
+@instrumentacao.medir
+def gerar_clientes_desde_vendas(df_vendas_todas, n_target_clientes):
+    """
+    Gera um DataFrame com dados de clientes, onde a data de cadastro é a primeira data de compra.
+    Seleciona até n_target_clientes.
+
+    Args:
+        df_vendas_todas (pd.DataFrame): DataFrame de todas as vendas geradas.
+        n_target_clientes (int): Número desejado de clientes.
+
+    Returns:
+        pd.DataFrame: DataFrame contendo os dados dos clientes.
+    """
+    logging.info(
+        f"Gerando clientes baseados nas vendas. Alvo: {n_target_clientes} clientes."
+    )
+    if df_vendas_todas.empty:
+        logging.warning("Nenhuma venda fornecida para gerar clientes.")
+        return pd.DataFrame()
+
+    clientes_selecionados_df = _selecionar_clientes_das_vendas(
+        df_vendas_todas, n_target_clientes
+    )
 
     clientes_data = []
     for _, row in clientes_selecionados_df.iterrows():
@@ -160,9 +482,7 @@ def gerar_clientes_desde_vendas(df_vendas_todas, n_target_clientes):
                 "nome_cliente": fake.name(),
                 "email": fake.email(),
                 "idade": random.randint(18, 75),
-                "regiao": random.choice(
-                    ["Norte", "Nordeste", "Sudeste", "Sul", "Centro-Oeste"]
-                ),
+                "regiao": random.choice(REGIOES),
                 "data_cadastro": row["data_cadastro"],
             }
         )
@@ -171,10 +491,191 @@ def gerar_clientes_desde_vendas(df_vendas_todas, n_target_clientes):
     if not df_clientes.empty:
         df_clientes["data_cadastro"] = pd.to_datetime(df_clientes["data_cadastro"])
 
+    logging.info(f"{len(df_clientes)} clientes finais gerados.")
+    return compactar_tabela(df_clientes)
+
+
+def construir_pools_clientes(gerador_faker=None):
+    """
+    Monta uma única vez os componentes de nomes e e-mails a partir das listas dos
+    provedores do Faker: primeiros nomes femininos e masculinos, sobrenomes e prefixos,
+    com os pesos do locale (quando definidos) e a forma ASCII usada nos e-mails.
+
+    Args:
+        gerador_faker (Faker, optional): Instância do Faker. Padrão: fake (pt_BR).
+
+    Returns:
+        dict: Nome do pool -> {"valores", "email", "pesos"}.
+    """
+    gerador_faker = gerador_faker or fake
+    pools = {}
+    for nome_pool, atributo in POOLS_NOMES_FAKER.items():
+        lista = next(
+            getattr(provedor, atributo)
+            for provedor in gerador_faker.providers
+            if getattr(provedor, atributo, None)
+        )
+        valores = list(lista)
+        pesos = None
+        if isinstance(lista, dict):  # Locales com frequência por nome (ex.: en_US)
+            pesos = np.array(list(lista.values()), dtype=np.float64)
+            pesos /= pesos.sum()
+        pools[nome_pool] = {
+            "valores": np.array(valores, dtype=object),
+            "email": np.array([slugify(valor) for valor in valores], dtype=object),
+            "pesos": pesos,
+        }
+    return pools
+
+
+def _sortear_do_pool(rng, pool, n):
+    """Índices sorteados de um pool (com os pesos do locale, se houver)."""
+    if pool["pesos"] is None:
+        return rng.integers(0, len(pool["valores"]), size=n)
+    return rng.choice(len(pool["valores"]), size=n, p=pool["pesos"])
+
+
+def _emails_unicos(locais, dominios, rng, emails_existentes=()):
+    """
+    Garante e-mails únicos: a primeira ocorrência de cada endereço é mantida e as
+    repetições (e os endereços já existentes) recebem um sufixo numérico sorteado, com
+    mais dígitos a cada rodada. Só a primeira verificação percorre todos os e-mails; as
+    rodadas seguintes verificam apenas os endereços que colidiram.
+
+    Returns:
+        np.ndarray: E-mails (object).
+    """
+    emails = locais + "@" + dominios
+    colisoes = pd.Series(emails, dtype=object).duplicated().to_numpy()
+    if len(emails_existentes):
+        colisoes = colisoes | pd.Index(emails, dtype=object).isin(emails_existentes)
+    posicoes = np.flatnonzero(colisoes)
+    if not len(posicoes):
+        return emails
+    ocupados = set(emails[~colisoes])
+    ocupados.update(emails_existentes)
+    rodada = 0
+    while len(posicoes):
+        rodada += 1
+        sufixos = rng.integers(1, 10 ** (rodada + 1), size=len(posicoes)).astype(str)
+        candidatos = (
+            locais[posicoes] + sufixos.astype(object) + "@" + dominios[posicoes]
+        )
+        repetidos = pd.Series(candidatos, dtype=object).duplicated().to_numpy() | (
+            np.fromiter(
+                (email in ocupados for email in candidatos),
+                dtype=bool,
+                count=len(candidatos),
+            )
+        )
+        emails[posicoes[~repetidos]] = candidatos[~repetidos]
+        ocupados.update(candidatos[~repetidos])
+        posicoes = posicoes[repetidos]
+    logging.info(f"E-mails repetidos resolvidos em {rodada} rodada(s) de sufixos.")
+    return emails
+
+
+@instrumentacao.medir
+def gerar_clientes_desde_vendas_vetorizado(
+    df_vendas_todas, n_target_clientes, rng=None, pools=None, emails_existentes=()
+):
+    """
+    Versão vetorizada de gerar_clientes_desde_vendas, indicada para milhões de clientes.
+    Em vez de chamar o Faker por linha, sorteia índices nos pools de construir_pools_clientes
+    e compõe nomes e e-mails em arrays. O e-mail segue os formatos de usuário do Faker
+    pt_BR, mas com o nome do próprio cliente, e é único (ver _emails_unicos). A seleção
+    dos clientes é a mesma da versão em loop; os atributos sorteados são outros.
+
+    Args:
+        df_vendas_todas (pd.DataFrame): DataFrame de todas as vendas geradas.
+        n_target_clientes (int): Número desejado de clientes.
+        rng (np.random.Generator, optional): Gerador de números aleatórios. Se None, usa SEED.
+        pools (dict, optional): Pools de construir_pools_clientes (montados se None).
+        emails_existentes (iterable, optional): E-mails já usados (ex.: modo incremental).
+
+    Returns:
+        pd.DataFrame: DataFrame contendo os dados dos clientes.
+    """
+    logging.info(
+        f"Gerando clientes baseados nas vendas (modo vetorizado). Alvo: {n_target_clientes} clientes."
+    )
+    if df_vendas_todas.empty:
+        logging.warning("Nenhuma venda fornecida para gerar clientes.")
+        return pd.DataFrame()
+    if rng is None:
+        rng = np.random.default_rng(SEED)
+    pools = pools or construir_pools_clientes()
+
+    clientes_selecionados_df = _selecionar_clientes_das_vendas(
+        df_vendas_todas, n_target_clientes
+    )
+    n = len(clientes_selecionados_df)
+
+    # Nome: primeiro nome (feminino ou masculino), sobrenome e, às vezes, prefixo
+    feminino = rng.random(n) < 0.5
+    primeiros = np.empty(n, dtype=object)
+    primeiros_email = np.empty(n, dtype=object)
+    prefixos = np.full(n, "", dtype=object)
+    com_prefixo = rng.random(n) < FRACAO_NOMES_COM_PREFIXO
+    for sexo, selecao in (("feminino", feminino), ("masculino", ~feminino)):
+        pool = pools[f"nomes_{sexo}"]
+        idx = _sortear_do_pool(rng, pool, int(selecao.sum()))
+        primeiros[selecao] = pool["valores"][idx]
+        primeiros_email[selecao] = pool["email"][idx]
+        pool_prefixos = pools[f"prefixos_{sexo}"]
+        selecao_prefixo = selecao & com_prefixo
+        prefixos[selecao_prefixo] = (
+            pool_prefixos["valores"][
+                _sortear_do_pool(rng, pool_prefixos, int(selecao_prefixo.sum()))
+            ]
+            + " "
+        )
+    idx_sobrenome = _sortear_do_pool(rng, pools["sobrenomes"], n)
+    sobrenomes = pools["sobrenomes"]["valores"][idx_sobrenome]
+    sobrenomes_email = pools["sobrenomes"]["email"][idx_sobrenome]
+    nomes = prefixos + primeiros + " " + sobrenomes
+
+    # E-mail: formatos de usuário do Faker pt_BR ("{sobrenome}{nome}", "{nome}{sobrenome}",
+    # "{nome}##" e "?{sobrenome}") em domínios de exemplo, como fake.email()
+    formato = rng.integers(0, 4, size=n)
+    digitos = np.array([f"{i:02d}" for i in range(100)], dtype=object)[
+        rng.integers(0, 100, size=n)
+    ]
+    letras = np.array(list(string.ascii_lowercase), dtype=object)[
+        rng.integers(0, 26, size=n)
+    ]
+    locais = np.empty(n, dtype=object)
+    for codigo, (partes_a, partes_b) in enumerate(
+        [
+            (sobrenomes_email, primeiros_email),
+            (primeiros_email, sobrenomes_email),
+            (primeiros_email, digitos),
+            (letras, sobrenomes_email),
+        ]
+    ):
+        selecao = formato == codigo
+        locais[selecao] = partes_a[selecao] + partes_b[selecao]
+    dominios = np.array(DOMINIOS_EMAIL, dtype=object)[
+        rng.integers(0, len(DOMINIOS_EMAIL), size=n)
+    ]
+
+    df_clientes = pd.DataFrame(
+        {
+            "id_cliente": clientes_selecionados_df["id_cliente"].to_numpy(),
+            "nome_cliente": nomes,
+            "email": _emails_unicos(locais, dominios, rng, emails_existentes),
+            "idade": rng.integers(18, 76, size=n),
+            "regiao": _coluna_dominio("regiao", rng.integers(0, len(REGIOES), size=n)),
+            "data_cadastro": pd.to_datetime(
+                clientes_selecionados_df["data_cadastro"].to_numpy()
+            ),
+        }
+    )
     logging.info(f"{len(df_clientes)} clientes finais gerados.")
     return df_clientes
 
 
+@instrumentacao.medir
 def gerar_produtos():
     """
     Gera um DataFrame com dados fictícios de produtos. (Função original mantida)
@@ -186,7 +687,11 @@ def gerar_produtos():
     for categoria, lista_produtos_na_categoria in produtos_por_categoria.items():
         for nome_produto, preco in lista_produtos_na_categoria:
             produto = {
-                "id_produto": f"prod_{produto_id_counter:04d}",
+                "id_produto": (
+                    produto_id_counter
+                    if MODO_COMPACTO
+                    else f"prod_{produto_id_counter:04d}"
+                ),
                 "nome_produto": nome_produto,
                 "categoria": categoria,
                 "preco": preco,
@@ -196,9 +701,10 @@ def gerar_produtos():
 
     df_produtos = pd.DataFrame(produtos_data)
     logging.info(f"{len(df_produtos)} produtos gerados.")
-    return df_produtos
+    return compactar_tabela(df_produtos)
 
 
+@instrumentacao.medir
 def gerar_vendas_e_itens(
     df_clientes_placeholder,
     df_produtos,
@@ -238,8 +744,9 @@ def gerar_vendas_e_itens(
         logging.error("Não há produtos para gerar vendas.")
         return pd.DataFrame(), pd.DataFrame()
 
+    ids_vendas = gerador_ids.chaves("venda", n_vendas)
     for i in range(n_vendas):
-        id_venda_atual = str(fake.unique.uuid4())
+        id_venda_atual = ids_vendas[i]
         id_cliente_venda = random.choice(clientes_ids_list)
 
         data_cadastro_base_cliente = (
@@ -265,7 +772,7 @@ def gerar_vendas_e_itens(
             )
 
         status_venda_inicial = random.choices(
-            ["concluída", "cancelada"],
+            STATUS_VENDA[:2],
             weights=[0.90, 0.10],
             k=1,
         )[0]
@@ -274,7 +781,7 @@ def gerar_vendas_e_itens(
             "id_venda": id_venda_atual,
             "id_cliente": id_cliente_venda,
             "data_venda": data_venda_obj,
-            "canal_venda": random.choice(["site", "marketplace", "app"]),
+            "canal_venda": random.choice(CANAIS_VENDA),
             "status_venda": status_venda_inicial,
             "total_venda": 0.0,
         }
@@ -291,7 +798,6 @@ def gerar_vendas_e_itens(
 
             for unidade in range(quantidade_comprada):
                 item_info = {
-                    "id_item_venda": str(fake.unique.uuid4()),  # ID único por unidade
                     "id_venda": id_venda_atual,
                     "id_produto": produto_info["id_produto"],
                     "quantidade": 1,  # Sempre 1 por registro
@@ -308,6 +814,11 @@ def gerar_vendas_e_itens(
 
     df_vendas = pd.DataFrame(vendas_data)
     df_itens_venda = pd.DataFrame(itens_venda_data)
+    if not df_itens_venda.empty:
+        # ID único por unidade, gerado em lote
+        df_itens_venda.insert(
+            0, "id_item_venda", gerador_ids.chaves("item_venda", len(df_itens_venda))
+        )
 
     if not df_vendas.empty:
         df_vendas["data_venda"] = pd.to_datetime(df_vendas["data_venda"])
@@ -315,9 +826,185 @@ def gerar_vendas_e_itens(
     logging.info(
         f"{len(df_vendas)} vendas e {len(df_itens_venda)} itens de venda gerados."
     )
-    return df_vendas, df_itens_venda
+    return compactar_tabela(df_vendas), df_itens_venda
+
+
+@instrumentacao.medir
+def gerar_vendas_e_itens_vetorizado(
+    df_clientes_placeholder,
+    df_produtos,
+    n_vendas,
+    data_final_geracao,
+    data_inicial_geracao,
+    rng=None,
+):
+    """
+    Versão vetorizada (NumPy) de gerar_vendas_e_itens, indicada para grandes volumes.
+    Todos os sorteios (cliente, data, status, canal, produtos e quantidades) são feitos
+    em arrays, e os itens (um registro por unidade) são expandidos com np.repeat/cumsum.
+    As regras de negócio são as mesmas da versão em loop, mas a sequência aleatória
+    é outra, portanto os dados gerados não são idênticos aos da versão original.
+
+    Args:
+        df_clientes_placeholder (pd.DataFrame): DataFrame com 'id_cliente' e 'data_cadastro' (base).
+        df_produtos (pd.DataFrame): DataFrame contendo os dados dos produtos.
+        n_vendas (int): Número de vendas a serem geradas.
+        data_final_geracao (datetime.date): Data máxima para geração de vendas.
+        data_inicial_geracao (datetime.date): Data mínima para geração de vendas.
+        rng (np.random.Generator, optional): Gerador de números aleatórios. Se None, usa SEED.
+
+    Returns:
+        tuple: (pd.DataFrame_vendas, pd.DataFrame_itens_venda)
+    """
+    logging.info(
+        f"Gerando {n_vendas} vendas e seus itens (modo vetorizado) entre {data_inicial_geracao} e {data_final_geracao}..."
+    )
+    if rng is None:
+        rng = np.random.default_rng(SEED)
+
+    if df_clientes_placeholder.empty:
+        logging.error("Não há IDs de clientes para gerar vendas.")
+        return pd.DataFrame(), pd.DataFrame()
+    if df_produtos.empty:
+        logging.error("Não há produtos para gerar vendas.")
+        return pd.DataFrame(), pd.DataFrame()
+
+    clientes_ids = df_clientes_placeholder["id_cliente"].to_numpy()
+    clientes_cadastro = df_clientes_placeholder["data_cadastro"].to_numpy(
+        dtype="datetime64[D]"
+    )
+    produtos_ids = df_produtos["id_produto"].to_numpy()
+    produtos_precos = df_produtos["preco"].to_numpy(dtype="float64")
+    n_produtos = len(produtos_ids)
+
+    # Cliente e data de cada venda (sem varredura por cliente: indexação direta)
+    idx_cliente = rng.integers(0, len(clientes_ids), size=n_vendas)
+    inicio_venda = np.maximum(
+        clientes_cadastro[idx_cliente], np.datetime64(data_inicial_geracao, "D")
+    )
+    fim_venda = np.datetime64(data_final_geracao, "D")
+    intervalo_invalido = inicio_venda > fim_venda
+    if intervalo_invalido.any():
+        logging.warning(
+            f"{int(intervalo_invalido.sum())} vendas com intervalo de datas inválido. Usando data final."
+        )
+        inicio_venda = np.where(intervalo_invalido, fim_venda, inicio_venda)
+    dias_disponiveis = (fim_venda - inicio_venda).astype(np.int64) + 1
+    deslocamento = np.floor(rng.random(n_vendas) * dias_disponiveis).astype(np.int64)
+    datas_venda = inicio_venda + deslocamento.astype("timedelta64[D]")
+
+    status_venda = _coluna_dominio(
+        "status_venda", np.where(rng.random(n_vendas) < 0.90, 0, 1)
+    )
+    canais_venda = _coluna_dominio(
+        "canal_venda", rng.integers(0, len(CANAIS_VENDA), size=n_vendas)
+    )
+
+    # Até 3 produtos distintos por venda: sorteio sem reposição em intervalos reduzidos
+    num_tipos = rng.integers(1, min(3, n_produtos) + 1, size=n_vendas)
+    escolhas = np.empty((n_vendas, 3), dtype=np.int64)
+    escolhas[:, 0] = rng.integers(0, n_produtos, size=n_vendas)
+    if n_produtos > 1:
+        segundo = rng.integers(0, n_produtos - 1, size=n_vendas)
+        segundo += segundo >= escolhas[:, 0]
+        escolhas[:, 1] = segundo
+    if n_produtos > 2:
+        menor = np.minimum(escolhas[:, 0], escolhas[:, 1])
+        maior = np.maximum(escolhas[:, 0], escolhas[:, 1])
+        terceiro = rng.integers(0, n_produtos - 2, size=n_vendas)
+        terceiro += terceiro >= menor
+        terceiro += terceiro >= maior
+        escolhas[:, 2] = terceiro
+    linhas_validas = np.arange(3) < num_tipos[:, None]
+    idx_venda_linha = np.repeat(np.arange(n_vendas), num_tipos)
+    idx_produto_linha = escolhas[linhas_validas]
+
+    # Expansão de cada linha de produto em uma unidade por registro
+    quantidade_linha = rng.integers(1, 4, size=len(idx_produto_linha))
+    idx_linha_unidade = np.repeat(np.arange(len(quantidade_linha)), quantidade_linha)
+    idx_venda_unidade = idx_venda_linha[idx_linha_unidade]
+    idx_produto_unidade = idx_produto_linha[idx_linha_unidade]
+    preco_unidade = produtos_precos[idx_produto_unidade]
+
+    total_venda = np.round(
+        np.bincount(idx_venda_unidade, weights=preco_unidade, minlength=n_vendas), 2
+    )
+    ids_venda = gerador_ids.chaves("venda", n_vendas)
+
+    df_vendas = pd.DataFrame(
+        {
+            "id_venda": ids_venda,
+            "id_cliente": clientes_ids[idx_cliente],
+            "data_venda": pd.to_datetime(datas_venda),
+            "canal_venda": canais_venda,
+            "status_venda": status_venda,
+            "total_venda": total_venda,
+        }
+    )
+    df_itens_venda = pd.DataFrame(
+        {
+            "id_item_venda": gerador_ids.chaves("item_venda", len(idx_venda_unidade)),
+            "id_venda": ids_venda[idx_venda_unidade],
+            "id_produto": produtos_ids[idx_produto_unidade],
+            "quantidade": 1,  # Sempre 1 por registro
+            "preco_unitario": preco_unidade,
+        }
+    )
+
+    logging.info(
+        f"{len(df_vendas)} vendas e {len(df_itens_venda)} itens de venda gerados."
+    )
+    return compactar_tabela(df_vendas), df_itens_venda
+
+
+@instrumentacao.medir
+def filtrar_vendas_dos_clientes(df_total_vendas, df_total_itens_venda, df_clientes):
+    """
+    Mantém as vendas dos clientes finais feitas a partir da data de cadastro de cada um,
+    e os itens dessas vendas.
+
+    Returns:
+        tuple: (DataFrame de vendas, DataFrame de itens de venda)
+    """
+    logging.info("Filtrando vendas e itens para os clientes finais...")
+    df_vendas_finais = df_total_vendas[
+        df_total_vendas["id_cliente"].isin(df_clientes["id_cliente"])
+    ].copy()
+
+    df_vendas_finais = df_vendas_finais.merge(
+        df_clientes[["id_cliente", "data_cadastro"]],
+        on="id_cliente",
+        suffixes=(
+            "_original_venda",
+            "_cliente",
+        ),
+    )
+
+    coluna_data_cadastro_do_cliente_no_merge = "data_cadastro"
+
+    df_vendas_finais = df_vendas_finais[
+        df_vendas_finais["data_venda"]
+        >= df_vendas_finais[coluna_data_cadastro_do_cliente_no_merge]
+    ]
+    df_vendas_finais.drop(
+        columns=[coluna_data_cadastro_do_cliente_no_merge], inplace=True
+    )
+
+    df_itens_venda_finais = df_total_itens_venda[
+        df_total_itens_venda["id_venda"].isin(df_vendas_finais["id_venda"])
+    ].copy()
+
+    logging.info(
+        f"Número de vendas finais após filtro de clientes e sanity check: {len(df_vendas_finais)}"
+    )
+    logging.info(
+        f"Número de itens de venda finais após filtro: {len(df_itens_venda_finais)}"
+    )
 
+    return df_vendas_finais, df_itens_venda_finais
 
+
+@instrumentacao.medir
 def atualizar_clientes_com_metricas_venda(df_clientes, df_vendas, df_itens_venda):
     """
     Atualiza o DataFrame de clientes com número de compras e total gasto. (Função original mantida)
@@ -349,6 +1036,7 @@ def atualizar_clientes_com_metricas_venda(df_clientes, df_vendas, df_itens_venda
     return df_clientes
 
 
+@instrumentacao.medir
 def gerar_devolucoes_e_itens(
     df_vendas,
     df_itens_venda,
@@ -373,23 +1061,8 @@ def gerar_devolucoes_e_itens(
 
     if vendas_passiveis_devolucao.empty:
         logging.warning("Nenhuma venda 'concluída' encontrada para gerar devoluções.")
-        return pd.DataFrame(
-            columns=[
-                "id_devolucao",
-                "id_venda",
-                "motivo_geral_devolucao",
-                "data_devolucao",
-                "status_devolucao",
-            ]
-        ), pd.DataFrame(
-            columns=[
-                "id_item_devolucao",
-                "id_devolucao",
-                "id_item_venda",
-                "id_produto",
-                "quantidade_devolvida",
-                "motivo_especifico_item",
-            ]
+        return pd.DataFrame(columns=COLUNAS_DEVOLUCOES), pd.DataFrame(
+            columns=COLUNAS_ITENS_DEVOLUCAO
         )
 
     if not pd.api.types.is_datetime64_any_dtype(
@@ -403,8 +1076,10 @@ def gerar_devolucoes_e_itens(
         frac=fracao_devolucao, random_state=SEED
     )
 
-    for _, venda_info in vendas_para_devolver_sample.iterrows():
-        id_devolucao_atual = str(fake.unique.uuid4())
+    ids_devolucoes = gerador_ids.chaves("devolucao", len(vendas_para_devolver_sample))
+    for id_devolucao_atual, (_, venda_info) in zip(
+        ids_devolucoes, vendas_para_devolver_sample.iterrows()
+    ):
         id_venda_associada = venda_info["id_venda"]
         data_venda_original_dt = venda_info["data_venda"].date()
 
@@ -441,19 +1116,9 @@ def gerar_devolucoes_e_itens(
         devolucao_info = {
             "id_devolucao": id_devolucao_atual,
             "id_venda": id_venda_associada,
-            "motivo_geral_devolucao": random.choice(
-                [
-                    "Produto com defeito",
-                    "Arrependimento da compra",
-                    "Tamanho/cor inadequado",
-                    "Produto diferente do anunciado",
-                    "Entrega atrasada e não mais necessário",
-                ]
-            ),
+            "motivo_geral_devolucao": random.choice(MOTIVOS_DEVOLUCAO),
             "data_devolucao": data_devolucao_obj,
-            "status_devolucao": random.choice(
-                ["em processamento", "aprovada", "rejeitada", "finalizada"]
-            ),
+            "status_devolucao": random.choice(STATUS_DEVOLUCAO),
         }
         devolucoes_data.append(devolucao_info)
 
@@ -474,25 +1139,18 @@ def gerar_devolucoes_e_itens(
                 n=num_itens_a_devolver, random_state=SEED
             )
 
-        for _, item_original_info in itens_selecionados_para_devolver.iterrows():
+        # to_dict preserva o tipo de cada coluna (iterrows converteria chaves inteiras em float)
+        for item_original_info in itens_selecionados_para_devolver.to_dict("records"):
             quantidade_a_devolver = random.randint(1, item_original_info["quantidade"])
             # Gerar UM REGISTRO POR UNIDADE DEVOLVIDA
             for _ in range(quantidade_a_devolver):
                 item_devolvido_info = {
-                    "id_item_devolucao": str(fake.unique.uuid4()),  # ID único por item
                     "id_devolucao": id_devolucao_atual,
                     "id_item_venda": item_original_info["id_item_venda"],
                     "id_produto": item_original_info["id_produto"],
                     "quantidade_devolvida": 1,  # Sempre 1 (unidade única)
                     "motivo_especifico_item": (
-                        random.choice(
-                            [
-                                "Cor diferente",
-                                "Danificado",
-                                "Tamanho diferente",
-                                "Não gostei",
-                            ]
-                        )
+                        random.choice(MOTIVOS_ITEM_DEVOLUCAO)
                         if random.random() > 0.3
                         else devolucao_info["motivo_geral_devolucao"]
                     ),
@@ -501,6 +1159,13 @@ def gerar_devolucoes_e_itens(
 
     df_devolucoes = pd.DataFrame(devolucoes_data)
     df_itens_devolucao = pd.DataFrame(itens_devolucao_data)
+    if not df_itens_devolucao.empty:
+        # ID único por item, gerado em lote
+        df_itens_devolucao.insert(
+            0,
+            "id_item_devolucao",
+            gerador_ids.chaves("item_devolucao", len(df_itens_devolucao)),
+        )
 
     if not df_devolucoes.empty:
         df_devolucoes["data_devolucao"] = pd.to_datetime(
@@ -510,86 +1175,1229 @@ def gerar_devolucoes_e_itens(
     logging.info(
         f"{len(df_devolucoes)} devoluções e {len(df_itens_devolucao)} itens de devolução gerados."
     )
-    return df_devolucoes, df_itens_devolucao
+    return compactar_tabela(df_devolucoes), compactar_tabela(df_itens_devolucao)
 
 
-def atualizar_status_venda_pos_devolucao(
-    df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
-):
-    """
-    Atualiza o status das vendas com base nas devoluções.
+def _indice_itens_por_venda(ids_venda, ids_venda_dos_itens):
     """
-    logging.info("Atualizando status das vendas com base nas devoluções...")
-    if df_devolucoes.empty or df_devolucoes.dropna(subset=["id_venda"]).empty:
-        logging.info("Nenhuma devolução para processar ou devoluções sem id_venda.")
-        return df_vendas
-
-    devolucoes_impactantes = df_devolucoes[
-        df_devolucoes["status_devolucao"].isin(["finalizada", "aprovada"])
-    ].copy()
-    if devolucoes_impactantes.empty:
-        logging.info("Nenhuma devolução impactante para atualizar status de vendas.")
-        return df_vendas
+    Monta, uma única vez, o índice venda -> faixa de itens, evitando um filtro
+    df_itens_venda[df_itens_venda["id_venda"] == ...] por venda.
 
-    for id_venda_afetada in devolucoes_impactantes["id_venda"].unique():
-        if pd.isna(id_venda_afetada):
-            continue
+    Args:
+        ids_venda (array-like): IDs das vendas (define as posições do índice).
+        ids_venda_dos_itens (array-like): Coluna id_venda dos itens.
 
-        itens_originais_da_venda = df_itens_venda[
-            df_itens_venda["id_venda"] == id_venda_afetada
-        ]
-        if itens_originais_da_venda.empty:
-            continue
+    Returns:
+        tuple: (ordem, inicio, contagem). Os itens da venda na posição p são
+        ordem[inicio[p] : inicio[p] + contagem[p]] (posições em df_itens_venda).
+    """
+    pos_venda_item = pd.Index(ids_venda).get_indexer(ids_venda_dos_itens)
+    ordem = np.argsort(pos_venda_item, kind="stable")
+    ordem = ordem[pos_venda_item[ordem] >= 0]  # Itens de vendas fora do índice
+    contagem = np.bincount(pos_venda_item[ordem], minlength=len(ids_venda))
+    inicio = np.cumsum(contagem) - contagem
+    return ordem, inicio, contagem
 
-        map_item_venda_para_qtd_original = itens_originais_da_venda.set_index(
-            "id_item_venda"
-        )["quantidade"].to_dict()
 
-        ids_devolucoes_desta_venda = devolucoes_impactantes[
-            devolucoes_impactantes["id_venda"] == id_venda_afetada
-        ]["id_devolucao"].tolist()
+def _posicoes_dentro_do_grupo(tamanhos_grupos):
+    """
+    Para grupos consecutivos com os tamanhos informados, devolve 0..n-1 dentro de cada grupo.
+    """
+    inicio_grupo = np.cumsum(tamanhos_grupos) - tamanhos_grupos
+    return np.arange(tamanhos_grupos.sum()) - np.repeat(inicio_grupo, tamanhos_grupos)
+
+
+@instrumentacao.medir
+def gerar_devolucoes_e_itens_vetorizado(
+    df_vendas,
+    df_itens_venda,
+    fracao_devolucao,
+    data_final_geracao,
+    data_inicial_geracao,
+    rng=None,
+):
+    """
+    Versão vetorizada de gerar_devolucoes_e_itens, com custo próximo de linear.
+    Os itens de cada venda são localizados por um índice venda -> faixa de itens montado
+    uma única vez, e cabeçalhos e itens de devolução (um registro por unidade) são
+    sorteados em arrays. As regras de datas, motivos, status e seleção de itens são as
+    mesmas da versão em loop, mas a sequência aleatória é outra.
+
+    Args:
+        df_vendas (pd.DataFrame): DataFrame de vendas.
+        df_itens_venda (pd.DataFrame): DataFrame de itens de venda.
+        fracao_devolucao (float): Fração das vendas concluídas que geram devolução.
+        data_final_geracao (datetime.date): Data máxima para devoluções.
+        data_inicial_geracao (datetime.date): Data mínima para devoluções.
+        rng (np.random.Generator, optional): Gerador de números aleatórios. Se None, usa SEED.
+
+    Returns:
+        tuple: (pd.DataFrame_devolucoes, pd.DataFrame_itens_devolucao)
+    """
+    logging.info(
+        f"Gerando devoluções (modo vetorizado) para aproximadamente {fracao_devolucao*100}% das vendas concluídas..."
+    )
+    if rng is None:
+        rng = np.random.default_rng(SEED)
+
+    vendas_passiveis_devolucao = df_vendas[df_vendas["status_venda"] == "concluída"]
+    if vendas_passiveis_devolucao.empty:
+        logging.warning("Nenhuma venda 'concluída' encontrada para gerar devoluções.")
+        return pd.DataFrame(columns=COLUNAS_DEVOLUCOES), pd.DataFrame(
+            columns=COLUNAS_ITENS_DEVOLUCAO
+        )
+
+    n_amostra = int(round(fracao_devolucao * len(vendas_passiveis_devolucao)))
+    amostra = rng.choice(len(vendas_passiveis_devolucao), size=n_amostra, replace=False)
+    ids_venda = vendas_passiveis_devolucao["id_venda"].to_numpy()[amostra]
+    datas_venda = pd.to_datetime(vendas_passiveis_devolucao["data_venda"]).to_numpy(
+        dtype="datetime64[D]"
+    )[amostra]
+
+    # Datas de devolução: entre (venda + 1) e min(venda + prazo de 2 a 30 dias, data final)
+    data_final = np.datetime64(data_final_geracao, "D")
+    inicio_devolucao = np.maximum(
+        datas_venda + np.timedelta64(1, "D"), np.datetime64(data_inicial_geracao, "D")
+    )
+    prazo = rng.integers(2, 31, size=n_amostra).astype("timedelta64[D]")
+    fim_devolucao = np.minimum(datas_venda + prazo, data_final)
+    intervalo_valido = inicio_devolucao <= fim_devolucao
+    dias_disponiveis = np.where(
+        intervalo_valido, (fim_devolucao - inicio_devolucao).astype(np.int64) + 1, 1
+    )
+    deslocamento = np.floor(rng.random(n_amostra) * dias_disponiveis).astype(np.int64)
+    datas_devolucao = np.where(
+        intervalo_valido,
+        inicio_devolucao + deslocamento.astype("timedelta64[D]"),
+        np.where(
+            datas_venda == data_final,
+            data_final,
+            np.minimum(datas_venda + np.timedelta64(1, "D"), data_final),
+        ),
+    )
+    mantidas = intervalo_valido | (datas_venda == data_final)
+    mantidas |= datas_devolucao >= inicio_devolucao
+    if not mantidas.all():
+        logging.warning(
+            f"{int((~mantidas).sum())} devoluções sem data válida foram descartadas."
+        )
+    ids_venda = ids_venda[mantidas]
+    datas_devolucao = datas_devolucao[mantidas]
+    n_devolucoes = len(ids_venda)
+
+    ids_devolucao = gerador_ids.chaves("devolucao", n_devolucoes)
+    idx_motivo_geral = rng.integers(0, len(MOTIVOS_DEVOLUCAO), size=n_devolucoes)
+    df_devolucoes = pd.DataFrame(
+        {
+            "id_devolucao": ids_devolucao,
+            "id_venda": ids_venda,
+            "motivo_geral_devolucao": _coluna_dominio(
+                "motivo_geral_devolucao", idx_motivo_geral
+            ),
+            "data_devolucao": pd.to_datetime(datas_devolucao),
+            "status_devolucao": _coluna_dominio(
+                "status_devolucao",
+                rng.integers(0, len(STATUS_DEVOLUCAO), size=n_devolucoes),
+            ),
+        }
+    )
+
+    # Itens de cada venda devolvida, a partir do índice venda -> faixa de itens
+    ordem, inicio, contagem = _indice_itens_por_venda(
+        ids_venda, df_itens_venda["id_venda"].to_numpy()
+    )
+    sem_itens = contagem == 0
+    if sem_itens.any():
+        logging.warning(
+            f"{int(sem_itens.sum())} vendas para devolução não possuem itens. Pulando itens de devolução."
+        )
+    idx_devolucao_item = np.repeat(np.arange(n_devolucoes), contagem)
+    posicao_no_grupo = _posicoes_dentro_do_grupo(contagem)
+    pos_item = ordem[np.repeat(inicio, contagem) + posicao_no_grupo]
+
+    # 70%: devolve todos os itens; 30%: devolve um subconjunto aleatório de k itens
+    devolve_todos = rng.random(n_devolucoes) < 0.7
+    k_itens = np.where(
+        devolve_todos,
+        contagem,
+        np.floor(rng.random(n_devolucoes) * contagem).astype(np.int64) + 1,
+    )
+    chave_aleatoria = rng.random(len(idx_devolucao_item))
+    ordem_sorteio = np.lexsort((chave_aleatoria, idx_devolucao_item))
+    posto = np.empty(len(ordem_sorteio), dtype=np.int64)
+    posto[ordem_sorteio] = posicao_no_grupo
+    selecionado = posto < k_itens[idx_devolucao_item]
+    idx_devolucao_item = idx_devolucao_item[selecionado]
+    pos_item = pos_item[selecionado]
+
+    # Um registro por unidade devolvida
+    quantidade_item = df_itens_venda["quantidade"].to_numpy()[pos_item]
+    quantidade_a_devolver = (
+        np.floor(rng.random(len(pos_item)) * quantidade_item).astype(np.int64) + 1
+    )
+    idx_item_unidade = np.repeat(np.arange(len(pos_item)), quantidade_a_devolver)
+    idx_devolucao_unidade = idx_devolucao_item[idx_item_unidade]
+    pos_item_unidade = pos_item[idx_item_unidade]
+    n_unidades = len(pos_item_unidade)
+
+    # Códigos em DOMINIOS_CATEGORICOS: motivos de item seguidos dos motivos gerais
+    motivo_especifico = _coluna_dominio(
+        "motivo_especifico_item",
+        np.where(
+            rng.random(n_unidades) > 0.3,
+            rng.integers(0, len(MOTIVOS_ITEM_DEVOLUCAO), size=n_unidades),
+            len(MOTIVOS_ITEM_DEVOLUCAO) + idx_motivo_geral[idx_devolucao_unidade],
+        ),
+    )
+    df_itens_devolucao = pd.DataFrame(
+        {
+            "id_item_devolucao": gerador_ids.chaves("item_devolucao", n_unidades),
+            "id_devolucao": ids_devolucao[idx_devolucao_unidade],
+            "id_item_venda": df_itens_venda["id_item_venda"].to_numpy()[
+                pos_item_unidade
+            ],
+            "id_produto": df_itens_venda["id_produto"].to_numpy()[pos_item_unidade],
+            "quantidade_devolvida": 1,  # Sempre 1 (unidade única)
+            "motivo_especifico_item": motivo_especifico,
+        }
+    )
+
+    logging.info(
+        f"{len(df_devolucoes)} devoluções e {len(df_itens_devolucao)} itens de devolução gerados."
+    )
+    return compactar_tabela(df_devolucoes), compactar_tabela(df_itens_devolucao)
+
+
+@instrumentacao.medir
+def atualizar_status_venda_pos_devolucao(
+    df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
+):
+    """
+    Atualiza o status das vendas com base nas devoluções aprovadas ou finalizadas.
+    Uma venda fica "devolvida totalmente" quando todas as unidades de todos os seus itens
+    foram devolvidas, e "devolvida parcialmente" quando ao menos um item teve devolução.
+
+    A comparação entre quantidades devolvidas e originais é feita em conjunto (junções e
+    groupby), sem filtros por venda, e o novo status é gravado em uma única atribuição.
+    """
+    logging.info("Atualizando status das vendas com base nas devoluções...")
+    if df_devolucoes.empty or df_devolucoes.dropna(subset=["id_venda"]).empty:
+        logging.info("Nenhuma devolução para processar ou devoluções sem id_venda.")
+        return df_vendas
+
+    devolucoes_impactantes = df_devolucoes.loc[
+        df_devolucoes["status_devolucao"].isin(["finalizada", "aprovada"])
+        & df_devolucoes["id_venda"].notna(),
+        ["id_devolucao", "id_venda"],
+    ]
+    if devolucoes_impactantes.empty:
+        logging.info("Nenhuma devolução impactante para atualizar status de vendas.")
+        return df_vendas
+    if df_itens_devolucao.empty:
+        logging.info("Nenhum item de devolução para atualizar status de vendas.")
+        return df_vendas
+
+    # Unidades devolvidas por (venda, item), considerando apenas devoluções impactantes
+    qtd_devolvida_por_item = (
+        df_itens_devolucao[["id_devolucao", "id_item_venda", "quantidade_devolvida"]]
+        .merge(devolucoes_impactantes, on="id_devolucao", how="inner")
+        .groupby(["id_venda", "id_item_venda"])["quantidade_devolvida"]
+        .count()
+        .rename("qtd_devolvida")
+        .reset_index()
+    )
+
+    itens_das_vendas_afetadas = df_itens_venda.loc[
+        df_itens_venda["id_venda"].isin(devolucoes_impactantes["id_venda"]),
+        ["id_venda", "id_item_venda", "quantidade"],
+    ].merge(qtd_devolvida_por_item, on=["id_venda", "id_item_venda"], how="left")
+    qtd_devolvida = itens_das_vendas_afetadas["qtd_devolvida"].fillna(0)
+    itens_das_vendas_afetadas["algum_devolvido"] = qtd_devolvida > 0
+    itens_das_vendas_afetadas["totalmente_devolvido"] = (
+        qtd_devolvida >= itens_das_vendas_afetadas["quantidade"]
+    )
+
+    situacao_por_venda = itens_das_vendas_afetadas.groupby("id_venda").agg(
+        algum_devolvido=("algum_devolvido", "any"),
+        todos_devolvidos=("totalmente_devolvido", "all"),
+    )
+    situacao_por_venda = situacao_por_venda[situacao_por_venda["algum_devolvido"]]
+    novo_status_por_venda = pd.Series(
+        np.where(
+            situacao_por_venda["todos_devolvidos"],
+            "devolvida totalmente",
+            "devolvida parcialmente",
+        ),
+        index=situacao_por_venda.index,
+    )
+
+    novo_status = df_vendas["id_venda"].map(novo_status_por_venda)
+    vendas_alteradas = novo_status.notna()
+    df_vendas.loc[vendas_alteradas, "status_venda"] = novo_status[vendas_alteradas]
+
+    logging.info(f"Status das vendas atualizados ({int(vendas_alteradas.sum())}).")
+    return df_vendas
+
+
+def salvar_csv(df, caminho_arquivo, colunas_data=(), anexar=False):
+    """
+    Salva um DataFrame no padrão de CSV do projeto (';', utf-8-sig, datas em dd/mm/aaaa).
+    Com anexar=True, acrescenta as linhas ao arquivo existente sem repetir o cabeçalho.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser salvo. As colunas de data são convertidas no próprio DataFrame.
+        caminho_arquivo (str): Caminho do arquivo CSV.
+        colunas_data (iterable): Colunas de data a serem formatadas.
+        anexar (bool): Se True, acrescenta ao arquivo em vez de sobrescrevê-lo.
+    """
+    for coluna in colunas_data:
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna]).dt.strftime(FORMATO_DATA_CSV)
+
+    ja_existe = anexar and os.path.exists(caminho_arquivo)
+    df.to_csv(
+        caminho_arquivo,
+        sep=";",
+        index=False,
+        encoding="utf-8-sig",
+        mode="a" if ja_existe else "w",
+        header=not ja_existe,
+    )
+
+
+def _abrir_saida_compactada(caminho_arquivo, compressao):
+    """
+    Abre o arquivo de saída em modo binário, com compressão em fluxo se solicitada.
+
+    Args:
+        caminho_arquivo (str): Caminho do CSV sem a extensão de compressão.
+        compressao (str, optional): None, "gzip" (.csv.gz) ou "zstd" (.csv.zst, requer zstandard).
+
+    Returns:
+        tuple: (fluxo binário aberto, caminho final do arquivo)
+    """
+    if compressao is None:
+        return open(caminho_arquivo, "wb"), caminho_arquivo
+    if compressao == "gzip":
+        caminho_final = f"{caminho_arquivo}.gz"
+        return gzip.open(caminho_final, "wb", compresslevel=6), caminho_final
+    if compressao == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "Compressão 'zstd' requer o pacote zstandard (pip install zstandard)."
+            ) from e
+        caminho_final = f"{caminho_arquivo}.zst"
+        return (
+            zstandard.ZstdCompressor(level=3).stream_writer(open(caminho_final, "wb")),
+            caminho_final,
+        )
+    raise ValueError(f"Compressão '{compressao}' não suportada. Use 'gzip' ou 'zstd'.")
+
+
+def _exportar_tabela_csv(
+    df, caminho_arquivo, colunas_data, compressao, linhas_por_lote
+):
+    """
+    Grava um DataFrame em CSV (padrão do projeto) em lotes de linhas. As datas são
+    formatadas lote a lote, sem copiar o DataFrame inteiro.
+
+    Returns:
+        str: Caminho final do arquivo gravado.
+    """
+    fluxo_binario, caminho_final = _abrir_saida_compactada(caminho_arquivo, compressao)
+    with io.TextIOWrapper(fluxo_binario, encoding="utf-8-sig", newline="") as saida:
+        for inicio in range(0, len(df), linhas_por_lote):
+            lote = df.iloc[inicio : inicio + linhas_por_lote]
+            datas_formatadas = {
+                coluna: pd.to_datetime(lote[coluna]).dt.strftime(FORMATO_DATA_CSV)
+                for coluna in colunas_data
+                if coluna in lote.columns
+            }
+            if datas_formatadas:
+                lote = lote.assign(**datas_formatadas)
+            lote.to_csv(
+                saida, sep=";", index=False, header=inicio == 0, lineterminator="\n"
+            )
+    return caminho_final
 
-        if not ids_devolucoes_desta_venda:
-            continue
 
-        itens_realmente_devolvidos_desta_venda = df_itens_devolucao[
-            df_itens_devolucao["id_devolucao"].isin(ids_devolucoes_desta_venda)
+@instrumentacao.medir
+def exportar_csvs(
+    tabelas, diretorio_saida, compressao=None, max_threads=None, linhas_por_lote=None
+):
+    """
+    Exporta várias tabelas para CSV ao mesmo tempo, uma por thread. A formatação das
+    datas, a serialização e a compressão opcional (gzip/zstd, que liberam o GIL) ocorrem
+    dentro de cada thread, de modo que a escrita em disco das tabelas se sobrepõe.
+
+    Args:
+        tabelas (dict): Nome da tabela -> (DataFrame, lista de colunas de data).
+            DataFrames vazios são ignorados.
+        diretorio_saida (str): Pasta onde os arquivos serão gravados.
+        compressao (str, optional): None, "gzip" ou "zstd".
+        max_threads (int, optional): Número máximo de threads. Padrão: uma por tabela.
+        linhas_por_lote (int, optional): Linhas formatadas e gravadas por vez.
+            Padrão: LINHAS_POR_LOTE_EXPORTACAO.
+
+    Returns:
+        list: Caminhos dos arquivos gravados.
+    """
+    linhas_por_lote = linhas_por_lote or LINHAS_POR_LOTE_EXPORTACAO
+    tabelas_com_dados = {
+        nome: (df, colunas_data)
+        for nome, (df, colunas_data) in tabelas.items()
+        if not df.empty
+    }
+    if not tabelas_com_dados:
+        logging.warning("Nenhuma tabela com dados para exportar.")
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=max_threads or len(tabelas_com_dados)
+    ) as executor:
+        futuros = [
+            executor.submit(
+                _exportar_tabela_csv,
+                df,
+                os.path.join(diretorio_saida, f"{nome}.csv"),
+                colunas_data,
+                compressao,
+                linhas_por_lote,
+            )
+            for nome, (df, colunas_data) in tabelas_com_dados.items()
         ]
-        if itens_realmente_devolvidos_desta_venda.empty:
-            continue
+        caminhos = [futuro.result() for futuro in futuros]
+
+    logging.info(f"{len(caminhos)} arquivos exportados: {', '.join(caminhos)}.")
+    return caminhos
+
+
+def _intervalos_mensais(data_inicial, data_final):
+    """
+    Divide o período [data_inicial, data_final] em intervalos mensais.
+
+    Returns:
+        list: Lista de tuplas (inicio_mes, fim_mes) com objetos datetime.date.
+    """
+    intervalos = []
+    inicio_mes = data_inicial
+    while inicio_mes <= data_final:
+        proximo_mes = (inicio_mes.replace(day=1) + timedelta(days=32)).replace(day=1)
+        fim_mes = min(proximo_mes - timedelta(days=1), data_final)
+        intervalos.append((inicio_mes, fim_mes))
+        inicio_mes = proximo_mes
+    return intervalos
+
+
+TABELAS_EM_BLOCOS = {
+    "vendas": ["data_venda"],
+    "itens_venda": [],
+    "devolucoes": ["data_devolucao"],
+    "itens_devolucao": [],
+}
+
+
+def _gerar_periodo_em_blocos(
+    rng,
+    ids_clientes,
+    df_produtos,
+    n_vendas,
+    fracao_devolucao,
+    data_inicial_periodo,
+    data_final_periodo,
+    data_final_geracao,
+    gravar_bloco,
+    tamanho_maximo_chunk,
+):
+    """
+    Gera as vendas de um período em blocos mensais, entregando cada bloco a gravar_bloco
+    e mantendo apenas os acumuladores por cliente entre um bloco e outro.
+
+    Args:
+        rng (np.random.Generator): Gerador de números aleatórios do período.
+        ids_clientes (np.ndarray): IDs de todos os clientes que podem comprar.
+        df_produtos (pd.DataFrame): DataFrame contendo os dados dos produtos.
+        n_vendas (int): Número de vendas do período.
+        fracao_devolucao (float): Fração das vendas concluídas que geram devolução.
+        data_inicial_periodo (datetime.date): Primeira data de venda do período.
+        data_final_periodo (datetime.date): Última data de venda do período.
+        data_final_geracao (datetime.date): Data máxima para devoluções.
+        gravar_bloco (callable): Recebe (numero_bloco, dict tabela -> DataFrame).
+        tamanho_maximo_chunk (int): Máximo de vendas por bloco.
+
+    Returns:
+        tuple: (primeira_compra, numero_compras, total_gasto, n_blocos), com os três
+        primeiros alinhados a ids_clientes.
+    """
+    n_clientes = len(ids_clientes)
+    indice_clientes = pd.Index(ids_clientes)
+    df_clientes_placeholder = pd.DataFrame(
+        {
+            "id_cliente": ids_clientes,
+            "data_cadastro": pd.to_datetime(data_inicial_periodo),
+        }
+    )
+    primeira_compra = np.full(n_clientes, np.datetime64("NaT"), dtype="datetime64[D]")
+    numero_compras = np.zeros(n_clientes, dtype=np.int64)
+    total_gasto = np.zeros(n_clientes, dtype=np.float64)
+
+    intervalos = _intervalos_mensais(data_inicial_periodo, data_final_periodo)
+    dias_por_mes = np.array([(fim - inicio).days + 1 for inicio, fim in intervalos])
+    vendas_por_mes = rng.multinomial(n_vendas, dias_por_mes / dias_por_mes.sum())
+
+    numero_bloco = 0
+    for (inicio_mes, fim_mes), n_vendas_mes in zip(intervalos, vendas_por_mes):
+        n_blocos_mes = max(1, -(-int(n_vendas_mes) // tamanho_maximo_chunk))
+        base, resto = divmod(int(n_vendas_mes), n_blocos_mes)
+        for i_bloco in range(n_blocos_mes):
+            n_vendas_bloco = base + (1 if i_bloco < resto else 0)
+            if n_vendas_bloco == 0:
+                continue
+            numero_bloco += 1
+            df_vendas, df_itens_venda = gerar_vendas_e_itens_vetorizado(
+                df_clientes_placeholder,
+                df_produtos,
+                n_vendas_bloco,
+                fim_mes,
+                inicio_mes,
+                rng=rng,
+            )
+            df_devolucoes, df_itens_devolucao = gerar_devolucoes_e_itens_vetorizado(
+                df_vendas,
+                df_itens_venda,
+                fracao_devolucao,
+                data_final_geracao,
+                inicio_mes,
+                rng=rng,
+            )
+            df_vendas = atualizar_status_venda_pos_devolucao(
+                df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
+            )
+
+            # Acumuladores por cliente (mesmas regras de atualizar_clientes_com_metricas_venda)
+            with instrumentacao.etapa("acumular_clientes", len(df_vendas)):
+                pos_cliente = indice_clientes.get_indexer(df_vendas["id_cliente"])
+                np.fmin.at(
+                    primeira_compra,
+                    pos_cliente,
+                    df_vendas["data_venda"].to_numpy(dtype="datetime64[D]"),
+                )
+                vendas_validas = (
+                    df_vendas["status_venda"]
+                    .isin(["concluída", "devolvida parcialmente"])
+                    .to_numpy()
+                )
+                numero_compras += np.bincount(
+                    pos_cliente[vendas_validas], minlength=n_clientes
+                )
+                gasto_por_venda = df_itens_venda.groupby("id_venda")[
+                    "preco_unitario"
+                ].sum()
+                total_gasto += np.bincount(
+                    pos_cliente[vendas_validas],
+                    weights=df_vendas.loc[vendas_validas, "id_venda"]
+                    .map(gasto_por_venda)
+                    .fillna(0.0)
+                    .to_numpy(),
+                    minlength=n_clientes,
+                )
+
+            blocos = {
+                "vendas": df_vendas,
+                "itens_venda": df_itens_venda,
+                "devolucoes": df_devolucoes,
+                "itens_devolucao": df_itens_devolucao,
+            }
+            with instrumentacao.etapa("gravar_bloco", contar_linhas(blocos)):
+                gravar_bloco(numero_bloco, blocos)
+            logging.info(
+                f"Bloco {numero_bloco} ({inicio_mes} a {fim_mes}) gravado: {len(df_vendas)} vendas, {len(df_devolucoes)} devoluções."
+            )
+
+    return primeira_compra, numero_compras, total_gasto, numero_bloco
+
+
+def _gravador_de_blocos(diretorio_saida, sufixo_arquivo=None, formato="csv"):
+    """
+    Cria a função que grava os blocos gerados em CSV ou Parquet.
+
+    Args:
+        diretorio_saida (str): Pasta onde os arquivos serão gravados.
+        sufixo_arquivo (str, optional): Se informado, todos os blocos são acrescentados a
+            '<tabela><sufixo>.csv'. Se None, cada bloco vira '<tabela>_<numero>.csv'.
+        formato (str): "csv" ou "parquet". Em Parquet, cada bloco vira uma nova parte
+            do dataset da tabela (ver columnar_output.salvar_tabela_parquet).
+
+    Returns:
+        callable: Função (numero_bloco, blocos) -> None.
+    """
+
+    def gravar_bloco(numero_bloco, blocos):
+        for nome_tabela, colunas_data in TABELAS_EM_BLOCOS.items():
+            if blocos[nome_tabela].empty:
+                continue
+            if formato == "parquet":
+                from columnar_output import salvar_tabela_parquet
+
+                prefixo_parte = (sufixo_arquivo or "").lstrip("_")
+                salvar_tabela_parquet(
+                    blocos[nome_tabela],
+                    diretorio_saida,
+                    nome_tabela,
+                    f"{prefixo_parte}-{numero_bloco:04d}".lstrip("-"),
+                    compacto=MODO_COMPACTO,
+                )
+                continue
+            nome_arquivo = (
+                f"{nome_tabela}_{numero_bloco:04d}.csv"
+                if sufixo_arquivo is None
+                else f"{nome_tabela}{sufixo_arquivo}.csv"
+            )
+            salvar_csv(
+                blocos[nome_tabela],
+                os.path.join(diretorio_saida, nome_arquivo),
+                colunas_data,
+                anexar=sufixo_arquivo is not None,
+            )
+
+    return gravar_bloco
+
+
+def _remover_saidas_anteriores(diretorio_saida, sufixo_arquivo=""):
+    """
+    Remove os CSVs das tabelas geradas em blocos, já que eles são abertos em modo de acréscimo.
+    """
+    for nome_tabela in TABELAS_EM_BLOCOS:
+        caminho = os.path.join(diretorio_saida, f"{nome_tabela}{sufixo_arquivo}.csv")
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+@instrumentacao.medir
+def _finalizar_clientes(
+    ids_clientes,
+    primeira_compra,
+    numero_compras,
+    total_gasto,
+    df_produtos,
+    diretorio_saida,
+    formato="csv",
+    rng=None,
+):
+    """
+    Monta os clientes a partir dos acumuladores (data de cadastro = primeira compra)
+    e grava as tabelas clientes e produtos no formato informado ("csv" ou "parquet").
+    Nomes e e-mails vêm de gerar_clientes_desde_vendas_vetorizado (sorteados com rng).
+
+    Returns:
+        pd.DataFrame: DataFrame dos clientes finais.
+    """
+    compraram = ~np.isnat(primeira_compra)
+    df_primeiras_compras = pd.DataFrame(
+        {
+            "id_cliente": ids_clientes[compraram],
+            "data_venda": pd.to_datetime(primeira_compra[compraram]),
+        }
+    )
+    df_clientes = gerar_clientes_desde_vendas_vetorizado(
+        df_primeiras_compras, len(ids_clientes), rng=rng
+    )
+    if df_clientes.empty:
+        logging.error("Nenhum cliente foi gerado a partir dos blocos de vendas.")
+        return df_clientes
+
+    pos_cliente = pd.Index(ids_clientes).get_indexer(df_clientes["id_cliente"])
+    df_clientes["numero_compras"] = numero_compras[pos_cliente]
+    df_clientes["total_gasto"] = np.round(total_gasto[pos_cliente], 2)
+
+    if formato == "parquet":
+        from columnar_output import salvar_tabela_parquet
+
+        salvar_tabela_parquet(
+            df_clientes, diretorio_saida, "clientes", compacto=MODO_COMPACTO
+        )
+        salvar_tabela_parquet(
+            df_produtos, diretorio_saida, "produtos", compacto=MODO_COMPACTO
+        )
+        return df_clientes
+
+    salvar_csv(
+        df_clientes.copy(),
+        os.path.join(diretorio_saida, "clientes.csv"),
+        ["data_cadastro"],
+    )
+    salvar_csv(df_produtos, os.path.join(diretorio_saida, "produtos.csv"))
+    return df_clientes
+
+
+@instrumentacao.medir
+def gerar_dados_em_streaming(
+    df_produtos,
+    n_clientes,
+    n_vendas,
+    fracao_devolucao,
+    data_final_geracao,
+    data_inicial_geracao,
+    diretorio_saida,
+    em_shards=False,
+    tamanho_maximo_chunk=None,
+    formato="csv",
+):
+    """
+    Gera vendas, itens, devoluções e itens de devolução mês a mês, gravando cada bloco
+    em disco assim que ele é gerado. Apenas o bloco atual e os acumuladores por cliente
+    (primeira compra, número de compras e total gasto) ficam em memória, de modo que o
+    pico de memória não cresce com o número total de vendas.
+
+    Diferenças em relação ao fluxo em memória: os clientes são sorteados diretamente
+    (sem o filtro posterior de placeholders) e clientes sem nenhuma venda são descartados,
+    pois a data de cadastro é definida pela primeira compra.
 
-        total_qty_devolvida_por_item_original = (
-            itens_realmente_devolvidos_desta_venda.groupby("id_item_venda")[
-                "quantidade_devolvida"
-            ].count()
+    Args:
+        df_produtos (pd.DataFrame): DataFrame contendo os dados dos produtos.
+        n_clientes (int): Número de clientes que realizam as compras.
+        n_vendas (int): Número total de vendas a serem geradas.
+        fracao_devolucao (float): Fração das vendas concluídas que geram devolução.
+        data_final_geracao (datetime.date): Data máxima para vendas e devoluções.
+        data_inicial_geracao (datetime.date): Data mínima para vendas.
+        diretorio_saida (str): Pasta onde os CSVs serão gravados.
+        em_shards (bool): Se True, cada bloco vira um arquivo numerado (ex.: vendas_0001.csv);
+            caso contrário, os blocos são acrescentados a um único arquivo por tabela.
+        tamanho_maximo_chunk (int, optional): Máximo de vendas por bloco. Meses com mais
+            vendas são divididos em vários blocos. Padrão: TAMANHO_MAXIMO_CHUNK_VENDAS.
+        formato (str): "csv" ou "parquet" (datasets particionados por ano/mês).
+
+    Returns:
+        pd.DataFrame: DataFrame dos clientes finais (já gravado em disco).
+    """
+    tamanho_maximo_chunk = tamanho_maximo_chunk or TAMANHO_MAXIMO_CHUNK_VENDAS
+    logging.info(
+        f"Gerando {n_vendas} vendas em modo streaming (blocos mensais de até {tamanho_maximo_chunk} vendas)..."
+    )
+    rng = np.random.default_rng(SEED)
+    ids_clientes = gerador_ids.chaves("cliente", n_clientes)
+
+    if formato == "parquet":
+        from columnar_output import limpar_saida_parquet
+
+        limpar_saida_parquet(diretorio_saida)
+    elif not em_shards:
+        _remover_saidas_anteriores(diretorio_saida)
+    primeira_compra, numero_compras, total_gasto, n_blocos = _gerar_periodo_em_blocos(
+        rng,
+        ids_clientes,
+        df_produtos,
+        n_vendas,
+        fracao_devolucao,
+        data_inicial_geracao,
+        data_final_geracao,
+        data_final_geracao,
+        _gravador_de_blocos(diretorio_saida, None if em_shards else "", formato),
+        tamanho_maximo_chunk,
+    )
+
+    df_clientes = _finalizar_clientes(
+        ids_clientes,
+        primeira_compra,
+        numero_compras,
+        total_gasto,
+        df_produtos,
+        diretorio_saida,
+        formato,
+        rng,
+    )
+    logging.info(
+        f"Streaming concluído: {n_blocos} blocos e {len(df_clientes)} clientes gravados em '{diretorio_saida}'."
+    )
+    return df_clientes
+
+
+def _processar_shard(parametros_shard):
+    """
+    Executa um shard da geração paralela. Roda em um processo do pool, por isso todas as
+    fontes de aleatoriedade (NumPy, random e Faker) são semeadas a partir da semente
+    derivada do shard, tornando o resultado independente de qual processo o executa.
+
+    Args:
+        parametros_shard (dict): Parâmetros montados por gerar_dados_em_paralelo.
+
+    Returns:
+        tuple: Acumuladores por cliente e número de blocos (ver _gerar_periodo_em_blocos).
+    """
+    semente_shard = parametros_shard["semente"]
+    semente_python = int(semente_shard.generate_state(1)[0])
+    random.seed(semente_python)
+    fake.seed_instance(semente_python)
+    global gerador_ids
+    gerador_ids = GeradorIds(SEED, namespace=parametros_shard["numero_shard"])
+
+    sufixo = f"_shard{parametros_shard['numero_shard']:04d}"
+    if parametros_shard["formato"] == "csv":
+        _remover_saidas_anteriores(parametros_shard["diretorio_saida"], sufixo)
+    return _gerar_periodo_em_blocos(
+        np.random.default_rng(semente_shard),
+        parametros_shard["ids_clientes"],
+        parametros_shard["df_produtos"],
+        parametros_shard["n_vendas"],
+        parametros_shard["fracao_devolucao"],
+        parametros_shard["data_inicial"],
+        parametros_shard["data_final"],
+        parametros_shard["data_final_geracao"],
+        _gravador_de_blocos(
+            parametros_shard["diretorio_saida"], sufixo, parametros_shard["formato"]
+        ),
+        parametros_shard["tamanho_maximo_chunk"],
+    )
+
+
+def _concatenar_csvs(caminhos_origem, caminho_destino):
+    """
+    Concatena CSVs com o mesmo cabeçalho byte a byte, mantendo apenas o primeiro cabeçalho.
+    Os arquivos de origem são removidos ao final.
+    """
+    with open(caminho_destino, "wb") as destino:
+        for i, caminho in enumerate(caminhos_origem):
+            with open(caminho, "rb") as origem:
+                cabecalho = origem.readline()
+                if i == 0:
+                    destino.write(cabecalho)
+                shutil.copyfileobj(origem, destino)
+            os.remove(caminho)
+
+
+@instrumentacao.medir
+def gerar_dados_em_paralelo(
+    df_produtos,
+    n_clientes,
+    n_vendas,
+    fracao_devolucao,
+    data_final_geracao,
+    data_inicial_geracao,
+    diretorio_saida,
+    n_shards,
+    n_processos=None,
+    em_shards=False,
+    tamanho_maximo_chunk=None,
+    formato="csv",
+):
+    """
+    Divide o período de geração em n_shards intervalos de datas contíguos e processa cada
+    um em um pool de processos, no mesmo esquema de blocos do modo streaming.
+
+    Cada shard recebe sua própria semente derivada de SEED (np.random.SeedSequence.spawn),
+    então a saída final é idêntica byte a byte para o mesmo SEED e n_shards,
+    independentemente de n_processos e da ordem de execução. Os arquivos de cada shard são
+    concatenados na ordem dos shards e os acumuladores por cliente são combinados no processo
+    principal.
+
+    Args:
+        df_produtos (pd.DataFrame): DataFrame contendo os dados dos produtos.
+        n_clientes (int): Número de clientes que realizam as compras.
+        n_vendas (int): Número total de vendas a serem geradas.
+        fracao_devolucao (float): Fração das vendas concluídas que geram devolução.
+        data_final_geracao (datetime.date): Data máxima para vendas e devoluções.
+        data_inicial_geracao (datetime.date): Data mínima para vendas.
+        diretorio_saida (str): Pasta onde os CSVs serão gravados.
+        n_shards (int): Número de partições por data (limitado ao número de dias do período).
+        n_processos (int, optional): Tamanho do pool. Padrão: os.cpu_count().
+        em_shards (bool): Se True, mantém um arquivo por shard (ex.: vendas_shard0001.csv)
+            em vez de concatená-los.
+        tamanho_maximo_chunk (int, optional): Máximo de vendas por bloco dentro de cada shard.
+        formato (str): "csv" ou "parquet". Em Parquet, cada shard acrescenta suas partes
+            diretamente aos datasets, sem etapa de concatenação.
+
+    Returns:
+        pd.DataFrame: DataFrame dos clientes finais (já gravado em disco).
+    """
+    tamanho_maximo_chunk = tamanho_maximo_chunk or TAMANHO_MAXIMO_CHUNK_VENDAS
+    total_dias = (data_final_geracao - data_inicial_geracao).days + 1
+    n_shards = max(1, min(n_shards, total_dias))
+    logging.info(
+        f"Gerando {n_vendas} vendas em {n_shards} shards com até {n_processos or os.cpu_count()} processos..."
+    )
+
+    rng = np.random.default_rng(SEED)
+    ids_clientes = gerador_ids.chaves("cliente", n_clientes)
+
+    limites_dias = np.linspace(0, total_dias, n_shards + 1).astype(int)
+    dias_por_shard = np.diff(limites_dias)
+    vendas_por_shard = rng.multinomial(n_vendas, dias_por_shard / total_dias)
+    sementes = np.random.SeedSequence(SEED).spawn(n_shards)
+    if formato == "parquet":
+        from columnar_output import limpar_saida_parquet
+
+        limpar_saida_parquet(diretorio_saida)
+
+    parametros_shards = [
+        {
+            "numero_shard": i + 1,
+            "semente": sementes[i],
+            "ids_clientes": ids_clientes,
+            "df_produtos": df_produtos,
+            "n_vendas": int(vendas_por_shard[i]),
+            "fracao_devolucao": fracao_devolucao,
+            "data_inicial": data_inicial_geracao + timedelta(days=int(limites_dias[i])),
+            "data_final": data_inicial_geracao
+            + timedelta(days=int(limites_dias[i + 1]) - 1),
+            "data_final_geracao": data_final_geracao,
+            "diretorio_saida": diretorio_saida,
+            "tamanho_maximo_chunk": tamanho_maximo_chunk,
+            "formato": formato,
+        }
+        for i in range(n_shards)
+    ]
+
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        resultados = list(executor.map(_processar_shard, parametros_shards))
+
+    # Combinação na ordem dos shards (somas em ordem fixa garantem o mesmo resultado)
+    primeira_compra = np.full(n_clientes, np.datetime64("NaT"), dtype="datetime64[D]")
+    numero_compras = np.zeros(n_clientes, dtype=np.int64)
+    total_gasto = np.zeros(n_clientes, dtype=np.float64)
+    for primeira_shard, compras_shard, gasto_shard, _ in resultados:
+        primeira_compra = np.fmin(primeira_compra, primeira_shard)
+        numero_compras += compras_shard
+        total_gasto += gasto_shard
+
+    if formato == "csv" and not em_shards:
+        for nome_tabela in TABELAS_EM_BLOCOS:
+            caminhos_shards = [
+                caminho
+                for caminho in (
+                    os.path.join(diretorio_saida, f"{nome_tabela}_shard{i + 1:04d}.csv")
+                    for i in range(n_shards)
+                )
+                if os.path.exists(caminho)
+            ]
+            if caminhos_shards:
+                _concatenar_csvs(
+                    caminhos_shards, os.path.join(diretorio_saida, f"{nome_tabela}.csv")
+                )
+
+    df_clientes = _finalizar_clientes(
+        ids_clientes,
+        primeira_compra,
+        numero_compras,
+        total_gasto,
+        df_produtos,
+        diretorio_saida,
+        formato,
+        rng,
+    )
+    logging.info(
+        f"Geração paralela concluída: {n_shards} shards, {sum(r[3] for r in resultados)} blocos e {len(df_clientes)} clientes gravados em '{diretorio_saida}'."
+    )
+    return df_clientes
+
+
+_NAMESPACE_BASE_INCREMENTAL = (
+    1024  # Acima dos namespaces dos shards da geração paralela
+)
+
+
+def ler_csv_do_projeto(caminho_arquivo, colunas_data=()):
+    """
+    Lê um CSV no padrão do projeto (';', utf-8-sig, datas em dd/mm/aaaa).
+
+    Args:
+        caminho_arquivo (str): Caminho do arquivo CSV.
+        colunas_data (iterable): Colunas de data a serem convertidas para datetime.
+
+    Returns:
+        pd.DataFrame: Conteúdo do arquivo.
+    """
+    df = pd.read_csv(caminho_arquivo, sep=";", encoding="utf-8-sig")
+    for coluna in colunas_data:
+        df[coluna] = pd.to_datetime(df[coluna], format=FORMATO_DATA_CSV)
+    return df
+
+
+def ler_estado_geracao(diretorio_dados):
+    """
+    Lê o estado da última geração (data final e pastas de delta já gravadas).
+    Na ausência do arquivo de estado (ex.: dados gerados antes do modo incremental),
+    a data final é obtida da maior data_venda de vendas.csv, em uma única leitura.
+
+    Args:
+        diretorio_dados (str): Pasta com os CSVs gerados.
+
+    Returns:
+        dict: {"data_final": datetime.date, "deltas": list[str]}.
+    """
+    caminho_estado = os.path.join(diretorio_dados, ARQUIVO_ESTADO_GERACAO)
+    if os.path.exists(caminho_estado):
+        with open(caminho_estado, encoding="utf-8") as arquivo:
+            estado = json.load(arquivo)
+        return {
+            "data_final": date.fromisoformat(estado["data_final"]),
+            "deltas": list(estado.get("deltas", [])),
+        }
+
+    logging.info(
+        f"Arquivo de estado não encontrado. Obtendo a última data de '{diretorio_dados}/vendas.csv'..."
+    )
+    datas_venda = ler_csv_do_projeto(
+        os.path.join(diretorio_dados, "vendas.csv"), ["data_venda"]
+    )["data_venda"]
+    if datas_venda.empty:
+        raise ValueError(f"Nenhuma venda encontrada em '{diretorio_dados}'.")
+    return {"data_final": datas_venda.max().date(), "deltas": []}
+
+
+def gravar_estado_geracao(diretorio_dados, data_final, deltas=()):
+    """
+    Grava o estado da geração de forma atômica (arquivo temporário + os.replace).
+
+    Args:
+        diretorio_dados (str): Pasta com os CSVs gerados.
+        data_final (datetime.date): Última data com vendas geradas.
+        deltas (iterable): Pastas de delta (relativas a diretorio_dados), em ordem.
+    """
+    caminho_estado = os.path.join(diretorio_dados, ARQUIVO_ESTADO_GERACAO)
+    caminho_temporario = f"{caminho_estado}.tmp"
+    with open(caminho_temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(
+            {"data_final": data_final.isoformat(), "deltas": list(deltas)},
+            arquivo,
+            indent=2,
+        )
+    os.replace(caminho_temporario, caminho_estado)
+
+
+def _carregar_clientes_atuais(diretorio_dados, deltas):
+    """
+    Carrega os clientes de diretorio_dados e aplica, em ordem, os clientes de cada delta
+    (novos clientes e clientes com métricas atualizadas), mantendo a versão mais recente.
+    """
+    partes = [
+        ler_csv_do_projeto(
+            os.path.join(diretorio_dados, "clientes.csv"), ["data_cadastro"]
         )
-        todos_os_itens_totalmente_devolvidos = True
-        algum_item_parcialmente_ou_totalmente_devolvido = False
+    ]
+    for pasta_delta in deltas:
+        caminho = os.path.join(diretorio_dados, pasta_delta, "clientes.csv")
+        if os.path.exists(caminho):
+            partes.append(ler_csv_do_projeto(caminho, ["data_cadastro"]))
+    df_clientes = pd.concat(partes, ignore_index=True)
+    if len(partes) > 1:
+        df_clientes = df_clientes.drop_duplicates(
+            subset="id_cliente", keep="last"
+        ).reset_index(drop=True)
+    return df_clientes
+
+
+@instrumentacao.medir
+def gerar_dados_incrementais(
+    diretorio_dados,
+    n_dias=None,
+    n_vendas_por_dia=None,
+    n_clientes_novos_por_dia=None,
+    fracao_devolucao=None,
+    saida=None,
+):
+    """
+    Estende um conjunto de dados já gerado com novos dias de vendas, itens e devoluções,
+    simulando uma carga diária de produção. O custo é proporcional ao novo período:
+    das tabelas existentes, apenas clientes e produtos são lidos (vendas.csv só é varrido
+    uma vez se não houver arquivo de estado).
+
+    O período gerado começa no dia seguinte à última data registrada em
+    ARQUIVO_ESTADO_GERACAO. Os IDs vêm de um GeradorIds com namespace derivado da data
+    inicial do período (sem colisão com a geração completa nem com outros períodos) e
+    todas as fontes de aleatoriedade são semeadas a partir de (SEED, data inicial), de
+    modo que o mesmo período gera sempre os mesmos dados.
+
+    As vendas sorteiam clientes existentes e novos IDs; os novos IDs que compram viram
+    clientes com data de cadastro igual à primeira compra. As devoluções são geradas
+    apenas para as vendas do novo período, com datas até o fim dele, e somente o status
+    dessas vendas é atualizado. numero_compras e total_gasto recebem as métricas do
+    período somadas às já existentes (mesmas regras de atualizar_clientes_com_metricas_venda).
+
+    Saídas:
+        - "anexar": acrescenta as linhas aos CSVs existentes (prontos para a ingestão
+          incremental) e reescreve clientes.csv com as métricas atualizadas.
+        - "delta": grava as novas linhas em <diretorio_dados>/delta/<inicio>_<fim>/,
+          com um clientes.csv contendo apenas os clientes novos ou alterados. Os CSVs
+          originais não são modificados.
+
+    Args:
+        diretorio_dados (str): Pasta com os CSVs não compactados de uma geração anterior.
+        n_dias (int, optional): Dias a gerar. Padrão: N_DIAS_INCREMENTAL.
+        n_vendas_por_dia (int, optional): Padrão: N_VENDAS_POR_DIA_INCREMENTAL.
+        n_clientes_novos_por_dia (int, optional): Padrão: N_CLIENTES_NOVOS_POR_DIA.
+        fracao_devolucao (float, optional): Padrão: FRACAO_DEVOLUCAO.
+        saida (str, optional): "anexar" ou "delta". Padrão: SAIDA_INCREMENTAL.
 
-        for (
-            id_item_venda_original,
-            qtd_original,
-        ) in map_item_venda_para_qtd_original.items():
-            qtd_devolvida_deste_item = total_qty_devolvida_por_item_original.get(
-                id_item_venda_original, 0
+    Returns:
+        dict: Tabelas geradas no período (vendas, itens e devoluções) e os clientes
+            novos ou alterados.
+    """
+    n_dias = N_DIAS_INCREMENTAL if n_dias is None else n_dias
+    n_vendas_por_dia = (
+        N_VENDAS_POR_DIA_INCREMENTAL if n_vendas_por_dia is None else n_vendas_por_dia
+    )
+    n_clientes_novos_por_dia = (
+        N_CLIENTES_NOVOS_POR_DIA
+        if n_clientes_novos_por_dia is None
+        else n_clientes_novos_por_dia
+    )
+    fracao_devolucao = (
+        FRACAO_DEVOLUCAO if fracao_devolucao is None else fracao_devolucao
+    )
+    saida = saida or SAIDA_INCREMENTAL
+    if saida not in ("anexar", "delta"):
+        raise ValueError(
+            f"Saída incremental '{saida}' inválida. Use 'anexar' ou 'delta'."
+        )
+    if n_dias < 1:
+        raise ValueError("n_dias deve ser maior ou igual a 1.")
+    for nome_tabela in ["clientes", "produtos", *TABELAS_EM_BLOCOS]:
+        caminho = os.path.join(diretorio_dados, f"{nome_tabela}.csv")
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(
+                f"Arquivo '{caminho}' não encontrado. O modo incremental requer os CSVs "
+                "não compactados de uma geração anterior."
             )
-            if qtd_devolvida_deste_item > 0:
-                algum_item_parcialmente_ou_totalmente_devolvido = True
-            if qtd_devolvida_deste_item < qtd_original:
-                todos_os_itens_totalmente_devolvidos = False
 
-        idx_venda_no_df = df_vendas["id_venda"] == id_venda_afetada
+    estado = ler_estado_geracao(diretorio_dados)
+    data_inicial = estado["data_final"] + timedelta(days=1)
+    data_final = estado["data_final"] + timedelta(days=n_dias)
+    logging.info(
+        f"Geração incremental de {data_inicial} a {data_final} (saída: {saida})..."
+    )
 
-        if (
-            todos_os_itens_totalmente_devolvidos
-            and algum_item_parcialmente_ou_totalmente_devolvido
-        ):
-            df_vendas.loc[idx_venda_no_df, "status_venda"] = "devolvida totalmente"
-        elif algum_item_parcialmente_ou_totalmente_devolvido:
-            df_vendas.loc[idx_venda_no_df, "status_venda"] = "devolvida parcialmente"
+    # Sementes e namespace derivados da data inicial do período
+    dia_do_periodo = (data_inicial - INICIO_ANO_2025).days
+    semente_periodo = np.random.SeedSequence([SEED, dia_do_periodo])
+    semente_python = int(semente_periodo.generate_state(1)[0])
+    random.seed(semente_python)
+    fake.seed_instance(semente_python)
+    rng = np.random.default_rng(semente_periodo)
+    global gerador_ids
+    gerador_ids = GeradorIds(
+        SEED, namespace=_NAMESPACE_BASE_INCREMENTAL + dia_do_periodo
+    )
 
-    logging.info("Status das vendas atualizados.")
-    return df_vendas
+    df_produtos = ler_csv_do_projeto(os.path.join(diretorio_dados, "produtos.csv"))
+    df_clientes = _carregar_clientes_atuais(diretorio_dados, estado["deltas"])
+    colunas_clientes = list(df_clientes.columns)
+
+    ids_novos = gerador_ids.chaves("cliente", n_clientes_novos_por_dia * n_dias)
+    df_clientes_placeholder = pd.concat(
+        [
+            df_clientes[["id_cliente", "data_cadastro"]],
+            pd.DataFrame(
+                {"id_cliente": ids_novos, "data_cadastro": pd.to_datetime(data_inicial)}
+            ),
+        ],
+        ignore_index=True,
+    )
+    df_vendas, df_itens_venda = gerar_vendas_e_itens_vetorizado(
+        df_clientes_placeholder,
+        df_produtos,
+        n_vendas_por_dia * n_dias,
+        data_final,
+        data_inicial,
+        rng=rng,
+    )
+    if df_vendas.empty:
+        logging.error("Nenhuma venda gerada no período incremental.")
+        return {}
+
+    vendas_de_novos = ~df_vendas["id_cliente"].isin(df_clientes["id_cliente"])
+    df_clientes_novos = gerar_clientes_desde_vendas_vetorizado(
+        df_vendas.loc[vendas_de_novos, ["id_cliente", "data_venda"]],
+        len(ids_novos),
+        rng=rng,
+        emails_existentes=df_clientes["email"],
+    )
+
+    df_devolucoes, df_itens_devolucao = gerar_devolucoes_e_itens_vetorizado(
+        df_vendas, df_itens_venda, fracao_devolucao, data_final, data_inicial, rng=rng
+    )
+    df_vendas = atualizar_status_venda_pos_devolucao(
+        df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
+    )
+
+    # Métricas do período somadas às acumuladas (apenas clientes com vendas no período)
+    df_metricas = atualizar_clientes_com_metricas_venda(
+        pd.DataFrame({"id_cliente": df_vendas["id_cliente"].unique()}),
+        df_vendas,
+        df_itens_venda,
+    ).set_index("id_cliente")
+    if not df_clientes_novos.empty:
+        df_clientes_novos["numero_compras"] = 0
+        df_clientes_novos["total_gasto"] = 0.0
+        df_clientes = pd.concat(
+            [df_clientes, df_clientes_novos[colunas_clientes]], ignore_index=True
+        )
+    afetados = df_clientes["id_cliente"].isin(df_metricas.index)
+    ids_afetados = df_clientes.loc[afetados, "id_cliente"]
+    df_clientes.loc[afetados, "numero_compras"] = (
+        df_clientes.loc[afetados, "numero_compras"].to_numpy()
+        + df_metricas["numero_compras"].reindex(ids_afetados).to_numpy()
+    )
+    df_clientes.loc[afetados, "total_gasto"] = np.round(
+        df_clientes.loc[afetados, "total_gasto"].to_numpy()
+        + df_metricas["total_gasto"].reindex(ids_afetados).to_numpy(),
+        2,
+    )
+    df_clientes_alterados = df_clientes[afetados].reset_index(drop=True)
+    logging.info(
+        f"{len(df_vendas)} vendas, {len(df_devolucoes)} devoluções e {len(df_clientes_novos)} "
+        f"clientes novos no período; {len(df_clientes_alterados)} clientes com métricas alteradas."
+    )
+
+    tabelas_periodo = {
+        "vendas": df_vendas,
+        "itens_venda": df_itens_venda,
+        "devolucoes": df_devolucoes,
+        "itens_devolucao": df_itens_devolucao,
+    }
+    deltas = estado["deltas"]
+    with instrumentacao.etapa(
+        "gravar_incremental", contar_linhas(tabelas_periodo) + len(df_clientes)
+    ):
+        if saida == "anexar":
+            for nome_tabela, df in tabelas_periodo.items():
+                caminho = os.path.join(diretorio_dados, f"{nome_tabela}.csv")
+                # Mesma ordem de colunas do cabeçalho já gravado
+                colunas = pd.read_csv(
+                    caminho, sep=";", encoding="utf-8-sig", nrows=0
+                ).columns
+                salvar_csv(
+                    df[list(colunas)].copy(),
+                    caminho,
+                    TABELAS_EM_BLOCOS[nome_tabela],
+                    anexar=True,
+                )
+            caminho_clientes = os.path.join(diretorio_dados, "clientes.csv")
+            salvar_csv(df_clientes.copy(), f"{caminho_clientes}.tmp", ["data_cadastro"])
+            os.replace(f"{caminho_clientes}.tmp", caminho_clientes)
+        else:
+            pasta_delta = os.path.join(
+                "delta", f"{data_inicial:%Y%m%d}_{data_final:%Y%m%d}"
+            )
+            diretorio_delta = os.path.join(diretorio_dados, pasta_delta)
+            os.makedirs(diretorio_delta, exist_ok=True)
+            for nome_tabela, df in tabelas_periodo.items():
+                salvar_csv(
+                    df.copy(),
+                    os.path.join(diretorio_delta, f"{nome_tabela}.csv"),
+                    TABELAS_EM_BLOCOS[nome_tabela],
+                )
+            salvar_csv(
+                df_clientes_alterados.copy(),
+                os.path.join(diretorio_delta, "clientes.csv"),
+                ["data_cadastro"],
+            )
+            deltas = [*deltas, pasta_delta]
+            logging.info(f"Delta gravado em '{diretorio_delta}'.")
+        gravar_estado_geracao(diretorio_dados, data_final, deltas)
+
+    return {**tabelas_periodo, "clientes": df_clientes_alterados}
 
 
 # Fluxo Principal de Geração
@@ -598,13 +2406,68 @@ if __name__ == "__main__":
         os.makedirs(DATA_OUTPUT_DIR)
         logging.info(f"Diretório '{DATA_OUTPUT_DIR}' criado.")
 
+    if INSTRUMENTACAO:
+        instrumentacao.configurar(
+            perfilador=PERFILADOR,
+            rastrear_alocacoes=RASTREAR_ALOCACOES,
+            diretorio_perfis=DIRETORIO_PERFIS if PERFILADOR else None,
+        )
+        # Gravado na saída do processo, inclusive nos encerramentos antecipados (exit()).
+        atexit.register(
+            instrumentacao.gravar_relatorio, CAMINHO_RELATORIO_INSTRUMENTACAO
+        )
+
+    if MODO_INCREMENTAL:
+        gerar_dados_incrementais(DATA_OUTPUT_DIR)
+        logging.info("Geração incremental concluída.")
+        exit()
+
     df_produtos = gerar_produtos()
+    # Ponto de partida do modo incremental (só para CSVs não compactados)
+    registrar_estado = FORMATO_SAIDA == "csv" and COMPRESSAO_SAIDA is None
+
+    diretorio_saida_blocos = (
+        DIRETORIO_SAIDA_PARQUET if FORMATO_SAIDA == "parquet" else DATA_OUTPUT_DIR
+    )
+    if MODO_PARALELO:
+        gerar_dados_em_paralelo(
+            df_produtos,
+            N_CLIENTES_TARGET,
+            N_VENDAS_A_GERAR,
+            FRACAO_DEVOLUCAO,
+            HOJE_DEFINIDO,
+            INICIO_ANO_2025,
+            diretorio_saida_blocos,
+            N_SHARDS,
+            n_processos=N_PROCESSOS,
+            em_shards=SAIDA_EM_SHARDS,
+            formato=FORMATO_SAIDA,
+        )
+        if registrar_estado and not SAIDA_EM_SHARDS:
+            gravar_estado_geracao(DATA_OUTPUT_DIR, HOJE_DEFINIDO)
+        logging.info("Geração de dados concluída.")
+        exit()
+
+    if MODO_STREAMING:
+        gerar_dados_em_streaming(
+            df_produtos,
+            N_CLIENTES_TARGET,
+            N_VENDAS_A_GERAR,
+            FRACAO_DEVOLUCAO,
+            HOJE_DEFINIDO,
+            INICIO_ANO_2025,
+            diretorio_saida_blocos,
+            em_shards=SAIDA_EM_SHARDS,
+            formato=FORMATO_SAIDA,
+        )
+        if registrar_estado and not SAIDA_EM_SHARDS:
+            gravar_estado_geracao(DATA_OUTPUT_DIR, HOJE_DEFINIDO)
+        logging.info("Geração de dados concluída.")
+        exit()
 
     logging.info("Criando IDs de clientes placeholder para geração de vendas...")
     num_ids_placeholder = N_CLIENTES_TARGET * 2
-    ids_clientes_placeholder = [
-        str(fake.unique.uuid4()) for _ in range(num_ids_placeholder)
-    ]
+    ids_clientes_placeholder = gerador_ids.chaves("cliente", num_ids_placeholder)
     df_clientes_placeholder = pd.DataFrame(
         {
             "id_cliente": ids_clientes_placeholder,
@@ -612,7 +2475,10 @@ if __name__ == "__main__":
         }
     )
 
-    df_total_vendas, df_total_itens_venda = gerar_vendas_e_itens(
+    funcao_geracao_vendas = (
+        gerar_vendas_e_itens_vetorizado if MODO_VETORIZADO else gerar_vendas_e_itens
+    )
+    df_total_vendas, df_total_itens_venda = funcao_geracao_vendas(
         df_clientes_placeholder,
         df_produtos,
         N_VENDAS_A_GERAR,
@@ -620,7 +2486,12 @@ if __name__ == "__main__":
         INICIO_ANO_2025,
     )
 
-    df_clientes = gerar_clientes_desde_vendas(df_total_vendas, N_CLIENTES_TARGET)
+    funcao_geracao_clientes = (
+        gerar_clientes_desde_vendas_vetorizado
+        if MODO_VETORIZADO
+        else gerar_clientes_desde_vendas
+    )
+    df_clientes = funcao_geracao_clientes(df_total_vendas, N_CLIENTES_TARGET)
 
     if df_clientes.empty:
         logging.error(
@@ -628,42 +2499,16 @@ if __name__ == "__main__":
         )
         exit()
 
-    logging.info("Filtrando vendas e itens para os clientes finais...")
-    df_vendas_finais = df_total_vendas[
-        df_total_vendas["id_cliente"].isin(df_clientes["id_cliente"])
-    ].copy()
-
-    df_vendas_finais = df_vendas_finais.merge(
-        df_clientes[["id_cliente", "data_cadastro"]],
-        on="id_cliente",
-        suffixes=(
-            "_original_venda",
-            "_cliente",
-        ),
-    )
-
-    coluna_data_cadastro_do_cliente_no_merge = "data_cadastro"
-
-    df_vendas_finais = df_vendas_finais[
-        df_vendas_finais["data_venda"]
-        >= df_vendas_finais[coluna_data_cadastro_do_cliente_no_merge]
-    ]
-    df_vendas_finais.drop(
-        columns=[coluna_data_cadastro_do_cliente_no_merge], inplace=True
+    df_vendas_finais, df_itens_venda_finais = filtrar_vendas_dos_clientes(
+        df_total_vendas, df_total_itens_venda, df_clientes
     )
 
-    df_itens_venda_finais = df_total_itens_venda[
-        df_total_itens_venda["id_venda"].isin(df_vendas_finais["id_venda"])
-    ].copy()
-
-    logging.info(
-        f"Número de vendas finais após filtro de clientes e sanity check: {len(df_vendas_finais)}"
+    funcao_geracao_devolucoes = (
+        gerar_devolucoes_e_itens_vetorizado
+        if MODO_VETORIZADO
+        else gerar_devolucoes_e_itens
     )
-    logging.info(
-        f"Número de itens de venda finais após filtro: {len(df_itens_venda_finais)}"
-    )
-
-    df_devolucoes, df_itens_devolucao = gerar_devolucoes_e_itens(
+    df_devolucoes, df_itens_devolucao = funcao_geracao_devolucoes(
         df_vendas_finais,
         df_itens_venda_finais,
         FRACAO_DEVOLUCAO,
@@ -707,69 +2552,41 @@ if __name__ == "__main__":
     else:
         logging.info("Nenhuma devolução foi gerada ou processada.")
 
-    date_format_csv = "%d/%m/%Y"
-
-    df_clientes_csv = df_clientes.copy()
-    if "data_cadastro" in df_clientes_csv.columns and not df_clientes_csv.empty:
-        df_clientes_csv["data_cadastro"] = pd.to_datetime(
-            df_clientes_csv["data_cadastro"]
-        ).dt.strftime(date_format_csv)
-
-    df_vendas_csv = df_vendas_finais.copy()
-    if "data_venda" in df_vendas_csv.columns and not df_vendas_csv.empty:
-        df_vendas_csv["data_venda"] = pd.to_datetime(
-            df_vendas_csv["data_venda"]
-        ).dt.strftime(date_format_csv)
+    if FORMATO_SAIDA == "parquet":
+        from columnar_output import salvar_tabelas_parquet
 
-    df_devolucoes_csv = df_devolucoes.copy()
-    if not df_devolucoes_csv.empty and "data_devolucao" in df_devolucoes_csv.columns:
-        df_devolucoes_csv["data_devolucao"] = pd.to_datetime(
-            df_devolucoes_csv["data_devolucao"]
-        ).dt.strftime(date_format_csv)
+        tabelas_finais = {
+            "clientes": df_clientes,
+            "produtos": df_produtos,
+            "vendas": df_vendas_finais,
+            "itens_venda": df_itens_venda_finais,
+            "devolucoes": df_devolucoes,
+            "itens_devolucao": df_itens_devolucao,
+        }
+        with instrumentacao.etapa(
+            "salvar_tabelas_parquet", contar_linhas(tabelas_finais)
+        ):
+            salvar_tabelas_parquet(
+                tabelas_finais, DIRETORIO_SAIDA_PARQUET, compacto=MODO_COMPACTO
+            )
+        logging.info("Geração de dados concluída.")
+        exit()
 
     try:
-        if not df_clientes_csv.empty:
-            df_clientes_csv.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "clientes.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not df_produtos.empty:
-            df_produtos.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "produtos.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not df_vendas_csv.empty:
-            df_vendas_csv.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "vendas.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not df_itens_venda_finais.empty:
-            df_itens_venda_finais.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "itens_venda.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not df_devolucoes_csv.empty:
-            df_devolucoes_csv.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "devolucoes.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
-        if not df_itens_devolucao.empty:
-            df_itens_devolucao.to_csv(
-                os.path.join(DATA_OUTPUT_DIR, "itens_devolucao.csv"),
-                sep=";",
-                index=False,
-                encoding="utf-8-sig",
-            )
+        exportar_csvs(
+            {
+                "clientes": (df_clientes, ["data_cadastro"]),
+                "produtos": (df_produtos, []),
+                "vendas": (df_vendas_finais, ["data_venda"]),
+                "itens_venda": (df_itens_venda_finais, []),
+                "devolucoes": (df_devolucoes, ["data_devolucao"]),
+                "itens_devolucao": (df_itens_devolucao, []),
+            },
+            DATA_OUTPUT_DIR,
+            compressao=COMPRESSAO_SAIDA,
+        )
+        if registrar_estado:
+            gravar_estado_geracao(DATA_OUTPUT_DIR, HOJE_DEFINIDO)
         logging.info(f"Dados salvos com sucesso na pasta '{DATA_OUTPUT_DIR}'.")
     except Exception as e:
         logging.error(f"Erro ao salvar arquivos CSV: {e}")
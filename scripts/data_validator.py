@@ -0,0 +1,727 @@
+"""
+Validação fora da memória (out-of-core) da integridade referencial e das regras de negócio
+dos CSVs do projeto, para bloquear cargas de produção com dados inconsistentes.
+
+Cada tabela é lida uma única vez, em blocos tipados (ver csv_reader.py), e as colunas
+usadas pelas regras são particionadas por hash da chave de junção em arquivos Arrow
+temporários (grace hash join). As regras são avaliadas partição a partição: as linhas com
+a mesma chave caem na mesma partição em todas as tabelas, de modo que as junções e
+semi-junções de cada partição somam o mesmo resultado da junção completa, com memória
+limitada a cerca de 1/n_particoes dos dados. Regras com mais de uma junção gravam o
+resultado intermediário já particionado pela chave da junção seguinte.
+
+Regras verificadas (nome no relatório):
+- pk_<tabela>: chave primária sem repetições.
+- fk_<tabela>_<coluna>: chaves estrangeiras do esquema (sql/create_schema.sql ou a variante
+  compacta); valores não nulos devem existir na tabela referenciada.
+- venda_antes_do_cadastro: data_venda anterior à data_cadastro do cliente.
+- prazo_devolucao: data_devolucao fora do intervalo de 1 a 30 dias após a data_venda (exceto
+  no mesmo dia para vendas da última data gerada, que data_generation.py devolve na data
+  final).
+- devolucao_de_venda_cancelada: devolução de uma venda com status 'cancelada'.
+- item_devolvido_de_outra_venda: item de venda que não pertence à venda da devolução.
+- produto_devolvido_divergente: id_produto do item devolvido diferente do item de venda.
+- quantidade_devolvida_excede_vendida: unidades devolvidas de um item (somando todas as
+  devoluções) acima da quantidade vendida.
+- status_venda_divergente: status da venda diferente do esperado pelas devoluções
+  aprovadas ou finalizadas (regra de atualizar_status_venda_pos_devolucao, em
+  data_generation.py).
+
+O relatório traz, por regra, o número de violações e até N_AMOSTRAS linhas de exemplo.
+
+Uso:
+    python scripts/data_validator.py  # tabelas de config/ingestion.json
+    python scripts/data_validator.py --esquema sql/create_schema_compact.sql
+    python scripts/data_validator.py --particoes 128 --relatorio data/validacao.json
+    python scripts/ingestion.py --validar  # valida antes de carregar
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from csv_reader import (
+    CAMINHO_ESQUEMA_SQL,
+    esquema_arrow,
+    ler_csv_tipado_em_blocos,
+    ler_esquema_sql,
+)
+from sales_insights import STATUS_DEVOLUCOES_APROVADAS, STATUS_VENDA_CANCELADA
+
+# Configurações Globais e Constantes
+LINHAS_POR_BLOCO_LEITURA = 500_000
+BYTES_CSV_POR_PARTICAO = 64 << 20  # Alvo de CSV por partição (memória de cada junção)
+N_MAXIMO_PARTICOES = 256  # Arquivos abertos ao mesmo tempo: até 3 * n_particoes
+FATOR_COMPRESSAO_ESTIMADO = 5  # Tamanho estimado do CSV a partir do .gz/.zst
+N_AMOSTRAS = 5
+PRAZO_MINIMO_DEVOLUCAO_DIAS = 1
+PRAZO_MAXIMO_DEVOLUCAO_DIAS = 30  # Prazo máximo de devolução em data_generation.py
+STATUS_DEVOLVIDA_PARCIALMENTE = "devolvida parcialmente"
+STATUS_DEVOLVIDA_TOTALMENTE = "devolvida totalmente"
+SEM_DEVOLUCAO_APROVADA = "sem devolução aprovada"  # Status esperado: não 'devolvida'
+DESCRICOES_REGRAS = {
+    "venda_antes_do_cadastro": "data_venda anterior à data_cadastro do cliente",
+    "prazo_devolucao": f"data_devolucao fora de {PRAZO_MINIMO_DEVOLUCAO_DIAS} a {PRAZO_MAXIMO_DEVOLUCAO_DIAS} dias após a data_venda",
+    "devolucao_de_venda_cancelada": "devolução de venda com status 'cancelada'",
+    "item_devolvido_de_outra_venda": "item devolvido não pertence à venda da devolução",
+    "produto_devolvido_divergente": "id_produto do item devolvido difere do item de venda",
+    "quantidade_devolvida_excede_vendida": "unidades devolvidas do item acima da quantidade vendida",
+    "status_venda_divergente": "status_venda incompatível com as devoluções aprovadas ou finalizadas",
+}
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _particao_por_hash(coluna, n_particoes):
+    """
+    Partição de cada valor da coluna Arrow (hash estável do pandas módulo n_particoes).
+    Nulos viram o valor neutro do tipo ("" ou 0), para que a coluna mantenha o tipo e o
+    hash de um valor seja o mesmo em todas as tabelas.
+    """
+    texto = pa.types.is_string(coluna.type) or pa.types.is_large_string(coluna.type)
+    neutro = "" if texto else 0
+    valores = pc.fill_null(coluna, pa.scalar(neutro, coluna.type))
+    hashes = pd.util.hash_array(valores.to_numpy(zero_copy_only=False))
+    return (hashes % np.uint64(n_particoes)).astype(np.int64)
+
+
+def _contido_em(coluna, valores):
+    """
+    Series.isin pelo pyarrow (pc.is_in): o isin do pandas para texto Arrow converte o
+    conjunto de valores um a um e domina o tempo das semi-junções.
+    """
+    coluna = pa.array(coluna, from_pandas=True)
+    valores = pa.array(valores, type=coluna.type, from_pandas=True)
+    return pc.is_in(coluna, value_set=valores).to_numpy(zero_copy_only=False)
+
+
+class _Particoes:
+    """
+    Tabela particionada por hash de uma coluna em arquivos Arrow (IPC stream), um por
+    partição, abertos sob demanda na primeira escrita.
+
+    Args:
+        diretorio (str): Pasta dos arquivos temporários.
+        nome (str): Nome da tabela (ou do resultado intermediário).
+        chave (str): Coluna de particionamento.
+        colunas (list): Colunas gravadas (devolvidas por ler() mesmo sem linhas).
+        n_particoes (int): Número de partições.
+        esquema (pa.Schema, optional): Tipos das colunas. Padrão: os do primeiro bloco
+            gravado; os blocos seguintes são convertidos para eles.
+    """
+
+    def __init__(self, diretorio, nome, chave, colunas, n_particoes, esquema=None):
+        self.chave = chave
+        self.colunas = list(colunas)
+        self.n_particoes = n_particoes
+        self.esquema = esquema
+        self.linhas = 0
+        self.maximos = {}  # Coluna de data -> maior valor gravado
+        self._caminhos = [
+            os.path.join(diretorio, f"{nome}.{chave}.{i:04d}.arrow")
+            for i in range(n_particoes)
+        ]
+        self._escritores = {}
+
+    def escrever(self, tabela):
+        """Distribui as linhas de um bloco (pa.Table ou pd.DataFrame) pelas partições."""
+        if isinstance(tabela, pd.DataFrame):
+            tabela = pa.Table.from_pandas(tabela, preserve_index=False)
+        tabela = tabela.select(self.colunas)
+        if not tabela.num_rows:
+            return
+        if self.esquema is None:
+            self.esquema = tabela.schema
+        elif tabela.schema != self.esquema:
+            tabela = tabela.cast(self.esquema)
+        for campo in tabela.schema:
+            if pa.types.is_date(campo.type):
+                maximo = pc.max(tabela[campo.name]).as_py()
+                if maximo is not None:
+                    self.maximos[campo.name] = max(
+                        self.maximos.get(campo.name, maximo), maximo
+                    )
+        particoes = _particao_por_hash(tabela[self.chave], self.n_particoes)
+        ordem = np.argsort(particoes, kind="stable")
+        limites = np.searchsorted(particoes[ordem], np.arange(self.n_particoes + 1))
+        tabela = tabela.take(ordem)
+        for i in np.flatnonzero(np.diff(limites)):
+            escritor = self._escritores.get(i)
+            if escritor is None:
+                escritor = pa.ipc.new_stream(self._caminhos[i], self.esquema)
+                self._escritores[i] = escritor
+            escritor.write_table(tabela.slice(limites[i], limites[i + 1] - limites[i]))
+        self.linhas += tabela.num_rows
+
+    def fechar(self):
+        for escritor in self._escritores.values():
+            escritor.close()
+
+    def ler(self, i):
+        """Linhas da partição i (DataFrame vazio, já tipado se possível, se não houver linhas)."""
+        if i not in self._escritores:
+            if self.esquema is None:
+                return pd.DataFrame(columns=self.colunas)
+            return self.esquema.empty_table().to_pandas(date_as_object=False)
+        with pa.OSFile(self._caminhos[i], "rb") as arquivo:
+            tabela = pa.ipc.open_stream(arquivo).read_all()
+        return tabela.to_pandas(date_as_object=False)
+
+
+class _Resultados:
+    """Contagem de violações e primeiras amostras de cada regra, na ordem de registro."""
+
+    def __init__(self, n_amostras):
+        self.n_amostras = n_amostras
+        self.regras = {}
+
+    def registrar(self, regra, descricao, violacoes):
+        resultado = self.regras.setdefault(
+            regra, {"descricao": descricao, "violacoes": 0, "amostras": []}
+        )
+        if violacoes.empty:
+            return
+        resultado["violacoes"] += len(violacoes)
+        faltam = self.n_amostras - sum(len(a) for a in resultado["amostras"])
+        if faltam > 0:
+            resultado["amostras"].append(violacoes.head(faltam))
+
+    def finalizar(self):
+        return {
+            regra: {
+                **resultado,
+                "amostras": (
+                    pd.concat(resultado["amostras"], ignore_index=True)
+                    if resultado["amostras"]
+                    else pd.DataFrame()
+                ),
+            }
+            for regra, resultado in self.regras.items()
+        }
+
+
+def estimar_particoes(tabelas):
+    """
+    Número de partições para que cada uma tenha cerca de BYTES_CSV_POR_PARTICAO de CSV.
+
+    Args:
+        tabelas (dict): Nome da tabela -> caminho do CSV.
+
+    Returns:
+        int: Entre 1 e N_MAXIMO_PARTICOES.
+    """
+    total = sum(
+        os.path.getsize(caminho)
+        * (FATOR_COMPRESSAO_ESTIMADO if caminho.endswith((".gz", ".zst")) else 1)
+        for caminho in tabelas.values()
+    )
+    return int(min(max(1, -(-total // BYTES_CSV_POR_PARTICAO)), N_MAXIMO_PARTICOES))
+
+
+def _colunas_particionadas(esquema):
+    """
+    Colunas de cada tabela a particionar por cada chave: a chave primária (pk_*), as
+    chaves estrangeiras dos dois lados (fk_*) e as junções das regras de negócio.
+
+    Returns:
+        dict: (tabela, chave) -> lista de colunas.
+    """
+    especificacoes = {}
+
+    def adicionar(tabela, chave, *colunas):
+        lista = especificacoes.setdefault((tabela, chave), [chave])
+        lista.extend(c for c in colunas if c not in lista)
+
+    for tabela, definicao in esquema.items():
+        adicionar(tabela, definicao["chave_primaria"])
+        for coluna, tabela_ref, coluna_ref in definicao["chaves_estrangeiras"]:
+            adicionar(tabela, coluna, definicao["chave_primaria"])
+            adicionar(tabela_ref, coluna_ref)
+
+    adicionar("clientes", "id_cliente", "data_cadastro")
+    adicionar("vendas", "id_cliente", "id_venda", "data_venda")
+    adicionar("devolucoes", "id_devolucao", "id_venda", "status_devolucao")
+    adicionar(
+        "itens_devolucao",
+        "id_devolucao",
+        "id_item_devolucao",
+        "id_item_venda",
+        "id_produto",
+        "quantidade_devolvida",
+    )
+    adicionar("itens_venda", "id_item_venda", "id_venda", "id_produto", "quantidade")
+    adicionar("vendas", "id_venda", "status_venda", "data_venda")
+    adicionar("itens_venda", "id_venda", "id_item_venda", "quantidade")
+    adicionar(
+        "devolucoes", "id_venda", "id_devolucao", "data_devolucao", "status_devolucao"
+    )
+    return {
+        (tabela, chave): colunas
+        for (tabela, chave), colunas in especificacoes.items()
+        if tabela in esquema
+    }
+
+
+def particionar_tabelas(tabelas, esquema, diretorio, n_particoes, linhas_por_bloco):
+    """
+    Lê cada tabela uma única vez e grava as colunas de _colunas_particionadas em
+    partições por chave.
+
+    Returns:
+        dict: (tabela, chave) -> _Particoes.
+    """
+    particoes = {}
+    for (tabela, chave), colunas in _colunas_particionadas(esquema).items():
+        # Enums (dicionários no Arrow) são particionados como texto
+        tipos = esquema_arrow(esquema[tabela]["colunas"])
+        particoes[(tabela, chave)] = _Particoes(
+            diretorio,
+            tabela,
+            chave,
+            colunas,
+            n_particoes,
+            pa.schema(
+                [
+                    (
+                        pa.field(coluna, pa.string())
+                        if pa.types.is_dictionary(tipos.field(coluna).type)
+                        else tipos.field(coluna)
+                    )
+                    for coluna in colunas
+                ]
+            ),
+        )
+    for tabela, caminho in tabelas.items():
+        inicio = time.perf_counter()
+        destinos = [p for (nome, _), p in particoes.items() if nome == tabela]
+        linhas = 0
+        try:
+            for bloco in ler_csv_tipado_em_blocos(
+                caminho, esquema[tabela], linhas_por_bloco, como_arrow=True
+            ):
+                for destino in destinos:
+                    destino.escrever(bloco)
+                linhas += bloco.num_rows
+        finally:
+            for destino in destinos:
+                destino.fechar()
+        logging.info(
+            f"Tabela '{tabela}' particionada: {linhas} linhas em {time.perf_counter() - inicio:.1f}s."
+        )
+    return particoes
+
+
+def _validar_chaves(particoes, esquema, resultados, n_particoes):
+    """Regras pk_<tabela> e fk_<tabela>_<coluna>, partição a partição."""
+    for tabela, definicao in esquema.items():
+        chave_primaria = definicao["chave_primaria"]
+        p_tabela = particoes.get((tabela, chave_primaria))
+        if p_tabela is None:
+            continue
+        for i in range(n_particoes):
+            df = p_tabela.ler(i)
+            resultados.registrar(
+                f"pk_{tabela}",
+                f"{chave_primaria} repetido em {tabela}",
+                df[df[chave_primaria].duplicated()],
+            )
+
+    for tabela, definicao in esquema.items():
+        for coluna, tabela_ref, coluna_ref in definicao["chaves_estrangeiras"]:
+            p_filha = particoes.get((tabela, coluna))
+            p_pai = particoes.get((tabela_ref, coluna_ref))
+            if p_filha is None or p_pai is None:
+                continue
+            for i in range(n_particoes):
+                filha = p_filha.ler(i)
+                pai = p_pai.ler(i)
+                resultados.registrar(
+                    f"fk_{tabela}_{coluna}",
+                    f"{tabela}.{coluna} sem correspondente em {tabela_ref}.{coluna_ref}",
+                    filha[
+                        filha[coluna].notna()
+                        & ~_contido_em(filha[coluna], pai[coluna_ref])
+                    ],
+                )
+
+
+def _validar_datas_de_cadastro(particoes, resultados, n_particoes):
+    """venda_antes_do_cadastro, com vendas e clientes particionados por id_cliente."""
+    regra = "venda_antes_do_cadastro"
+    for i in range(n_particoes):
+        vendas = particoes[("vendas", "id_cliente")].ler(i)
+        clientes = particoes[("clientes", "id_cliente")].ler(i)
+        juncao = vendas[["id_venda", "id_cliente", "data_venda"]].merge(
+            clientes[["id_cliente", "data_cadastro"]], on="id_cliente"
+        )
+        resultados.registrar(
+            regra,
+            DESCRICOES_REGRAS[regra],
+            juncao[juncao["data_venda"] < juncao["data_cadastro"]],
+        )
+
+
+def _juntar_itens_devolvidos_com_devolucoes(particoes, diretorio, n_particoes):
+    """
+    Junta itens_devolucao e devolucoes (por id_devolucao) e reparticiona o resultado
+    por id_item_venda, com a venda da devolução e se ela foi aprovada.
+
+    Returns:
+        _Particoes: id_item_devolucao, id_item_venda, id_produto, quantidade_devolvida,
+            id_venda_devolucao e aprovada.
+    """
+    saida = _Particoes(
+        diretorio,
+        "itens_devolvidos",
+        "id_item_venda",
+        [
+            "id_item_devolucao",
+            "id_item_venda",
+            "id_produto",
+            "quantidade_devolvida",
+            "id_venda_devolucao",
+            "aprovada",
+        ],
+        n_particoes,
+    )
+    try:
+        for i in range(n_particoes):
+            itens = particoes[("itens_devolucao", "id_devolucao")].ler(i)
+            devolucoes = particoes[("devolucoes", "id_devolucao")].ler(i)
+            devolucoes = devolucoes.drop_duplicates("id_devolucao").rename(
+                columns={"id_venda": "id_venda_devolucao"}
+            )
+            devolucoes["aprovada"] = (
+                devolucoes["status_devolucao"]
+                .astype(str)
+                .isin(STATUS_DEVOLUCOES_APROVADAS)
+            )
+            juncao = itens.merge(
+                devolucoes[["id_devolucao", "id_venda_devolucao", "aprovada"]],
+                on="id_devolucao",
+            )
+            saida.escrever(juncao)
+    finally:
+        saida.fechar()
+    return saida
+
+
+def _validar_itens_devolvidos(
+    particoes, itens_devolvidos, resultados, diretorio, n_particoes
+):
+    """
+    item_devolvido_de_outra_venda, produto_devolvido_divergente e
+    quantidade_devolvida_excede_vendida, por id_item_venda. Reparticiona por id_venda as
+    unidades devolvidas em devoluções aprovadas de cada item.
+
+    Returns:
+        _Particoes: id_venda, id_item_venda e unidades_aprovadas (itens com devolução aprovada).
+    """
+    saida = _Particoes(
+        diretorio,
+        "unidades_aprovadas",
+        "id_venda",
+        ["id_venda", "id_item_venda", "unidades_aprovadas"],
+        n_particoes,
+    )
+    try:
+        for i in range(n_particoes):
+            itens_venda = (
+                particoes[("itens_venda", "id_item_venda")]
+                .ler(i)
+                .drop_duplicates("id_item_venda")
+            )
+            devolvidos = itens_devolvidos.ler(i)
+            juncao = devolvidos.merge(
+                itens_venda[["id_item_venda", "id_venda", "id_produto", "quantidade"]],
+                on="id_item_venda",
+                suffixes=("", "_venda"),
+            )
+            for regra, violacoes in (
+                (
+                    "item_devolvido_de_outra_venda",
+                    juncao["id_venda"] != juncao["id_venda_devolucao"],
+                ),
+                (
+                    "produto_devolvido_divergente",
+                    juncao["id_produto"] != juncao["id_produto_venda"],
+                ),
+            ):
+                resultados.registrar(
+                    regra,
+                    DESCRICOES_REGRAS[regra],
+                    juncao.loc[violacoes, juncao.columns.drop("aprovada")],
+                )
+
+            juncao["quantidade_devolvida"] = juncao["quantidade_devolvida"].fillna(0)
+            juncao["unidades_aprovadas"] = juncao["quantidade_devolvida"].where(
+                juncao["aprovada"], 0
+            )
+            por_item = juncao.groupby(
+                ["id_item_venda", "id_venda"], as_index=False
+            ).agg(
+                quantidade=("quantidade", "first"),
+                unidades_devolvidas=("quantidade_devolvida", "sum"),
+                unidades_aprovadas=("unidades_aprovadas", "sum"),
+            )
+            regra = "quantidade_devolvida_excede_vendida"
+            resultados.registrar(
+                regra,
+                DESCRICOES_REGRAS[regra],
+                por_item.loc[
+                    por_item["unidades_devolvidas"] > por_item["quantidade"],
+                    [
+                        "id_item_venda",
+                        "id_venda",
+                        "quantidade",
+                        "unidades_devolvidas",
+                    ],
+                ],
+            )
+            saida.escrever(por_item[por_item["unidades_aprovadas"] > 0])
+    finally:
+        saida.fechar()
+    return saida
+
+
+def _status_esperado(itens_venda, unidades_aprovadas):
+    """
+    Status esperado das vendas com itens devolvidos em devoluções aprovadas: 'devolvida
+    totalmente' se todas as unidades de todos os itens voltaram, senão 'devolvida
+    parcialmente' (mesma regra de atualizar_status_venda_pos_devolucao).
+
+    Returns:
+        pd.Series: id_venda -> status esperado.
+    """
+    itens = itens_venda[
+        _contido_em(itens_venda["id_venda"], unidades_aprovadas["id_venda"])
+    ]
+    itens = itens.merge(
+        unidades_aprovadas[["id_item_venda", "unidades_aprovadas"]],
+        on="id_item_venda",
+        how="left",
+    )
+    itens["totalmente_devolvido"] = (
+        itens["unidades_aprovadas"].fillna(0) >= itens["quantidade"]
+    )
+    todos_devolvidos = itens.groupby("id_venda")["totalmente_devolvido"].all()
+    return pd.Series(
+        np.where(
+            todos_devolvidos, STATUS_DEVOLVIDA_TOTALMENTE, STATUS_DEVOLVIDA_PARCIALMENTE
+        ),
+        index=todos_devolvidos.index,
+    )
+
+
+def _validar_vendas(particoes, unidades_aprovadas, resultados, n_particoes):
+    """prazo_devolucao, devolucao_de_venda_cancelada e status_venda_divergente, por id_venda."""
+    data_final = particoes[("vendas", "id_venda")].maximos.get("data_venda")
+    for i in range(n_particoes):
+        vendas = particoes[("vendas", "id_venda")].ler(i).drop_duplicates("id_venda")
+        vendas["status_venda"] = vendas["status_venda"].astype(str)
+        devolucoes = particoes[("devolucoes", "id_venda")].ler(i)
+        juncao = devolucoes[
+            ["id_devolucao", "id_venda", "data_devolucao", "status_devolucao"]
+        ].merge(vendas[["id_venda", "data_venda", "status_venda"]], on="id_venda")
+        prazo = (juncao["data_devolucao"] - juncao["data_venda"]).dt.days
+        no_dia_final = (prazo == 0) & (juncao["data_venda"] == pd.Timestamp(data_final))
+        regra = "prazo_devolucao"
+        resultados.registrar(
+            regra,
+            DESCRICOES_REGRAS[regra],
+            juncao[
+                (
+                    (prazo < PRAZO_MINIMO_DEVOLUCAO_DIAS)
+                    | (prazo > PRAZO_MAXIMO_DEVOLUCAO_DIAS)
+                )
+                & ~no_dia_final
+            ],
+        )
+        regra = "devolucao_de_venda_cancelada"
+        resultados.registrar(
+            regra,
+            DESCRICOES_REGRAS[regra],
+            juncao[juncao["status_venda"] == STATUS_VENDA_CANCELADA],
+        )
+
+        esperado = (
+            vendas["id_venda"]
+            .map(
+                _status_esperado(
+                    particoes[("itens_venda", "id_venda")].ler(i),
+                    unidades_aprovadas.ler(i),
+                )
+            )
+            .fillna(SEM_DEVOLUCAO_APROVADA)
+        )
+        devolvida = vendas["status_venda"].isin(
+            [STATUS_DEVOLVIDA_PARCIALMENTE, STATUS_DEVOLVIDA_TOTALMENTE]
+        )
+        divergente = np.where(
+            esperado == SEM_DEVOLUCAO_APROVADA,
+            devolvida,
+            vendas["status_venda"] != esperado,
+        )
+        regra = "status_venda_divergente"
+        resultados.registrar(
+            regra,
+            DESCRICOES_REGRAS[regra],
+            vendas.loc[divergente, ["id_venda", "status_venda"]].assign(
+                status_esperado=esperado[divergente]
+            ),
+        )
+
+
+def validar_dados(
+    tabelas=None,
+    caminho_esquema=CAMINHO_ESQUEMA_SQL,
+    n_particoes=None,
+    linhas_por_bloco=LINHAS_POR_BLOCO_LEITURA,
+    diretorio_temporario=None,
+    n_amostras=N_AMOSTRAS,
+):
+    """
+    Valida as seis tabelas com junções por partição, em memória limitada.
+
+    Args:
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV. Padrão: config/ingestion.json.
+        caminho_esquema (str): DDL das tabelas (tipos, chaves primárias e estrangeiras).
+        n_particoes (int, optional): Partições por chave. Padrão: estimar_particoes(tabelas).
+        linhas_por_bloco (int): Linhas lidas do CSV por vez.
+        diretorio_temporario (str, optional): Pasta das partições (padrão do sistema).
+        n_amostras (int): Linhas de exemplo guardadas por regra.
+
+    Returns:
+        dict: Regra -> {"descricao", "violacoes", "amostras" (pd.DataFrame)}.
+
+    Raises:
+        ValueError: CSV fora do esquema (cabeçalho, tipos ou restrições; ver csv_reader.py).
+    """
+    if tabelas is None:
+        from ingestion import ler_config_ingestao
+
+        tabelas = ler_config_ingestao()
+    esquema = ler_esquema_sql(caminho_esquema)
+    esquema = {tabela: esquema[tabela] for tabela in tabelas}
+    n_particoes = n_particoes or estimar_particoes(tabelas)
+    logging.info(
+        f"Validando {len(tabelas)} tabelas em {n_particoes} partições por chave..."
+    )
+    inicio = time.perf_counter()
+    resultados = _Resultados(n_amostras)
+    with tempfile.TemporaryDirectory(
+        prefix="validacao_", dir=diretorio_temporario
+    ) as diretorio:
+        particoes = particionar_tabelas(
+            tabelas, esquema, diretorio, n_particoes, linhas_por_bloco
+        )
+        _validar_chaves(particoes, esquema, resultados, n_particoes)
+        completas = {
+            "clientes",
+            "produtos",
+            "vendas",
+            "itens_venda",
+            "devolucoes",
+            "itens_devolucao",
+        }
+        if completas - set(tabelas):
+            logging.warning(
+                "Regras de negócio ignoradas: exigem as seis tabelas do projeto."
+            )
+        else:
+            _validar_datas_de_cadastro(particoes, resultados, n_particoes)
+            itens_devolvidos = _juntar_itens_devolvidos_com_devolucoes(
+                particoes, diretorio, n_particoes
+            )
+            unidades_aprovadas = _validar_itens_devolvidos(
+                particoes, itens_devolvidos, resultados, diretorio, n_particoes
+            )
+            _validar_vendas(particoes, unidades_aprovadas, resultados, n_particoes)
+    resultados = resultados.finalizar()
+    n_violacoes = sum(r["violacoes"] for r in resultados.values())
+    logging.info(
+        f"Validação concluída em {time.perf_counter() - inicio:.1f}s: {len(resultados)} regras, {n_violacoes} violações."
+    )
+    return resultados
+
+
+def relatorio_validacao(resultados):
+    """Resultados de validar_dados em formato serializável (amostras como registros)."""
+    return {
+        regra: {
+            "descricao": resultado["descricao"],
+            "violacoes": resultado["violacoes"],
+            "amostras": json.loads(
+                resultado["amostras"].to_json(orient="records", date_format="iso")
+            ),
+        }
+        for regra, resultado in resultados.items()
+    }
+
+
+def registrar_resultados(resultados):
+    """Registra no log a contagem de cada regra e as amostras das regras violadas."""
+    for regra, resultado in resultados.items():
+        if not resultado["violacoes"]:
+            logging.info(f"{regra}: ok")
+            continue
+        logging.error(
+            f"{regra}: {resultado['violacoes']} violações ({resultado['descricao']}). Amostras:\n"
+            f"{resultado['amostras'].to_string(index=False)}"
+        )
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Valida integridade referencial e regras de negócio dos CSVs, fora da memória."
+    )
+    parser.add_argument("--config", help="Padrão: config/ingestion.json.")
+    parser.add_argument("--esquema", default=CAMINHO_ESQUEMA_SQL)
+    parser.add_argument(
+        "--particoes", type=int, help="Partições por chave (padrão: pelo tamanho)."
+    )
+    parser.add_argument(
+        "--linhas-por-bloco", type=int, default=LINHAS_POR_BLOCO_LEITURA
+    )
+    parser.add_argument("--diretorio-temporario")
+    parser.add_argument("--amostras", type=int, default=N_AMOSTRAS)
+    parser.add_argument("--relatorio", help="Grava o relatório neste arquivo JSON.")
+    return parser.parse_args()
+
+
+# Fluxo Principal da Validação
+if __name__ == "__main__":
+    from ingestion import CAMINHO_CONFIG_INGESTAO, ler_config_ingestao
+
+    argumentos = _ler_argumentos()
+    try:
+        resultados = validar_dados(
+            ler_config_ingestao(argumentos.config or CAMINHO_CONFIG_INGESTAO),
+            argumentos.esquema,
+            argumentos.particoes,
+            argumentos.linhas_por_bloco,
+            argumentos.diretorio_temporario,
+            argumentos.amostras,
+        )
+    except (OSError, ValueError) as e:
+        logging.error(f"Erro na validação dos dados: {e}")
+        exit(1)
+
+    registrar_resultados(resultados)
+    if argumentos.relatorio:
+        with open(argumentos.relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump(
+                relatorio_validacao(resultados), arquivo, indent=2, ensure_ascii=False
+            )
+        logging.info(f"Relatório de validação salvo em '{argumentos.relatorio}'.")
+    if any(resultado["violacoes"] for resultado in resultados.values()):
+        exit(1)
+    exit()
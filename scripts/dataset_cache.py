@@ -0,0 +1,247 @@
+"""
+Cache em disco das tabelas já convertidas, em arquivos Arrow/Feather mapeados em memória.
+
+A primeira leitura de um CSV passa pelo leitor tipado (csv_reader.py) e grava o resultado em
+data/.cache/ no formato Feather (Arrow IPC) sem compressão. As leituras seguintes apenas
+mapeiam esse arquivo em memória: o sistema operacional carrega as páginas sob demanda e
+compartilha o mesmo cache de páginas entre sessões e analistas, sem nova conversão.
+
+Cada arquivo de cache guarda, nos metadados do próprio esquema Arrow, a chave do arquivo de
+origem (tamanho, mtime e hash BLAKE2b do conteúdo) e uma assinatura do esquema da tabela.
+O tamanho e o mtime são conferidos a cada leitura; o hash só é recalculado quando o mtime
+muda com o tamanho igual (ex.: arquivo restaurado ou copiado). Se a origem mudou, o cache é
+refeito automaticamente. A gravação usa um arquivo temporário e os.replace, então uma sessão
+nunca lê um cache pela metade.
+
+Uso:
+    from dataset_cache import carregar_dados
+
+    tabelas = carregar_dados()  # dict nome -> DataFrame
+    vendas = carregar_dados(["vendas"], saida="arrow")["vendas"]  # pa.Table sem cópia
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from csv_reader import (
+    DIRETORIO_RAIZ,
+    esquema_arrow,
+    ler_csv_tipado_em_blocos,
+    ler_esquema_sql,
+)
+
+# Configurações Globais e Constantes
+DIRETORIO_CACHE = os.path.join(DIRETORIO_RAIZ, "data", ".cache")
+VERSAO_CACHE = "1"  # Incrementar quando o formato do cache ou do leitor mudar
+BYTES_POR_LEITURA_HASH = 8 << 20
+CHAVE_METADADOS_CACHE = b"cosmolume_cache"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _hash_arquivo(caminho_arquivo):
+    """Hash BLAKE2b do conteúdo do arquivo, lido em pedaços."""
+    resumo = hashlib.blake2b(digest_size=20)
+    with open(caminho_arquivo, "rb") as arquivo:
+        while pedaco := arquivo.read(BYTES_POR_LEITURA_HASH):
+            resumo.update(pedaco)
+    return resumo.hexdigest()
+
+
+def _assinatura_esquema(definicao_tabela):
+    """Identifica os tipos da tabela: mudar create_schema.sql invalida o cache."""
+    conteudo = json.dumps(
+        [VERSAO_CACHE, definicao_tabela["colunas"], definicao_tabela["chave_primaria"]],
+        sort_keys=True,
+    )
+    return hashlib.blake2b(conteudo.encode(), digest_size=8).hexdigest()
+
+
+def _caminho_cache(diretorio_cache, nome_tabela, caminho_arquivo):
+    """Um arquivo de cache por tabela e por arquivo de origem."""
+    origem = hashlib.blake2b(
+        os.path.abspath(caminho_arquivo).encode(), digest_size=6
+    ).hexdigest()
+    return os.path.join(diretorio_cache, f"{nome_tabela}-{origem}.feather")
+
+
+def _ler_metadados_cache(caminho_cache):
+    """Retorna a chave gravada em um arquivo de cache, ou None se ele não existir/for inválido."""
+    try:
+        with pa.memory_map(caminho_cache) as mapa:
+            metadados = pa.ipc.open_file(mapa).schema.metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    if CHAVE_METADADOS_CACHE not in metadados:
+        return None
+    return json.loads(metadados[CHAVE_METADADOS_CACHE])
+
+
+def _gravar_cache(caminho_arquivo, definicao_tabela, caminho_cache, chave):
+    """
+    Converte o CSV em blocos (memória limitada ao bloco) e grava o Feather sem compressão,
+    com a chave da origem nos metadados do esquema. A troca do arquivo é atômica.
+    """
+    diretorio_cache = os.path.dirname(caminho_cache)
+    os.makedirs(diretorio_cache, exist_ok=True)
+    descritor, caminho_temporario = tempfile.mkstemp(dir=diretorio_cache, suffix=".tmp")
+    os.close(descritor)
+    metadados = {CHAVE_METADADOS_CACHE: json.dumps(chave).encode()}
+    escritor = None
+    try:
+        for bloco in ler_csv_tipado_em_blocos(
+            caminho_arquivo, definicao_tabela, como_arrow=True
+        ):
+            if escritor is None:
+                escritor = pa.ipc.new_file(
+                    caminho_temporario, bloco.schema.with_metadata(metadados)
+                )
+            escritor.write_table(bloco)
+        if escritor is None:
+            escritor = pa.ipc.new_file(
+                caminho_temporario,
+                esquema_arrow(definicao_tabela["colunas"]).with_metadata(metadados),
+            )
+        escritor.close()
+        os.replace(caminho_temporario, caminho_cache)
+    except BaseException:
+        if escritor is not None:
+            escritor.close()
+        os.remove(caminho_temporario)
+        raise
+
+
+def _regravar_metadados(caminho_cache, tabela_arrow, chave):
+    """Regrava o cache com a chave atualizada (mesmos dados), de forma atômica."""
+    descritor, caminho_temporario = tempfile.mkstemp(
+        dir=os.path.dirname(caminho_cache), suffix=".tmp"
+    )
+    os.close(descritor)
+    try:
+        feather.write_feather(
+            tabela_arrow.replace_schema_metadata(
+                {CHAVE_METADADOS_CACHE: json.dumps(chave).encode()}
+            ),
+            caminho_temporario,
+            compression="uncompressed",
+        )
+        os.replace(caminho_temporario, caminho_cache)
+    except BaseException:
+        os.remove(caminho_temporario)
+        raise
+
+
+def carregar_tabela_em_cache(
+    caminho_arquivo,
+    definicao_tabela,
+    nome_tabela,
+    diretorio_cache=DIRETORIO_CACHE,
+    saida="pandas",
+):
+    """
+    Lê uma tabela pelo cache, refazendo-o se a origem ou o esquema mudaram.
+
+    Args:
+        caminho_arquivo (str): CSV de origem.
+        definicao_tabela (dict): Definição da tabela em ler_esquema_sql.
+        nome_tabela (str): Nome da tabela (usado no nome do arquivo de cache).
+        diretorio_cache (str): Pasta dos arquivos de cache.
+        saida (str): "arrow" (pa.Table mapeada em memória, sem cópia), "pandas_arrow"
+            (DataFrame com colunas pd.ArrowDtype apoiadas nos mesmos buffers) ou "pandas"
+            (DataFrame com tipos NumPy; converte e copia os dados).
+
+    Returns:
+        pa.Table ou pd.DataFrame: Tabela tipada.
+    """
+    if saida not in ("arrow", "pandas_arrow", "pandas"):
+        raise ValueError(
+            f"Saída '{saida}' não suportada. Use 'arrow', 'pandas_arrow' ou 'pandas'."
+        )
+
+    caminho_cache = _caminho_cache(diretorio_cache, nome_tabela, caminho_arquivo)
+    estado = os.stat(caminho_arquivo)
+    assinatura_esquema = _assinatura_esquema(definicao_tabela)
+    chave_gravada = _ler_metadados_cache(caminho_cache)
+
+    valido = (
+        chave_gravada is not None
+        and chave_gravada["esquema"] == assinatura_esquema
+        and chave_gravada["tamanho"] == estado.st_size
+    )
+    if valido and chave_gravada["mtime_ns"] != estado.st_mtime_ns:
+        valido = chave_gravada["hash"] == _hash_arquivo(caminho_arquivo)
+        if valido:
+            # Mesmo conteúdo com outro mtime: a próxima leitura não precisa do hash.
+            chave_gravada["mtime_ns"] = estado.st_mtime_ns
+            tabela_atual = feather.read_table(caminho_cache, memory_map=True)
+            _regravar_metadados(caminho_cache, tabela_atual, chave_gravada)
+
+    if not valido:
+        motivo = "criado" if chave_gravada is None else "atualizado"
+        chave = {
+            "arquivo": os.path.abspath(caminho_arquivo),
+            "tamanho": estado.st_size,
+            "mtime_ns": estado.st_mtime_ns,
+            "hash": _hash_arquivo(caminho_arquivo),
+            "esquema": assinatura_esquema,
+        }
+        _gravar_cache(caminho_arquivo, definicao_tabela, caminho_cache, chave)
+        logging.info(f"Cache da tabela {nome_tabela} {motivo}: '{caminho_cache}'.")
+
+    tabela_arrow = feather.read_table(caminho_cache, memory_map=True)
+    if saida == "arrow":
+        return tabela_arrow
+    if saida == "pandas_arrow":
+        return tabela_arrow.to_pandas(types_mapper=pd.ArrowDtype)
+    return tabela_arrow.to_pandas(date_as_object=False)
+
+
+def carregar_dados(
+    nomes_tabelas=None,
+    tabelas=None,
+    esquema=None,
+    diretorio_cache=DIRETORIO_CACHE,
+    saida="pandas",
+):
+    """
+    Lê as tabelas de config/ingestion.json (ou de `tabelas`) pelo cache.
+
+    Args:
+        nomes_tabelas (iterable, optional): Tabelas a ler. Padrão: todas da configuração.
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV. Padrão: ler_config_ingestao().
+        esquema (dict, optional): Esquema de ler_esquema_sql. Padrão: sql/create_schema.sql.
+        diretorio_cache (str): Pasta dos arquivos de cache.
+        saida (str): Ver carregar_tabela_em_cache.
+
+    Returns:
+        dict: Nome da tabela -> tabela tipada.
+    """
+    if tabelas is None:
+        from ingestion import ler_config_ingestao
+
+        tabelas = ler_config_ingestao()
+    esquema = esquema or ler_esquema_sql()
+    nomes_tabelas = list(nomes_tabelas or tabelas)
+    return {
+        nome: carregar_tabela_em_cache(
+            tabelas[nome], esquema[nome], nome, diretorio_cache, saida
+        )
+        for nome in nomes_tabelas
+    }
+
+
+def limpar_cache(diretorio_cache=DIRETORIO_CACHE):
+    """Remove todos os arquivos de cache."""
+    if not os.path.isdir(diretorio_cache):
+        return
+    for nome_arquivo in os.listdir(diretorio_cache):
+        if nome_arquivo.endswith((".feather", ".tmp")):
+            os.remove(os.path.join(diretorio_cache, nome_arquivo))
+    logging.info(f"Cache em '{diretorio_cache}' removido.")
@@ -0,0 +1,728 @@
+"""
+Produtor assíncrono (asyncio) de eventos de pedidos e devoluções, para testes de carga.
+
+Os eventos seguem o modelo de data_generation.py: as vendas e seus itens são sorteados
+por gerar_vendas_e_itens_vetorizado (produtos, canais e status), e as devoluções por
+gerar_devolucoes_e_itens_vetorizado (fração das vendas concluídas, prazo de 2 a 30 dias,
+motivos e status). Clientes e produtos vêm de uma geração anterior (data/), e o relógio
+simulado começa no dia seguinte à última data gerada (ver ler_estado_geracao), avançando
+DIAS_SIMULADOS_POR_SEGUNDO dias por segundo real. Cada devolução é agendada na geração da
+venda e emitida quando o relógio simulado alcança a sua data, junto com o novo status da
+venda (atualizar_status_venda_pos_devolucao).
+
+Tipos de evento:
+- venda: cabeçalho da venda e seus itens.
+- devolucao: cabeçalho da devolução, seus itens e o novo status da venda, se alterado.
+
+Controle de taxa e backpressure: a cada tick, o produtor emite os eventos devidos para
+manter a taxa alvo (eventos/s) e coloca o lote em uma fila limitada (CAPACIDADE_FILA
+lotes). Se o sumidouro não acompanha, a fila enche e o produtor espera, de modo que a
+memória não cresce; o tempo bloqueado é medido e o relatório final compara a taxa
+alcançada com a alvo.
+
+Sumidouros (--destino):
+- arquivo:caminho.jsonl: um evento JSON por linha, acrescentado ao arquivo.
+- sqlite:///arquivo.db, duckdb:///arquivo.duckdb, mysql+pymysql://...: INSERTs nas tabelas
+  de sql/create_schema.sql e UPDATE do status das vendas, uma transação por lote. O banco
+  precisa conter os clientes e produtos (ex.: carregados antes com ingestion.py).
+- socket://host:porta: JSON por linha em uma conexão TCP (backpressure pelo drain()).
+- fila: asyncio.Queue limitada em processo, consumida por um consumidor de teste
+  (--atraso-consumidor simula um consumidor lento).
+
+Uso:
+    python scripts/event_producer.py --destino arquivo:data/eventos.jsonl --eventos-por-segundo 500
+    python scripts/event_producer.py --destino sqlite:///data/cosmolume.db --duracao 60
+    python scripts/event_producer.py --destino socket://127.0.0.1:9009
+    python scripts/event_producer.py --destino fila --atraso-consumidor 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import data_generation as geracao
+from csv_reader import DIRETORIO_RAIZ
+from ingestion import conectar
+
+# Configurações Globais e Constantes
+DIRETORIO_DADOS = os.path.join(DIRETORIO_RAIZ, "data")
+EVENTOS_POR_SEGUNDO_PADRAO = 500
+DURACAO_PADRAO = 30  # Segundos de produção
+DIAS_SIMULADOS_POR_SEGUNDO = 1.0  # Velocidade do relógio simulado
+INTERVALO_TICK = 0.05  # Segundos entre lotes
+MAXIMO_EVENTOS_POR_LOTE = 5_000  # Limita a recuperação após um período bloqueado
+CAPACIDADE_FILA = 32  # Lotes aguardando o sumidouro antes de bloquear o produtor
+CAPACIDADE_FILA_EVENTOS = 1_000  # Eventos em espera no sumidouro "fila"
+INTERVALO_PROGRESSO = 5  # Segundos entre mensagens de progresso
+PRAZO_MAXIMO_DEVOLUCAO = 30  # Dias; mesmo limite de gerar_devolucoes_e_itens_vetorizado
+NAMESPACE_EVENTOS = 2**16 - 1  # Fora dos namespaces da geração paralela e incremental
+TABELAS_EVENTOS = ["vendas", "itens_venda", "devolucoes", "itens_devolucao"]
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+@contextmanager
+def _sem_logs_da_geracao():
+    """
+    Silencia os logs INFO e WARNING das funções de geração, chamadas a cada tick (ex.:
+    lotes pequenos sem vendas concluídas para devolução).
+    """
+    logging.disable(logging.WARNING)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _lote_vazio():
+    """Lote sem eventos: DataFrames vazios das tabelas e das atualizações de status."""
+    lote = {nome: pd.DataFrame() for nome in TABELAS_EVENTOS}
+    lote["status_venda"] = pd.DataFrame(columns=["id_venda", "status_venda"])
+    return lote
+
+
+def contar_eventos(lote):
+    """Número de eventos de um lote (vendas e devoluções)."""
+    return len(lote["vendas"]) + len(lote["devolucoes"])
+
+
+class ProdutorEventos:
+    """
+    Gera lotes de eventos de venda e devolução sobre clientes e produtos existentes.
+
+    Args:
+        df_clientes (pd.DataFrame): Clientes com 'id_cliente' e 'data_cadastro'.
+        df_produtos (pd.DataFrame): Produtos com 'id_produto' e 'preco'.
+        data_inicial (datetime.date): Primeiro dia do relógio simulado.
+        dias_por_segundo (float): Dias simulados por segundo real.
+        semente (int, optional): Semente dos sorteios e dos IDs. Padrão: derivada do
+            relógio, para que execuções repetidas no mesmo banco não colidam.
+        fracao_devolucao (float, optional): Padrão: FRACAO_DEVOLUCAO de data_generation.py.
+    """
+
+    def __init__(
+        self,
+        df_clientes,
+        df_produtos,
+        data_inicial,
+        dias_por_segundo=DIAS_SIMULADOS_POR_SEGUNDO,
+        semente=None,
+        fracao_devolucao=None,
+    ):
+        self.df_clientes = df_clientes[["id_cliente", "data_cadastro"]]
+        self.df_produtos = df_produtos
+        self.data_inicial = data_inicial
+        self.dias_por_segundo = dias_por_segundo
+        self.semente = time.time_ns() % 2**63 if semente is None else semente
+        self.fracao_devolucao = (
+            geracao.FRACAO_DEVOLUCAO if fracao_devolucao is None else fracao_devolucao
+        )
+        self.rng = np.random.default_rng(self.semente)
+        compacto = pd.api.types.is_integer_dtype(df_clientes["id_cliente"])
+        # As funções de geração usam o gerador de IDs do módulo
+        geracao.gerador_ids = geracao.GeradorIds(
+            self.semente, namespace=NAMESPACE_EVENTOS, compacto=compacto
+        )
+
+        self._devolucoes_pendentes = pd.DataFrame()
+        self._itens_devolucao_pendentes = pd.DataFrame()
+        self._itens_venda_pendentes = pd.DataFrame()
+
+    def dia_simulado(self, segundos_decorridos):
+        """Data do relógio simulado após segundos_decorridos de produção."""
+        return self.data_inicial + timedelta(
+            days=int(segundos_decorridos * self.dias_por_segundo)
+        )
+
+    @property
+    def devolucoes_pendentes(self):
+        """Devoluções agendadas ainda não emitidas."""
+        return len(self._devolucoes_pendentes)
+
+    def _gerar_vendas(self, n_vendas, dia):
+        """Gera n_vendas no dia e agenda as devoluções correspondentes."""
+        with _sem_logs_da_geracao():
+            df_vendas, df_itens_venda = geracao.gerar_vendas_e_itens_vetorizado(
+                self.df_clientes, self.df_produtos, n_vendas, dia, dia, rng=self.rng
+            )
+            # A geração arredonda fração x vendas concluídas; em lotes pequenos isso
+            # zeraria as devoluções, então o número é sorteado (arredondamento
+            # estocástico) e a fração ajustada para produzi-lo
+            n_concluidas = int((df_vendas["status_venda"] == "concluída").sum())
+            n_devolucoes = int(
+                np.floor(self.fracao_devolucao * n_concluidas + self.rng.random())
+            )
+            df_devolucoes, df_itens_devolucao = (
+                geracao.gerar_devolucoes_e_itens_vetorizado(
+                    df_vendas,
+                    df_itens_venda,
+                    n_devolucoes / max(n_concluidas, 1),
+                    dia + timedelta(days=PRAZO_MAXIMO_DEVOLUCAO),
+                    dia,
+                    rng=self.rng,
+                )
+            )
+        if not df_devolucoes.empty:
+            self._devolucoes_pendentes = pd.concat(
+                [self._devolucoes_pendentes, df_devolucoes], ignore_index=True
+            )
+            self._itens_devolucao_pendentes = pd.concat(
+                [self._itens_devolucao_pendentes, df_itens_devolucao],
+                ignore_index=True,
+            )
+            # Itens das vendas com devolução, necessários para o novo status da venda
+            self._itens_venda_pendentes = pd.concat(
+                [
+                    self._itens_venda_pendentes,
+                    df_itens_venda[
+                        df_itens_venda["id_venda"].isin(df_devolucoes["id_venda"])
+                    ],
+                ],
+                ignore_index=True,
+            )
+        return df_vendas, df_itens_venda
+
+    def _emitir_devolucoes_vencidas(self, dia):
+        """
+        Retira da agenda as devoluções com data até o dia simulado e calcula o novo
+        status das vendas afetadas.
+        """
+        if self._devolucoes_pendentes.empty:
+            return pd.DataFrame(), pd.DataFrame(), _lote_vazio()["status_venda"]
+        vencidas = self._devolucoes_pendentes["data_devolucao"] <= pd.Timestamp(dia)
+        if not vencidas.any():
+            return pd.DataFrame(), pd.DataFrame(), _lote_vazio()["status_venda"]
+
+        df_devolucoes = self._devolucoes_pendentes[vencidas]
+        self._devolucoes_pendentes = self._devolucoes_pendentes[~vencidas]
+        itens_vencidos = self._itens_devolucao_pendentes["id_devolucao"].isin(
+            df_devolucoes["id_devolucao"]
+        )
+        df_itens_devolucao = self._itens_devolucao_pendentes[itens_vencidos]
+        self._itens_devolucao_pendentes = self._itens_devolucao_pendentes[
+            ~itens_vencidos
+        ]
+        itens_das_vendas = self._itens_venda_pendentes["id_venda"].isin(
+            df_devolucoes["id_venda"]
+        )
+        df_itens_venda = self._itens_venda_pendentes[itens_das_vendas]
+        self._itens_venda_pendentes = self._itens_venda_pendentes[~itens_das_vendas]
+
+        # Só vendas concluídas geram devolução, então o status anterior é conhecido
+        df_vendas = pd.DataFrame(
+            {
+                "id_venda": df_devolucoes["id_venda"].to_numpy(),
+                "status_venda": "concluída",
+            }
+        )
+        with _sem_logs_da_geracao():
+            df_vendas = geracao.atualizar_status_venda_pos_devolucao(
+                df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
+            )
+        df_status = df_vendas[df_vendas["status_venda"] != "concluída"]
+        return df_devolucoes, df_itens_devolucao, df_status.reset_index(drop=True)
+
+    def proximo_lote(self, n_eventos, dia):
+        """
+        Monta um lote com as devoluções vencidas até o dia e vendas suficientes para
+        completar n_eventos (as devoluções vencidas são sempre emitidas).
+
+        Args:
+            n_eventos (int): Eventos desejados no lote.
+            dia (datetime.date): Dia simulado das vendas.
+
+        Returns:
+            dict: Tabela -> DataFrame (TABELAS_EVENTOS e 'status_venda').
+        """
+        df_devolucoes, df_itens_devolucao, df_status = self._emitir_devolucoes_vencidas(
+            dia
+        )
+        lote = _lote_vazio()
+        lote.update(
+            devolucoes=df_devolucoes,
+            itens_devolucao=df_itens_devolucao,
+            status_venda=df_status,
+        )
+        n_vendas = n_eventos - len(df_devolucoes)
+        if n_vendas > 0:
+            lote["vendas"], lote["itens_venda"] = self._gerar_vendas(n_vendas, dia)
+        return lote
+
+
+def _registros(df, coluna_agrupamento=None):
+    """
+    Converte um DataFrame em dicionários serializáveis em JSON (datas em ISO). Com
+    coluna_agrupamento, devolve chave -> lista de registros.
+    """
+    if df.empty:
+        return {} if coluna_agrupamento else []
+    df = df.copy()
+    for coluna in df.select_dtypes(include="datetime").columns:
+        df[coluna] = df[coluna].dt.strftime("%Y-%m-%d")
+    registros = df.astype(object).to_dict("records")
+    if coluna_agrupamento is None:
+        return registros
+    agrupados = {}
+    for registro in registros:
+        agrupados.setdefault(registro[coluna_agrupamento], []).append(registro)
+    return agrupados
+
+
+def eventos_json(lote):
+    """
+    Linhas JSON (uma por evento) de um lote: vendas com seus itens e devoluções com seus
+    itens e o novo status da venda.
+    """
+    emitido_em = time.time()
+    itens_por_venda = _registros(lote["itens_venda"], "id_venda")
+    itens_por_devolucao = _registros(lote["itens_devolucao"], "id_devolucao")
+    status_por_venda = dict(
+        zip(lote["status_venda"]["id_venda"], lote["status_venda"]["status_venda"])
+    )
+    linhas = []
+    for venda in _registros(lote["vendas"]):
+        evento = {
+            "tipo": "venda",
+            "emitido_em": emitido_em,
+            "venda": venda,
+            "itens": itens_por_venda.get(venda["id_venda"], []),
+        }
+        linhas.append(json.dumps(evento, ensure_ascii=False, default=str))
+    for devolucao in _registros(lote["devolucoes"]):
+        evento = {
+            "tipo": "devolucao",
+            "emitido_em": emitido_em,
+            "devolucao": devolucao,
+            "itens": itens_por_devolucao.get(devolucao["id_devolucao"], []),
+            "status_venda": status_por_venda.get(devolucao["id_venda"]),
+        }
+        linhas.append(json.dumps(evento, ensure_ascii=False, default=str))
+    return linhas
+
+
+class Sumidouro:
+    """Destino dos lotes de eventos. As subclasses implementam gravar()."""
+
+    async def abrir(self):
+        """Abre o destino (conexão, arquivo ou socket)."""
+
+    async def gravar(self, lote):
+        """Grava um lote de eventos."""
+        raise NotImplementedError
+
+    async def fechar(self):
+        """Fecha o destino, depois que todos os lotes foram gravados."""
+
+
+class SumidouroArquivo(Sumidouro):
+    """Acrescenta os eventos, um JSON por linha, a um arquivo (escrita em uma thread)."""
+
+    def __init__(self, caminho_arquivo):
+        self.caminho_arquivo = caminho_arquivo
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._arquivo = None
+
+    async def abrir(self):
+        diretorio = os.path.dirname(self.caminho_arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._arquivo = open(self.caminho_arquivo, "a", encoding="utf-8")
+
+    async def gravar(self, lote):
+        linhas = eventos_json(lote)
+        if linhas:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._arquivo.write, "\n".join(linhas) + "\n"
+            )
+
+    async def fechar(self):
+        self._executor.shutdown()
+        self._arquivo.close()
+
+
+class SumidouroBanco(Sumidouro):
+    """
+    Insere os eventos nas tabelas do banco (URL no formato de ingestion.py) e atualiza o
+    status das vendas, em uma transação por lote. A conexão DB-API é usada sempre pela
+    mesma thread.
+    """
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.dialeto = destino.split(":", 1)[0].split("+", 1)[0].lower()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._conexao = None
+
+    async def abrir(self):
+        self._conexao = await asyncio.get_running_loop().run_in_executor(
+            self._executor, conectar, self.destino
+        )
+
+    def _inserir(self, tabela, df):
+        """Insere as linhas de df na tabela (DataFrame registrado no DuckDB)."""
+        colunas = ", ".join(df.columns)
+        if self.dialeto == "duckdb":
+            self._conexao.register("lote_eventos", df)
+            try:
+                self._conexao.execute(
+                    f"INSERT INTO {tabela} ({colunas}) SELECT {colunas} FROM lote_eventos"
+                )
+            finally:
+                self._conexao.unregister("lote_eventos")
+            return
+        for coluna in df.select_dtypes(include="datetime").columns:
+            df = df.assign(**{coluna: df[coluna].dt.strftime("%Y-%m-%d")})
+        marcador = "%s" if self.dialeto == "mysql" else "?"
+        cursor = self._conexao.cursor()
+        cursor.executemany(
+            f"INSERT INTO {tabela} ({colunas}) VALUES ({', '.join([marcador] * len(df.columns))})",
+            list(df.astype(object).itertuples(index=False, name=None)),
+        )
+
+    def _gravar_lote(self, lote):
+        cursor = self._conexao if self.dialeto == "duckdb" else self._conexao.cursor()
+        if self.dialeto == "duckdb":
+            cursor.execute("BEGIN TRANSACTION")
+        try:
+            for tabela in TABELAS_EVENTOS:
+                if not lote[tabela].empty:
+                    self._inserir(tabela, lote[tabela])
+            if not lote["status_venda"].empty:
+                marcador = "%s" if self.dialeto == "mysql" else "?"
+                cursor.executemany(
+                    f"UPDATE vendas SET status_venda = {marcador} WHERE id_venda = {marcador}",
+                    list(
+                        lote["status_venda"][["status_venda", "id_venda"]]
+                        .astype(object)
+                        .itertuples(index=False, name=None)
+                    ),
+                )
+            self._conexao.commit()
+        except Exception:
+            self._conexao.rollback()
+            raise
+
+    async def gravar(self, lote):
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._gravar_lote, lote
+        )
+
+    async def fechar(self):
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._conexao.close
+        )
+        self._executor.shutdown()
+
+
+class SumidouroSocket(Sumidouro):
+    """Envia os eventos, um JSON por linha, por TCP. O drain() propaga o backpressure."""
+
+    def __init__(self, host, porta):
+        self.host = host
+        self.porta = porta
+        self._escritor = None
+
+    async def abrir(self):
+        _, self._escritor = await asyncio.open_connection(self.host, self.porta)
+
+    async def gravar(self, lote):
+        linhas = eventos_json(lote)
+        if linhas:
+            self._escritor.write(("\n".join(linhas) + "\n").encode("utf-8"))
+            await self._escritor.drain()
+
+    async def fechar(self):
+        self._escritor.close()
+        await self._escritor.wait_closed()
+
+
+class SumidouroFila(Sumidouro):
+    """
+    Substituto local de uma fila de mensagens: coloca cada evento (JSON) em uma
+    asyncio.Queue limitada. Se nenhum consumidor for informado, um consumidor de teste
+    retira os eventos, esperando atraso_consumidor segundos por evento.
+
+    Args:
+        capacidade (int): Eventos na fila antes de bloquear o produtor.
+        atraso_consumidor (float): Atraso por evento do consumidor de teste.
+        consumidor (callable, optional): Corrotina consumidor(fila) que substitui o de teste.
+    """
+
+    def __init__(
+        self, capacidade=CAPACIDADE_FILA_EVENTOS, atraso_consumidor=0.0, consumidor=None
+    ):
+        self.fila = asyncio.Queue(maxsize=capacidade)
+        self.atraso_consumidor = atraso_consumidor
+        self.consumidor = consumidor or self._consumidor_de_teste
+        self.eventos_consumidos = 0
+        self._tarefa = None
+
+    async def _consumidor_de_teste(self, fila):
+        while True:
+            evento = await fila.get()
+            if evento is None:
+                break
+            self.eventos_consumidos += 1
+            if self.atraso_consumidor:
+                await asyncio.sleep(self.atraso_consumidor)
+
+    async def abrir(self):
+        self._tarefa = asyncio.create_task(self.consumidor(self.fila))
+
+    async def gravar(self, lote):
+        for linha in eventos_json(lote):
+            await self.fila.put(linha)
+
+    async def fechar(self):
+        await self.fila.put(None)
+        await self._tarefa
+
+
+def criar_sumidouro(destino, atraso_consumidor=0.0):
+    """
+    Cria o sumidouro a partir do destino: "arquivo:caminho", URL de banco
+    (sqlite:///, duckdb:///, mysql+pymysql://), "socket://host:porta" ou "fila".
+    """
+    if destino.startswith("arquivo:"):
+        return SumidouroArquivo(destino.split(":", 1)[1])
+    if destino.startswith("socket://"):
+        host, porta = destino[len("socket://") :].rsplit(":", 1)
+        return SumidouroSocket(host, int(porta))
+    if destino == "fila":
+        return SumidouroFila(atraso_consumidor=atraso_consumidor)
+    if destino.split(":", 1)[0].split("+", 1)[0].lower() in (
+        "sqlite",
+        "duckdb",
+        "mysql",
+    ):
+        return SumidouroBanco(destino)
+    raise ValueError(
+        f"Destino '{destino}' não suportado. Use arquivo:, sqlite:///, duckdb:///, "
+        "mysql+pymysql://, socket://host:porta ou fila."
+    )
+
+
+async def _consumir_lotes(fila, sumidouro, estatisticas):
+    """Retira os lotes da fila e os grava no sumidouro, até receber None."""
+    while True:
+        lote = await fila.get()
+        if lote is None:
+            break
+        inicio = time.perf_counter()
+        await sumidouro.gravar(lote)
+        estatisticas["segundos_gravacao"] += time.perf_counter() - inicio
+        estatisticas["lotes"] += 1
+        estatisticas["eventos_gravados"] += contar_eventos(lote)
+        for tabela in TABELAS_EVENTOS:
+            estatisticas[tabela] += len(lote[tabela])
+        estatisticas["status_atualizados"] += len(lote["status_venda"])
+
+
+async def produzir(
+    produtor,
+    sumidouro,
+    eventos_por_segundo=EVENTOS_POR_SEGUNDO_PADRAO,
+    duracao=DURACAO_PADRAO,
+    max_eventos=None,
+    capacidade_fila=CAPACIDADE_FILA,
+):
+    """
+    Emite eventos na taxa alvo até completar a duração (ou max_eventos) e aguarda a
+    gravação de todos os lotes.
+
+    A cada INTERVALO_TICK, os eventos devidos (taxa alvo x tempo decorrido, menos os já
+    emitidos, até MAXIMO_EVENTOS_POR_LOTE) formam um lote, colocado em uma fila de
+    capacidade_fila lotes consumida pelo sumidouro. Fila cheia bloqueia o produtor
+    (backpressure); o tempo bloqueado entra no relatório.
+
+    Args:
+        produtor (ProdutorEventos): Gerador dos lotes.
+        sumidouro (Sumidouro): Destino dos eventos.
+        eventos_por_segundo (float): Taxa alvo.
+        duracao (float): Segundos de produção.
+        max_eventos (int, optional): Encerra ao emitir esse número de eventos.
+        capacidade_fila (int): Lotes em espera antes de bloquear o produtor.
+
+    Returns:
+        dict: Relatório com taxa alvo e alcançada, contagens e backpressure.
+    """
+    fila = asyncio.Queue(maxsize=capacidade_fila)
+    estatisticas = dict.fromkeys(
+        ["lotes", "eventos_gravados", "status_atualizados", *TABELAS_EVENTOS], 0
+    )
+    estatisticas["segundos_gravacao"] = 0.0
+
+    await sumidouro.abrir()
+    consumidor = asyncio.create_task(_consumir_lotes(fila, sumidouro, estatisticas))
+    emitidos = 0
+    segundos_bloqueado = 0.0
+    ocupacao_maxima = 0
+    inicio = time.perf_counter()
+    proximo_progresso = INTERVALO_PROGRESSO
+    proximo_tick = 0.0
+    try:
+        while True:
+            decorrido = time.perf_counter() - inicio
+            if decorrido >= duracao or (max_eventos and emitidos >= max_eventos):
+                break
+            devidos = int(decorrido * eventos_por_segundo) - emitidos
+            if max_eventos:
+                devidos = min(devidos, max_eventos - emitidos)
+            devidos = min(devidos, MAXIMO_EVENTOS_POR_LOTE)
+            if devidos > 0:
+                lote = produtor.proximo_lote(devidos, produtor.dia_simulado(decorrido))
+                inicio_espera = time.perf_counter()
+                await fila.put(lote)
+                segundos_bloqueado += time.perf_counter() - inicio_espera
+                ocupacao_maxima = max(ocupacao_maxima, fila.qsize())
+                emitidos += contar_eventos(lote)
+                if consumidor.done():
+                    break
+
+            if decorrido >= proximo_progresso:
+                logging.info(
+                    f"{decorrido:.0f}s: {emitidos} eventos emitidos ({emitidos / decorrido:,.0f}/s), "
+                    f"fila {fila.qsize()}/{capacidade_fila}, {segundos_bloqueado:.2f}s bloqueado, "
+                    f"{produtor.devolucoes_pendentes} devoluções agendadas."
+                )
+                proximo_progresso += INTERVALO_PROGRESSO
+            proximo_tick += INTERVALO_TICK
+            await asyncio.sleep(max(0.0, proximo_tick - (time.perf_counter() - inicio)))
+        segundos_producao = time.perf_counter() - inicio
+    finally:
+        if not consumidor.done():
+            await fila.put(None)
+        await consumidor
+        await sumidouro.fechar()
+    segundos_total = time.perf_counter() - inicio
+
+    return {
+        "eventos_por_segundo_alvo": eventos_por_segundo,
+        "eventos_por_segundo_emitidos": round(emitidos / segundos_producao, 1),
+        "eventos_por_segundo_alcancados": round(
+            estatisticas["eventos_gravados"] / segundos_total, 1
+        ),
+        "segundos_producao": round(segundos_producao, 3),
+        "segundos_total": round(segundos_total, 3),
+        "eventos_emitidos": emitidos,
+        "eventos_gravados": estatisticas["eventos_gravados"],
+        **{tabela: estatisticas[tabela] for tabela in TABELAS_EVENTOS},
+        "status_atualizados": estatisticas["status_atualizados"],
+        "devolucoes_agendadas_restantes": produtor.devolucoes_pendentes,
+        "lotes": estatisticas["lotes"],
+        "segundos_bloqueado": round(segundos_bloqueado, 3),
+        "fracao_bloqueado": round(segundos_bloqueado / segundos_producao, 4),
+        "ocupacao_maxima_fila": ocupacao_maxima,
+        "ms_medio_gravacao_lote": round(
+            1000 * estatisticas["segundos_gravacao"] / max(estatisticas["lotes"], 1), 3
+        ),
+        "data_simulada_final": produtor.dia_simulado(segundos_producao).isoformat(),
+    }
+
+
+def criar_produtor(diretorio_dados=DIRETORIO_DADOS, **opcoes):
+    """
+    Cria o ProdutorEventos a partir dos clientes e produtos de uma geração anterior,
+    com o relógio simulado começando no dia seguinte à última data gerada.
+
+    Args:
+        diretorio_dados (str): Pasta com clientes.csv, produtos.csv e vendas.csv.
+        **opcoes: Demais argumentos de ProdutorEventos.
+
+    Returns:
+        ProdutorEventos: Produtor pronto para produzir().
+    """
+    estado = geracao.ler_estado_geracao(diretorio_dados)
+    df_clientes = geracao.ler_csv_do_projeto(
+        os.path.join(diretorio_dados, "clientes.csv"), ["data_cadastro"]
+    )
+    df_produtos = geracao.ler_csv_do_projeto(
+        os.path.join(diretorio_dados, "produtos.csv")
+    )
+    return ProdutorEventos(
+        df_clientes,
+        df_produtos,
+        estado["data_final"] + timedelta(days=1),
+        **opcoes,
+    )
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Produz eventos de vendas e devoluções em uma taxa alvo, para testes de carga."
+    )
+    parser.add_argument(
+        "--destino",
+        default="arquivo:" + os.path.join(DIRETORIO_DADOS, "eventos.jsonl"),
+        help="arquivo:caminho.jsonl, sqlite:///arquivo.db, duckdb:///arquivo.duckdb, "
+        "mysql+pymysql://..., socket://host:porta ou fila.",
+    )
+    parser.add_argument("--dados", default=DIRETORIO_DADOS)
+    parser.add_argument(
+        "--eventos-por-segundo", type=float, default=EVENTOS_POR_SEGUNDO_PADRAO
+    )
+    parser.add_argument("--duracao", type=float, default=DURACAO_PADRAO)
+    parser.add_argument("--max-eventos", type=int)
+    parser.add_argument(
+        "--dias-por-segundo", type=float, default=DIAS_SIMULADOS_POR_SEGUNDO
+    )
+    parser.add_argument("--capacidade-fila", type=int, default=CAPACIDADE_FILA)
+    parser.add_argument("--semente", type=int)
+    parser.add_argument(
+        "--atraso-consumidor",
+        type=float,
+        default=0.0,
+        help="Segundos por evento do consumidor de teste (destino 'fila').",
+    )
+    parser.add_argument("--relatorio", help="Grava o relatório final em JSON.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+    try:
+        produtor = criar_produtor(
+            argumentos.dados,
+            dias_por_segundo=argumentos.dias_por_segundo,
+            semente=argumentos.semente,
+        )
+        sumidouro = criar_sumidouro(argumentos.destino, argumentos.atraso_consumidor)
+        logging.info(
+            f"Produzindo {argumentos.eventos_por_segundo:,.0f} eventos/s para '{argumentos.destino}' "
+            f"a partir de {produtor.data_inicial} (semente {produtor.semente})..."
+        )
+        relatorio = asyncio.run(
+            produzir(
+                produtor,
+                sumidouro,
+                eventos_por_segundo=argumentos.eventos_por_segundo,
+                duracao=argumentos.duracao,
+                max_eventos=argumentos.max_eventos,
+                capacidade_fila=argumentos.capacidade_fila,
+            )
+        )
+    except Exception as e:
+        logging.error(f"Erro na produção de eventos: {e}")
+        exit(1)
+
+    logging.info(
+        f"Taxa alvo {relatorio['eventos_por_segundo_alvo']:,.0f} eventos/s, alcançada "
+        f"{relatorio['eventos_por_segundo_alcancados']:,.0f} eventos/s "
+        f"({relatorio['eventos_gravados']} eventos: {relatorio['vendas']} vendas e "
+        f"{relatorio['devolucoes']} devoluções). Produtor bloqueado por backpressure em "
+        f"{relatorio['fracao_bloqueado']:.1%} do tempo."
+    )
+    if argumentos.relatorio:
+        with open(argumentos.relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        logging.info(f"Relatório gravado em '{argumentos.relatorio}'.")
+    exit()
@@ -0,0 +1,376 @@
+"""
+Benchmark dos planos de execução das consultas de sql/ com e sem os índices de
+sql/create_indexes.sql, em várias escalas de dados.
+
+Para cada escala, um banco SQLite temporário recebe os CSVs de config/ingestion.json
+(ingestion.py), replicados N vezes com novas chaves (as referências entre as tabelas são
+preservadas), e a tabela materializada valor_liquido_vendas. Cada consulta de
+sql/sales_performance.sql, sql/customer_behavior.sql e sql/returns_analysis.sql é medida
+(mediana de algumas execuções) e tem o plano capturado com EXPLAIN, antes e depois da
+criação dos índices.
+
+Com os índices, nenhuma consulta deve ler uma tabela inteira: o benchmark falha (código de
+saída 1) se algum plano tiver uma varredura completa — no SQLite, "SCAN <tabela>" sem
+"COVERING INDEX"; no MySQL, acesso do tipo ALL (ou "index" sem "Using index"). Varreduras
+de índices de cobertura são aceitas: leem apenas as colunas do índice.
+
+Com --destino, o benchmark usa um banco existente (SQLite ou MySQL) no estado em que está,
+criando apenas os índices que faltarem.
+
+Uso:
+    python scripts/index_benchmark.py --escalas 1 4 16 --relatorio data/index_benchmark.json
+    python scripts/index_benchmark.py --destino mysql+pymysql://root@localhost/cosmolume
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from analytics_engine import (
+    ARQUIVOS_CONSULTAS,
+    DIRETORIO_SQL,
+    ler_comandos_sql,
+    traduzir_sql_mysql,
+)
+from csv_reader import ler_esquema_sql
+from ingestion import (
+    atualizar_valor_liquido_vendas,
+    carregar_tabelas,
+    conectar,
+    criar_esquema,
+    criar_indices,
+    ler_config_ingestao,
+    niveis_de_carga,
+)
+
+# Configurações Globais e Constantes
+ESCALAS_PADRAO = [1, 4, 16]  # Multiplicadores do volume dos CSVs
+REPETICOES_PADRAO = 3  # Execuções de cada consulta (o tempo registrado é a mediana)
+CARACTERES_COPIA = "0123456789abcdefghijklmnopqrstuvwxyz"  # Limita a escala a 36
+ARQUIVO_VIEWS = "views_customer_behavior.sql"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _dialeto_benchmark(destino):
+    """O benchmark aceita SQLite e MySQL (o DuckDB não usa índices secundários)."""
+    if destino.startswith("sqlite:"):
+        return "sqlite"
+    if destino.startswith("mysql"):
+        return "mysql"
+    raise ValueError(
+        f"Destino '{destino}' não suportado pelo benchmark. Use sqlite:/// ou mysql+pymysql://."
+    )
+
+
+def replicar_dados(destino, esquema, fator):
+    """
+    Multiplica o volume de todas as tabelas por `fator` dentro de um banco SQLite. Cada
+    cópia troca os dois primeiros caracteres das chaves (char(36)) por "z" + número da
+    cópia; como UUIDs só têm dígitos hexadecimais, as chaves novas não colidem com as
+    originais e as chaves estrangeiras continuam apontando para linhas da mesma cópia.
+
+    Args:
+        destino (str): URL do banco SQLite já carregado.
+        esquema (dict): Esquema de ler_esquema_sql.
+        fator (int): Multiplicador (1 a 36).
+    """
+    if not 1 <= fator <= len(CARACTERES_COPIA):
+        raise ValueError(f"Escala deve estar entre 1 e {len(CARACTERES_COPIA)}.")
+
+    conexao = conectar(destino)
+    try:
+        for nivel in niveis_de_carga(esquema, list(esquema)):
+            for tabela in nivel:
+                definicao = esquema[tabela]
+                colunas = list(definicao["colunas"])
+                for copia in range(1, fator):
+                    expressoes = [
+                        (
+                            f"'z{CARACTERES_COPIA[copia]}' || substr({coluna}, 3)"
+                            if definicao["colunas"][coluna] == "char(36)"
+                            else coluna
+                        )
+                        for coluna in colunas
+                    ]
+                    conexao.execute(
+                        f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+                        f"SELECT {', '.join(expressoes)} FROM {tabela} "
+                        f"WHERE {definicao['chave_primaria']} NOT LIKE 'z%'"
+                    )
+        conexao.commit()
+    finally:
+        conexao.close()
+
+
+def montar_banco_escala(caminho_banco, fator, tabelas, esquema):
+    """
+    Cria um banco SQLite com os CSVs replicados `fator` vezes e valor_liquido_vendas.
+
+    Returns:
+        str: URL do banco.
+    """
+    destino = f"sqlite:///{caminho_banco}"
+    criar_esquema(destino, esquema)
+    carregar_tabelas(tabelas, destino, esquema)
+    if fator > 1:
+        replicar_dados(destino, esquema, fator)
+    atualizar_valor_liquido_vendas(destino)
+    return destino
+
+
+def ler_consultas(diretorio_sql=DIRETORIO_SQL):
+    """Retorna identificador -> SQL das consultas de ARQUIVOS_CONSULTAS."""
+    consultas = {}
+    for arquivo in ARQUIVOS_CONSULTAS:
+        for identificador, _, comando in ler_comandos_sql(
+            os.path.join(diretorio_sql, arquivo)
+        ):
+            if identificador in consultas:
+                identificador = f"{os.path.splitext(arquivo)[0]}.{identificador}"
+            consultas[identificador] = comando
+    return consultas
+
+
+def _preparar_conexao(conexao, dialeto, diretorio_sql=DIRETORIO_SQL):
+    """
+    No SQLite, registra YEAR e MONTH (datas gravadas como AAAA-MM-DD). Cria as views de
+    sql/views_customer_behavior.sql que ainda não existirem.
+    """
+    cursor = conexao.cursor()
+    if dialeto == "sqlite":
+        conexao.create_function(
+            "YEAR", 1, lambda data: int(data[:4]) if data else None, deterministic=True
+        )
+        conexao.create_function(
+            "MONTH",
+            1,
+            lambda data: int(data[5:7]) if data else None,
+            deterministic=True,
+        )
+    criacao = (
+        "CREATE VIEW IF NOT EXISTS" if dialeto == "sqlite" else "CREATE OR REPLACE VIEW"
+    )
+    for _, _, comando in ler_comandos_sql(os.path.join(diretorio_sql, ARQUIVO_VIEWS)):
+        cursor.execute(comando.replace("CREATE VIEW", criacao, 1))
+    conexao.commit()
+
+
+def capturar_plano(conexao, dialeto, sql):
+    """
+    Executa EXPLAIN da consulta.
+
+    Returns:
+        tuple: (linhas do plano, varreduras completas encontradas).
+    """
+    cursor = conexao.cursor()
+    if dialeto == "sqlite":
+        cursor.execute(f"EXPLAIN QUERY PLAN {traduzir_sql_mysql(sql)}")
+        plano = [linha[3] for linha in cursor.fetchall()]
+        # Subconsultas, CTEs e views materializadas não são tabelas do banco.
+        derivadas = {
+            linha.split(" ", 1)[1]
+            for linha in plano
+            if linha.startswith(("MATERIALIZE ", "CO-ROUTINE "))
+        }
+        varreduras = [
+            linha
+            for linha in plano
+            if linha.startswith("SCAN ")
+            and "COVERING INDEX" not in linha
+            and linha.split(" ")[1] not in derivadas
+            and not linha.startswith(("SCAN (", "SCAN CONSTANT ROW"))
+        ]
+        return plano, varreduras
+
+    cursor.execute(f"EXPLAIN {sql}")
+    nomes = [descricao[0].lower() for descricao in cursor.description]
+    linhas = [dict(zip(nomes, linha)) for linha in cursor.fetchall()]
+    plano = [
+        f"{linha['table']}: type={linha['type']} key={linha['key']} rows={linha['rows']} extra={linha['extra']}"
+        for linha in linhas
+    ]
+    varreduras = [
+        descricao
+        for linha, descricao in zip(linhas, plano)
+        if not str(linha["table"]).startswith("<")
+        and (
+            linha["type"] == "ALL"
+            or (
+                linha["type"] == "index" and "Using index" not in (linha["extra"] or "")
+            )
+        )
+    ]
+    return plano, varreduras
+
+
+def medir_consulta(conexao, sql, repeticoes=REPETICOES_PADRAO, dialeto="sqlite"):
+    """Mediana do tempo (s) de execução da consulta, incluindo a leitura do resultado."""
+    if dialeto == "sqlite":
+        sql = traduzir_sql_mysql(sql)
+    tempos = []
+    for _ in range(repeticoes):
+        cursor = conexao.cursor()
+        inicio = time.perf_counter()
+        cursor.execute(sql)
+        cursor.fetchall()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def avaliar_consultas(destino, consultas, repeticoes=REPETICOES_PADRAO):
+    """
+    Captura plano e tempo de cada consulta no destino.
+
+    Returns:
+        dict: Identificador -> {"segundos", "plano", "varreduras_completas"}.
+    """
+    dialeto = _dialeto_benchmark(destino)
+    conexao = conectar(destino)
+    try:
+        _preparar_conexao(conexao, dialeto)
+        resultados = {}
+        for identificador, sql in consultas.items():
+            plano, varreduras = capturar_plano(conexao, dialeto, sql)
+            resultados[identificador] = {
+                "segundos": round(medir_consulta(conexao, sql, repeticoes, dialeto), 5),
+                "plano": plano,
+                "varreduras_completas": varreduras,
+            }
+    finally:
+        conexao.close()
+    return resultados
+
+
+def _analisar(destino):
+    """Atualiza as estatísticas do otimizador do SQLite (usadas na escolha dos índices)."""
+    conexao = conectar(destino)
+    try:
+        conexao.execute("ANALYZE")
+        conexao.commit()
+    finally:
+        conexao.close()
+
+
+def executar_benchmark(
+    escalas=None, tabelas=None, destino=None, repeticoes=REPETICOES_PADRAO
+):
+    """
+    Executa o benchmark em bancos SQLite temporários (um por escala) ou no `destino`.
+
+    Args:
+        escalas (list, optional): Multiplicadores do volume. Padrão: ESCALAS_PADRAO.
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV. Padrão: config/ingestion.json.
+        destino (str, optional): Banco existente (sqlite:/// ou mysql+pymysql://); ignora
+            as escalas e mede apenas com os índices.
+        repeticoes (int): Execuções de cada consulta.
+
+    Returns:
+        dict: Relatório com linhas por tabela e, por escala, plano e tempo de cada consulta
+            sem e com os índices.
+    """
+    consultas = ler_consultas()
+    relatorio = {"consultas": list(consultas), "escalas": {}}
+
+    if destino is not None:
+        _dialeto_benchmark(destino)
+        criar_indices(destino)
+        relatorio["escalas"]["atual"] = {
+            "com_indices": avaliar_consultas(destino, consultas, repeticoes)
+        }
+        return relatorio
+
+    esquema = ler_esquema_sql()
+    tabelas = tabelas or ler_config_ingestao()
+    with tempfile.TemporaryDirectory() as diretorio_temporario:
+        for fator in escalas or ESCALAS_PADRAO:
+            inicio = time.perf_counter()
+            destino_escala = montar_banco_escala(
+                os.path.join(diretorio_temporario, f"escala_{fator}.db"),
+                fator,
+                tabelas,
+                esquema,
+            )
+            _analisar(destino_escala)
+            conexao = conectar(destino_escala)
+            try:
+                linhas = {
+                    tabela: conexao.execute(
+                        f"SELECT COUNT(*) FROM {tabela}"
+                    ).fetchone()[0]
+                    for tabela in esquema
+                }
+            finally:
+                conexao.close()
+            logging.info(
+                f"Escala {fator}x pronta em {time.perf_counter() - inicio:.2f}s ({linhas['vendas']} vendas, {linhas['itens_venda']} itens)."
+            )
+
+            sem_indices = avaliar_consultas(destino_escala, consultas, repeticoes)
+            criar_indices(destino_escala)
+            _analisar(destino_escala)
+            com_indices = avaliar_consultas(destino_escala, consultas, repeticoes)
+            relatorio["escalas"][str(fator)] = {
+                "linhas": linhas,
+                "sem_indices": sem_indices,
+                "com_indices": com_indices,
+            }
+            for identificador in consultas:
+                logging.info(
+                    f"[{fator}x] {identificador}: {sem_indices[identificador]['segundos'] * 1000:.1f} ms -> {com_indices[identificador]['segundos'] * 1000:.1f} ms com índices."
+                )
+    return relatorio
+
+
+def varreduras_completas(relatorio):
+    """Lista (escala, consulta, linha do plano) das varreduras completas com os índices."""
+    return [
+        (escala, identificador, varredura)
+        for escala, resultado in relatorio["escalas"].items()
+        for identificador, medicao in resultado["com_indices"].items()
+        for varredura in medicao["varreduras_completas"]
+    ]
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Mede planos (EXPLAIN) e tempos das consultas de sql/ com e sem índices."
+    )
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO)
+    parser.add_argument(
+        "--destino",
+        help="Usa um banco existente (sqlite:/// ou mysql+pymysql://) em vez das escalas.",
+    )
+    parser.add_argument("--relatorio", help="Grava o relatório neste arquivo JSON.")
+    return parser.parse_args()
+
+
+# Fluxo Principal do Benchmark
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+
+    relatorio = executar_benchmark(
+        escalas=argumentos.escalas,
+        destino=argumentos.destino,
+        repeticoes=argumentos.repeticoes,
+    )
+
+    if argumentos.relatorio:
+        with open(argumentos.relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        logging.info(f"Relatório do benchmark salvo em '{argumentos.relatorio}'.")
+
+    falhas = varreduras_completas(relatorio)
+    if falhas:
+        for escala, identificador, varredura in falhas:
+            logging.error(
+                f"Varredura completa com índices (escala {escala}) em {identificador}: {varredura}"
+            )
+        exit(1)
+    logging.info("Nenhuma consulta faz varredura completa de tabela com os índices.")
@@ -0,0 +1,356 @@
+"""
+Instrumentação por etapa da geração de dados: spans com início/fim, duração, linhas de
+entrada e saída, RSS do processo e alocações do Python (tracemalloc), além da captura
+opcional de perfis (cProfile ou pyinstrument) e de um relatório JSON ao fim da execução.
+
+Os spans podem ser aninhados (ex.: bloco mensal do modo streaming -> gerar_vendas_e_itens):
+cada um guarda o índice do span pai. O perfilador, quando ligado, cobre cada span de nível
+superior separadamente, então o relatório aponta as funções mais caras de cada etapa. O
+cProfile mede apenas a thread que abriu o span; trabalho feito em threads do pool (ex.:
+exportar_csvs) aparece como espera no futuro.
+
+Com a instrumentação desligada (padrão), os spans e o decorador não fazem nada além de uma
+verificação. Processos filhos (modo paralelo) não registram spans: o span do processo
+principal cobre o tempo total dos shards.
+
+Uso:
+    from instrumentation import instrumentacao
+
+    instrumentacao.configurar(ativo=True, perfilador="cProfile")
+
+    @instrumentacao.medir
+    def gerar_algo(df): ...
+
+    with instrumentacao.etapa("exportacao") as span:
+        span["linhas_saida"] = len(df)
+
+    instrumentacao.gravar_relatorio("data/instrumentacao.json")
+"""
+
+import cProfile
+import functools
+import importlib.util
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+# Configurações Globais e Constantes
+PERFILADORES = (None, "cProfile", "pyinstrument")
+N_FUNCOES_PERFIL = 25  # Funções listadas no relatório por span de nível superior
+_MB = 2**20
+
+_BYTES_POR_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def memoria_rss():
+    """RSS atual do processo em bytes (/proc no Linux; pico do processo nos demais)."""
+    try:
+        with open("/proc/self/statm", "r") as arquivo:
+            return int(arquivo.read().split()[1]) * _BYTES_POR_PAGINA
+    except OSError:
+        import resource
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if os.uname().sysname == "Darwin" else pico * 1024
+
+
+def contar_linhas(objeto):
+    """
+    Linhas dos DataFrames contidos em um objeto: o próprio DataFrame, tuplas/listas
+    (ex.: (df_vendas, df_itens)) e dicts (ex.: tabela -> (df, colunas_data)).
+    """
+    if isinstance(objeto, pd.DataFrame):
+        return len(objeto)
+    if isinstance(objeto, (tuple, list)):
+        return sum(contar_linhas(item) for item in objeto)
+    if isinstance(objeto, dict):
+        return sum(contar_linhas(item) for item in objeto.values())
+    return 0
+
+
+def _resumo_cprofile(perfil, n_funcoes=N_FUNCOES_PERFIL):
+    """Funções com maior tempo acumulado de um cProfile, em formato serializável."""
+    estatisticas = pstats.Stats(perfil, stream=io.StringIO())
+    funcoes = []
+    for (arquivo, linha, funcao), (
+        _,
+        chamadas,
+        tempo_proprio,
+        tempo_acumulado,
+        _,
+    ) in estatisticas.stats.items():
+        funcoes.append(
+            {
+                "funcao": f"{os.path.basename(arquivo)}:{linha}({funcao})",
+                "chamadas": chamadas,
+                "segundos_proprios": round(tempo_proprio, 4),
+                "segundos_acumulados": round(tempo_acumulado, 4),
+            }
+        )
+    funcoes.sort(key=lambda item: item["segundos_acumulados"], reverse=True)
+    return funcoes[:n_funcoes]
+
+
+class Instrumentacao:
+    """
+    Registro dos spans de uma execução.
+
+    Args:
+        ativo (bool): Registra spans. Se False, etapa() e medir não medem nada.
+        perfilador (str, optional): None, "cProfile" ou "pyinstrument" (requer o pacote
+            pyinstrument), aplicado a cada span de nível superior.
+        rastrear_alocacoes (bool): Mede as alocações do Python com tracemalloc (deixa a
+            execução mais lenta, sobretudo nos laços por linha).
+        diretorio_perfis (str, optional): Pasta onde gravar o perfil bruto de cada span de
+            nível superior (.prof do cProfile ou .html do pyinstrument).
+    """
+
+    def __init__(
+        self,
+        ativo=False,
+        perfilador=None,
+        rastrear_alocacoes=True,
+        diretorio_perfis=None,
+    ):
+        self.configurar(ativo, perfilador, rastrear_alocacoes, diretorio_perfis)
+
+    def configurar(
+        self,
+        ativo=True,
+        perfilador=None,
+        rastrear_alocacoes=True,
+        diretorio_perfis=None,
+    ):
+        """Reinicia o registro com as opções informadas (ver a classe)."""
+        if perfilador not in PERFILADORES:
+            raise ValueError(
+                f"Perfilador '{perfilador}' não suportado. Use None, 'cProfile' ou 'pyinstrument'."
+            )
+        if (
+            ativo
+            and perfilador == "pyinstrument"
+            and importlib.util.find_spec("pyinstrument") is None
+        ):
+            raise ImportError(
+                "Perfilador 'pyinstrument' requer o pacote pyinstrument (pip install pyinstrument)."
+            )
+
+        self.ativo = ativo
+        self.perfilador = perfilador
+        self.rastrear_alocacoes = ativo and rastrear_alocacoes
+        self.diretorio_perfis = diretorio_perfis
+        self.spans = []
+        self._pilha = []
+        self._pid = os.getpid()
+        self._inicio = datetime.now()
+        self._inicio_relogio = time.perf_counter()
+        if self.rastrear_alocacoes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def registrando(self):
+        """True no processo que configurou a instrumentação ativa."""
+        return self.ativo and os.getpid() == self._pid
+
+    def _iniciar_perfil(self):
+        if self.perfilador == "cProfile":
+            perfil = cProfile.Profile()
+            perfil.enable()
+            return perfil
+        if self.perfilador == "pyinstrument":
+            from pyinstrument import Profiler
+
+            perfil = Profiler()
+            perfil.start()
+            return perfil
+        return None
+
+    def _finalizar_perfil(self, perfil, span, indice):
+        """Para o perfilador e anexa o resumo ao span (e o perfil bruto em disco)."""
+        nome_arquivo = f"{indice:04d}_{span['nome']}"
+        if self.perfilador == "cProfile":
+            perfil.disable()
+            span["perfil"] = _resumo_cprofile(perfil)
+            if self.diretorio_perfis:
+                os.makedirs(self.diretorio_perfis, exist_ok=True)
+                perfil.dump_stats(
+                    os.path.join(self.diretorio_perfis, f"{nome_arquivo}.prof")
+                )
+            return
+        from pyinstrument.renderers import JSONRenderer
+
+        perfil.stop()
+        span["perfil"] = json.loads(perfil.output(renderer=JSONRenderer()))
+        if self.diretorio_perfis:
+            os.makedirs(self.diretorio_perfis, exist_ok=True)
+            with open(
+                os.path.join(self.diretorio_perfis, f"{nome_arquivo}.html"),
+                "w",
+                encoding="utf-8",
+            ) as arquivo:
+                arquivo.write(perfil.output_html())
+
+    @contextmanager
+    def etapa(self, nome, linhas_entrada=0):
+        """
+        Span de uma etapa. O bloco pode informar span["linhas_saida"] (e corrigir
+        span["linhas_entrada"]).
+
+        Args:
+            nome (str): Nome da etapa.
+            linhas_entrada (int): Linhas recebidas pela etapa.
+        """
+        if not self.registrando:
+            yield {}
+            return
+
+        indice = len(self.spans)
+        span = {
+            "nome": nome,
+            "pai": self._pilha[-1][0] if self._pilha else None,
+            "profundidade": len(self._pilha),
+            "linhas_entrada": int(linhas_entrada),
+            "linhas_saida": 0,
+        }
+        self.spans.append(span)
+        if self.rastrear_alocacoes:
+            alocado_inicial, pico_pai = tracemalloc.get_traced_memory()
+            if self._pilha:
+                self._pilha[-1][1] = max(self._pilha[-1][1], pico_pai)
+            tracemalloc.reset_peak()
+        estado = [indice, 0]  # Índice do span e maior pico de alocação dos filhos
+        perfil = self._iniciar_perfil() if not self._pilha else None
+        self._pilha.append(estado)
+        rss_inicial = memoria_rss()
+        inicio = time.perf_counter()
+        try:
+            yield span
+        finally:
+            segundos = time.perf_counter() - inicio
+            rss_final = memoria_rss()
+            self._pilha.pop()
+            if perfil is not None:
+                self._finalizar_perfil(perfil, span, indice)
+            span.update(
+                {
+                    "inicio": round(inicio - self._inicio_relogio, 4),
+                    "fim": round(inicio + segundos - self._inicio_relogio, 4),
+                    "segundos": round(segundos, 4),
+                    # Etapas de gravação não retornam DataFrames: vale a entrada.
+                    "linhas_por_segundo": (
+                        round(
+                            (span["linhas_saida"] or span["linhas_entrada"]) / segundos,
+                            1,
+                        )
+                        if segundos
+                        else None
+                    ),
+                    "rss_inicial_mb": round(rss_inicial / _MB, 1),
+                    "rss_final_mb": round(rss_final / _MB, 1),
+                    "delta_rss_mb": round((rss_final - rss_inicial) / _MB, 1),
+                }
+            )
+            if self.rastrear_alocacoes:
+                alocado_final, pico = tracemalloc.get_traced_memory()
+                pico = max(pico, estado[1])
+                span["delta_alocacoes_mb"] = round(
+                    (alocado_final - alocado_inicial) / _MB, 2
+                )
+                span["pico_alocacoes_mb"] = round((pico - alocado_inicial) / _MB, 2)
+                if self._pilha:
+                    self._pilha[-1][1] = max(self._pilha[-1][1], pico)
+                tracemalloc.reset_peak()
+            logging.info(
+                f"[instrumentação] {'  ' * span['profundidade']}{nome}: {segundos:.3f}s, {span['linhas_entrada']} -> {span['linhas_saida']} linhas, RSS {span['delta_rss_mb']:+.1f} MB."
+            )
+
+    def medir(self, funcao):
+        """
+        Decorador que envolve a função em um span com o nome dela. As linhas de entrada e
+        saída são as dos DataFrames recebidos e retornados (ver contar_linhas).
+        """
+
+        @functools.wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            if not self.registrando:
+                return funcao(*args, **kwargs)
+            with self.etapa(
+                funcao.__name__, contar_linhas(args) + contar_linhas(kwargs)
+            ) as span:
+                resultado = funcao(*args, **kwargs)
+                span["linhas_saida"] = contar_linhas(resultado)
+            return resultado
+
+        return funcao_medida
+
+    def relatorio(self):
+        """
+        Relatório da execução: todos os spans, na ordem de abertura, e um resumo por nome
+        (chamadas, tempo total e máximo, linhas de saída).
+
+        Returns:
+            dict: Relatório serializável em JSON.
+        """
+        resumo = {}
+        for span in self.spans:
+            if "segundos" not in span:
+                continue
+            item = resumo.setdefault(
+                span["nome"],
+                {
+                    "chamadas": 0,
+                    "segundos": 0.0,
+                    "segundos_max": 0.0,
+                    "linhas_saida": 0,
+                },
+            )
+            item["chamadas"] += 1
+            item["segundos"] = round(item["segundos"] + span["segundos"], 4)
+            item["segundos_max"] = max(item["segundos_max"], span["segundos"])
+            item["linhas_saida"] += span["linhas_saida"]
+        return {
+            "inicio": self._inicio.isoformat(timespec="seconds"),
+            "segundos": round(time.perf_counter() - self._inicio_relogio, 4),
+            "perfilador": self.perfilador,
+            "rastrear_alocacoes": self.rastrear_alocacoes,
+            "pico_rss_mb": max(
+                [round(memoria_rss() / _MB, 1)]
+                + [
+                    span["rss_final_mb"]
+                    for span in self.spans
+                    if "rss_final_mb" in span
+                ]
+            ),
+            "resumo": dict(
+                sorted(
+                    resumo.items(), key=lambda item: item[1]["segundos"], reverse=True
+                )
+            ),
+            "spans": self.spans,
+        }
+
+    def gravar_relatorio(self, caminho_relatorio):
+        """Grava o relatório em JSON (não faz nada com a instrumentação desligada)."""
+        if not self.registrando:
+            return
+        diretorio = os.path.dirname(caminho_relatorio)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(caminho_relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump(self.relatorio(), arquivo, indent=2, ensure_ascii=False)
+        logging.info(f"Relatório de instrumentação salvo em '{caminho_relatorio}'.")
+
+
+# Instância usada pelos módulos do pipeline (configurada pelo fluxo principal)
+instrumentacao = Instrumentacao()
@@ -0,0 +1,461 @@
+"""
+Benchmark do pipeline completo (geração, exportação, ingestão e consultas) em escalas
+crescentes de N_CLIENTES_TARGET e N_VENDAS_A_GERAR.
+
+Para cada escala, as etapas de data_generation.py são executadas na mesma sequência do
+fluxo principal (gerar_vendas_e_itens, gerar_clientes_desde_vendas, filtro das vendas,
+gerar_devolucoes_e_itens, atualizar_status_venda_pos_devolucao, métricas dos clientes e
+exportação dos CSVs), os CSVs são carregados em um banco SQLite temporário (ingestion.py,
+com valor_liquido_vendas) e cada consulta de sql/ é medida (mediana de algumas execuções,
+como em index_benchmark.py).
+
+Cada etapa registra tempo de parede, linhas por segundo e pico de memória (RSS do processo
+amostrado durante a etapa). A execução é acrescentada ao histórico JSON
+(data/benchmark_history.json) e comparada com uma linha de base: por padrão, a execução
+anterior do histórico com a mesma configuração. O benchmark falha (código de saída 1) se
+alguma etapa ficou mais lenta ou usou mais memória que a linha de base além da tolerância,
+ou se cresceu de forma superlinear entre a menor e a maior escala (expoente de crescimento
+do tempo acima de EXPOENTE_MAXIMO_CRESCIMENTO).
+
+Uso:
+    python scripts/pipeline_benchmark.py --escalas 1 2 4
+    python scripts/pipeline_benchmark.py --escalas 1 4 16 --vetorizado
+    python scripts/pipeline_benchmark.py --linha-base data/benchmark_base.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+import data_generation as geracao
+from csv_reader import DIRETORIO_RAIZ, ler_esquema_sql
+from index_benchmark import avaliar_consultas, ler_consultas
+from ingestion import carregar_tabelas, criar_esquema
+from instrumentation import memoria_rss
+
+# Configurações Globais e Constantes
+ESCALAS_PADRAO = [1, 2, 4]  # Multiplicadores de N_CLIENTES_TARGET e N_VENDAS_A_GERAR
+REPETICOES_PADRAO = 3  # Execuções de cada consulta (o tempo registrado é a mediana)
+CAMINHO_HISTORICO = os.path.join(DIRETORIO_RAIZ, "data", "benchmark_history.json")
+TOLERANCIA_TEMPO = 0.25  # Aumento relativo de tempo aceito em relação à linha de base
+TOLERANCIA_MEMORIA = 0.20  # Aumento relativo do pico de memória aceito
+MINIMO_SEGUNDOS_COMPARACAO = 0.05  # Etapas mais rápidas que isso não são comparadas
+MINIMO_MB_COMPARACAO = 20  # Diferenças de memória menores que isso são ignoradas
+EXPOENTE_MAXIMO_CRESCIMENTO = 1.3  # tempo ~ escala ** expoente; 1 = crescimento linear
+INTERVALO_AMOSTRAGEM_MEMORIA = 0.005  # Segundos entre leituras do RSS
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class MonitorMemoria:
+    """Thread que amostra o RSS do processo e guarda o maior valor desde o último reinício."""
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM_MEMORIA):
+        self.intervalo = intervalo
+        self.pico = memoria_rss()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, memoria_rss())
+
+    def reiniciar(self):
+        """Começa uma nova medição de pico a partir do RSS atual."""
+        self.pico = memoria_rss()
+        return self.pico
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._thread.join()
+
+
+@contextmanager
+def medir_etapa(etapas, nome, monitor):
+    """
+    Mede uma etapa do pipeline. O bloco informa as linhas processadas em etapa["linhas"].
+
+    Args:
+        etapas (dict): Onde a medição é gravada (nome -> métricas).
+        nome (str): Nome da etapa.
+        monitor (MonitorMemoria): Amostrador de memória em execução.
+    """
+    etapa = {"linhas": 0}
+    memoria_inicial = monitor.reiniciar()
+    inicio = time.perf_counter()
+    yield etapa
+    segundos = time.perf_counter() - inicio
+    pico = max(monitor.pico, memoria_rss())
+    etapas[nome] = {
+        "segundos": round(segundos, 4),
+        "linhas": int(etapa["linhas"]),
+        "linhas_por_segundo": (
+            round(etapa["linhas"] / segundos, 1) if segundos else None
+        ),
+        "pico_memoria_mb": round(pico / 2**20, 1),
+        "acrescimo_memoria_mb": round((pico - memoria_inicial) / 2**20, 1),
+    }
+    logging.info(
+        f"  {nome}: {segundos:.3f}s, {etapa['linhas']} linhas, pico {etapas[nome]['pico_memoria_mb']} MB."
+    )
+
+
+def executar_escala(
+    fator, diretorio, monitor, vetorizado=False, repeticoes=REPETICOES_PADRAO
+):
+    """
+    Executa o pipeline completo com N_CLIENTES_TARGET e N_VENDAS_A_GERAR multiplicados
+    por `fator`.
+
+    Args:
+        fator (int): Multiplicador do volume.
+        diretorio (str): Pasta temporária para os CSVs e o banco SQLite.
+        monitor (MonitorMemoria): Amostrador de memória em execução.
+        vetorizado (bool): Usa as versões vetorizadas da geração (MODO_VETORIZADO).
+        repeticoes (int): Execuções de cada consulta.
+
+    Returns:
+        dict: {"linhas": linhas por tabela, "etapas": métricas por etapa}.
+    """
+    n_clientes = geracao.N_CLIENTES_TARGET * fator
+    n_vendas = geracao.N_VENDAS_A_GERAR * fator
+    etapas = {}
+    logging.info(f"Escala {fator}x: {n_clientes} clientes, {n_vendas} vendas.")
+
+    df_produtos = geracao.gerar_produtos()
+    df_clientes_placeholder = pd.DataFrame(
+        {
+            "id_cliente": geracao.gerador_ids.chaves("cliente", n_clientes * 2),
+            "data_cadastro": pd.to_datetime(geracao.INICIO_ANO_2025),
+        }
+    )
+    funcao_geracao_vendas = (
+        geracao.gerar_vendas_e_itens_vetorizado
+        if vetorizado
+        else geracao.gerar_vendas_e_itens
+    )
+    with medir_etapa(etapas, "gerar_vendas_e_itens", monitor) as etapa:
+        df_total_vendas, df_total_itens_venda = funcao_geracao_vendas(
+            df_clientes_placeholder,
+            df_produtos,
+            n_vendas,
+            geracao.HOJE_DEFINIDO,
+            geracao.INICIO_ANO_2025,
+        )
+        etapa["linhas"] = len(df_total_vendas) + len(df_total_itens_venda)
+
+    funcao_geracao_clientes = (
+        geracao.gerar_clientes_desde_vendas_vetorizado
+        if vetorizado
+        else geracao.gerar_clientes_desde_vendas
+    )
+    with medir_etapa(etapas, "gerar_clientes_desde_vendas", monitor) as etapa:
+        df_clientes = funcao_geracao_clientes(df_total_vendas, n_clientes)
+        etapa["linhas"] = len(df_clientes)
+
+    with medir_etapa(etapas, "filtrar_vendas_dos_clientes", monitor) as etapa:
+        df_vendas, df_itens_venda = geracao.filtrar_vendas_dos_clientes(
+            df_total_vendas, df_total_itens_venda, df_clientes
+        )
+        etapa["linhas"] = len(df_total_vendas) + len(df_total_itens_venda)
+    del df_total_vendas, df_total_itens_venda
+
+    funcao_geracao_devolucoes = (
+        geracao.gerar_devolucoes_e_itens_vetorizado
+        if vetorizado
+        else geracao.gerar_devolucoes_e_itens
+    )
+    with medir_etapa(etapas, "gerar_devolucoes_e_itens", monitor) as etapa:
+        df_devolucoes, df_itens_devolucao = funcao_geracao_devolucoes(
+            df_vendas,
+            df_itens_venda,
+            geracao.FRACAO_DEVOLUCAO,
+            geracao.HOJE_DEFINIDO,
+            geracao.INICIO_ANO_2025,
+        )
+        etapa["linhas"] = len(df_devolucoes) + len(df_itens_devolucao)
+
+    with medir_etapa(etapas, "atualizar_status_venda_pos_devolucao", monitor) as etapa:
+        df_vendas = geracao.atualizar_status_venda_pos_devolucao(
+            df_vendas, df_devolucoes, df_itens_venda, df_itens_devolucao
+        )
+        etapa["linhas"] = len(df_vendas)
+
+    with medir_etapa(etapas, "atualizar_clientes_com_metricas_venda", monitor) as etapa:
+        df_clientes = geracao.atualizar_clientes_com_metricas_venda(
+            df_clientes, df_vendas, df_itens_venda
+        )
+        etapa["linhas"] = len(df_vendas) + len(df_itens_venda)
+
+    tabelas_geradas = {
+        "clientes": (df_clientes, ["data_cadastro"]),
+        "produtos": (df_produtos, []),
+        "vendas": (df_vendas, ["data_venda"]),
+        "itens_venda": (df_itens_venda, []),
+        "devolucoes": (df_devolucoes, ["data_devolucao"]),
+        "itens_devolucao": (df_itens_devolucao, []),
+    }
+    linhas = {nome: len(df) for nome, (df, _) in tabelas_geradas.items()}
+    with medir_etapa(etapas, "exportar_csvs", monitor) as etapa:
+        caminhos = geracao.exportar_csvs(tabelas_geradas, diretorio)
+        etapa["linhas"] = sum(linhas.values())
+    del tabelas_geradas, df_clientes, df_vendas, df_itens_venda
+    del df_devolucoes, df_itens_devolucao
+
+    esquema = ler_esquema_sql()
+    destino = f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}"
+    tabelas = {
+        os.path.splitext(os.path.basename(caminho))[0]: caminho for caminho in caminhos
+    }
+    with medir_etapa(etapas, "ingestao", monitor) as etapa:
+        criar_esquema(destino, esquema)
+        relatorio_carga = carregar_tabelas(
+            tabelas, destino, esquema, valor_liquido=True
+        )
+        etapa["linhas"] = relatorio_carga["linhas"]
+
+    for identificador, sql in ler_consultas().items():
+        with medir_etapa(etapas, f"consulta.{identificador}", monitor) as etapa:
+            medicao = avaliar_consultas(destino, {identificador: sql}, repeticoes)
+            etapa["linhas"] = linhas["vendas"]
+        # O tempo da consulta é a mediana das repetições, sem o EXPLAIN e a conexão.
+        etapas[f"consulta.{identificador}"]["segundos"] = medicao[identificador][
+            "segundos"
+        ]
+        etapas[f"consulta.{identificador}"]["linhas_por_segundo"] = (
+            round(linhas["vendas"] / medicao[identificador]["segundos"], 1)
+            if medicao[identificador]["segundos"]
+            else None
+        )
+
+    return {"linhas": linhas, "etapas": etapas}
+
+
+def _commit_atual():
+    """Commit atual do repositório (None fora de um repositório git)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=DIRETORIO_RAIZ,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_benchmark(escalas=None, vetorizado=False, repeticoes=REPETICOES_PADRAO):
+    """
+    Executa o pipeline em cada escala, da menor para a maior.
+
+    Returns:
+        dict: Execução no formato do histórico (configuração, commit e, por escala,
+            linhas por tabela e métricas por etapa).
+    """
+    escalas = sorted(escalas or ESCALAS_PADRAO)
+    execucao = {
+        "data_execucao": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "configuracao": {
+            "escalas": escalas,
+            "n_clientes_base": geracao.N_CLIENTES_TARGET,
+            "n_vendas_base": geracao.N_VENDAS_A_GERAR,
+            "vetorizado": vetorizado,
+            "compacto": geracao.MODO_COMPACTO,
+            "repeticoes": repeticoes,
+        },
+        "escalas": {},
+    }
+    with MonitorMemoria() as monitor, tempfile.TemporaryDirectory() as diretorio:
+        for fator in escalas:
+            diretorio_escala = os.path.join(diretorio, f"escala_{fator}")
+            os.makedirs(diretorio_escala)
+            execucao["escalas"][str(fator)] = executar_escala(
+                fator, diretorio_escala, monitor, vetorizado, repeticoes
+            )
+    return execucao
+
+
+def crescimento_superlinear(execucao, expoente_maximo=EXPOENTE_MAXIMO_CRESCIMENTO):
+    """
+    Expoente de crescimento do tempo de cada etapa entre a menor e a maior escala
+    (tempo ~ escala ** expoente) e as etapas acima do expoente máximo.
+
+    Returns:
+        tuple: (etapa -> expoente, lista de (etapa, expoente) superlineares).
+    """
+    escalas = sorted(execucao["escalas"], key=int)
+    if len(escalas) < 2:
+        return {}, []
+    menor, maior = execucao["escalas"][escalas[0]], execucao["escalas"][escalas[-1]]
+    razao_escala = int(escalas[-1]) / int(escalas[0])
+    expoentes, superlineares = {}, []
+    for nome, etapa in maior["etapas"].items():
+        base = menor["etapas"].get(nome)
+        if not base or not base["segundos"] or not etapa["segundos"]:
+            continue
+        expoente = math.log(etapa["segundos"] / base["segundos"]) / math.log(
+            razao_escala
+        )
+        expoentes[nome] = round(expoente, 2)
+        if (
+            expoente > expoente_maximo
+            and etapa["segundos"] >= MINIMO_SEGUNDOS_COMPARACAO
+        ):
+            superlineares.append((nome, round(expoente, 2)))
+    return expoentes, superlineares
+
+
+def comparar_com_linha_base(execucao, linha_base):
+    """
+    Compara tempo e acréscimo de memória de cada etapa, em cada escala presente nas duas
+    execuções, com a linha de base.
+
+    Returns:
+        list: Regressões como dicts {"escala", "etapa", "metrica", "base", "atual"}.
+    """
+    regressoes = []
+    for escala, resultado in execucao["escalas"].items():
+        resultado_base = linha_base["escalas"].get(escala)
+        if resultado_base is None:
+            continue
+        for nome, etapa in resultado["etapas"].items():
+            base = resultado_base["etapas"].get(nome)
+            if base is None:
+                continue
+            if (
+                etapa["segundos"] > base["segundos"] * (1 + TOLERANCIA_TEMPO)
+                and etapa["segundos"] - base["segundos"] >= MINIMO_SEGUNDOS_COMPARACAO
+            ):
+                regressoes.append(
+                    {
+                        "escala": escala,
+                        "etapa": nome,
+                        "metrica": "segundos",
+                        "base": base["segundos"],
+                        "atual": etapa["segundos"],
+                    }
+                )
+            if (
+                etapa["acrescimo_memoria_mb"]
+                > base["acrescimo_memoria_mb"] * (1 + TOLERANCIA_MEMORIA)
+                and etapa["acrescimo_memoria_mb"] - base["acrescimo_memoria_mb"]
+                >= MINIMO_MB_COMPARACAO
+            ):
+                regressoes.append(
+                    {
+                        "escala": escala,
+                        "etapa": nome,
+                        "metrica": "acrescimo_memoria_mb",
+                        "base": base["acrescimo_memoria_mb"],
+                        "atual": etapa["acrescimo_memoria_mb"],
+                    }
+                )
+    return regressoes
+
+
+def ler_historico(caminho_historico=CAMINHO_HISTORICO):
+    """Lista de execuções gravadas no histórico (vazia se o arquivo não existir)."""
+    if not os.path.exists(caminho_historico):
+        return []
+    with open(caminho_historico, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_historico(historico, caminho_historico=CAMINHO_HISTORICO):
+    """Grava o histórico de forma atômica (arquivo temporário + os.replace)."""
+    diretorio = os.path.dirname(caminho_historico) or "."
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, caminho_temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+        json.dump(historico, arquivo, indent=2, ensure_ascii=False)
+    os.replace(caminho_temporario, caminho_historico)
+
+
+def linha_base_do_historico(historico, configuracao):
+    """Execução mais recente do histórico com a mesma configuração (ou None)."""
+    for execucao in reversed(historico):
+        if execucao["configuracao"] == configuracao:
+            return execucao
+    return None
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de geração, exportação, ingestão e consultas em várias escalas."
+    )
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO)
+    parser.add_argument(
+        "--vetorizado",
+        action="store_true",
+        help="Usa a geração vetorizada (MODO_VETORIZADO).",
+    )
+    parser.add_argument("--historico", default=CAMINHO_HISTORICO)
+    parser.add_argument(
+        "--linha-base",
+        help="Arquivo JSON com a execução de referência. Padrão: a última execução do "
+        "histórico com a mesma configuração.",
+    )
+    return parser.parse_args()
+
+
+# Fluxo Principal do Benchmark
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+
+    historico = ler_historico(argumentos.historico)
+    execucao = executar_benchmark(
+        escalas=argumentos.escalas,
+        vetorizado=argumentos.vetorizado,
+        repeticoes=argumentos.repeticoes,
+    )
+
+    if argumentos.linha_base:
+        with open(argumentos.linha_base, "r", encoding="utf-8") as arquivo:
+            linha_base = json.load(arquivo)
+    else:
+        linha_base = linha_base_do_historico(historico, execucao["configuracao"])
+
+    expoentes, superlineares = crescimento_superlinear(execucao)
+    regressoes = comparar_com_linha_base(execucao, linha_base) if linha_base else []
+    execucao["expoentes_crescimento"] = expoentes
+    execucao["linha_base"] = linha_base["data_execucao"] if linha_base else None
+    execucao["regressoes"] = regressoes
+    execucao["superlineares"] = [nome for nome, _ in superlineares]
+
+    historico.append(execucao)
+    gravar_historico(historico, argumentos.historico)
+    logging.info(
+        f"Execução gravada no histórico '{argumentos.historico}' ({len(historico)} execuções)."
+    )
+
+    if linha_base is None:
+        logging.info("Sem linha de base com a mesma configuração: nada a comparar.")
+    for regressao in regressoes:
+        logging.error(
+            f"Regressão (escala {regressao['escala']}) em {regressao['etapa']}: {regressao['metrica']} {regressao['base']} -> {regressao['atual']}."
+        )
+    for nome, expoente in superlineares:
+        logging.error(
+            f"Crescimento superlinear em {nome}: tempo ~ escala^{expoente} (máximo {EXPOENTE_MAXIMO_CRESCIMENTO})."
+        )
+    if regressoes or superlineares:
+        exit(1)
+    logging.info("Nenhuma regressão nem crescimento superlinear encontrado.")
+    exit()
@@ -0,0 +1,576 @@
+"""
+Insights de vendas em pandas, equivalentes às consultas da pasta sql/.
+
+Cada método de InsightsVendas reproduz uma consulta de sql/sales_performance.sql,
+sql/customer_behavior.sql ou sql/returns_analysis.sql (mesmas colunas, mesmas regras e
+mesma ordenação) com operações vetorizadas. Todos partem de um único DataFrame de valor
+líquido por venda, com a regra de vw_valor_liquido_vendas, calculado uma vez por conjunto
+de dados e reaproveitado pelos demais.
+
+O valor líquido é montado sem junções: as posições de cada devolução, item e venda são
+obtidas com pd.Index.get_indexer (chaves primárias únicas) e as somas por venda com
+np.bincount. Funciona com os dados do esquema padrão e do esquema compacto (chaves inteiras
+e domínios category).
+
+Uso:
+    python scripts/sales_insights.py --listar
+    python scripts/sales_insights.py --insight receita_liquida_por_canal
+    python scripts/sales_insights.py --verificar  # compara com as consultas SQL (DuckDB)
+
+    from sales_insights import carregar_insights
+
+    insights = carregar_insights()
+    df = insights.receita_liquida_por_mes()
+"""
+
+import argparse
+import logging
+import time
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from csv_reader import CAMINHO_ESQUEMA_SQL, ler_esquema_sql
+from dataset_cache import DIRETORIO_CACHE, carregar_dados
+
+# Configurações Globais e Constantes
+STATUS_VENDAS_VALIDAS = ["concluída", "devolvida parcialmente"]
+STATUS_VENDA_CANCELADA = "cancelada"
+STATUS_DEVOLUCOES_APROVADAS = ["aprovada", "finalizada"]
+N_TOP_CLIENTES = 10
+TOLERANCIA_VERIFICACAO = 0.01  # Diferença absoluta aceita (arredondamento dos decimais)
+
+# Método de InsightsVendas -> identificador da consulta equivalente (ver analytics_engine.py)
+CONSULTAS_EQUIVALENTES = {
+    "receita_liquida_por_mes": "receita_liquida_total_numero_de_vendas_validas_e_ticket_medio_liquido_por_mes_ano",
+    "receita_liquida_por_produto": "produtos_e_categorias_que_geram_mais_receita_liquida",
+    "receita_liquida_por_canal": "desempenho_de_venda_por_canal_de_venda",
+    "top_clientes_por_valor": "top_10_clientes_por_valor_gasto",
+    "top_clientes_por_compras": "top_10_clientes_por_compras_efetivadas",
+    "aov_por_cliente": "valor_medio_de_compra_por_cliente_aov",
+    "ticket_medio_geral": "ticket_medio_geral",
+    "receita_liquida_por_regiao": "distribuicao_de_clientes_por_regiao",
+    "receita_liquida_por_idade": "receita_por_faixa_etaria_e_regiao",
+    "ultima_compra_por_cliente": "ultima_compra_valida_por_cliente",
+    "frequencia_de_compras": "frequencia_de_compras_validas",
+    "total_liquido_por_cliente": "total_gasto_liquido_por_cliente",
+    "taxa_devolucao_por_produto": "taxa_de_devolucao_dos_produtos",
+}
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def _ordenar(df, colunas, decrescente):
+    """Ordenação estável (mergesort), para que empates fiquem na ordem da chave."""
+    return df.sort_values(colunas, ascending=decrescente, kind="mergesort").reset_index(
+        drop=True
+    )
+
+
+class InsightsVendas:
+    """
+    Insights de vendas sobre as seis tabelas carregadas em memória.
+
+    Args:
+        tabelas (dict): Nome da tabela -> DataFrame (ex.: carregar_dados() de
+            dataset_cache.py). Precisa de clientes, produtos, vendas, itens_venda,
+            devolucoes e itens_devolucao.
+    """
+
+    def __init__(self, tabelas):
+        self.tabelas = tabelas
+        self._indices = {}
+
+    def _posicoes(self, nome_tabela, coluna_chave, chaves_procuradas):
+        """
+        Posição de cada chave procurada na coluna de chave primária (-1 se ausente). O
+        índice de cada tabela é montado uma vez (a checagem de unicidade é a parte cara).
+        """
+        if nome_tabela not in self._indices:
+            self._indices[nome_tabela] = pd.Index(
+                self.tabelas[nome_tabela][coluna_chave]
+            )
+        return self._indices[nome_tabela].get_indexer(chaves_procuradas)
+
+    @cached_property
+    def _devolucoes_aprovadas(self):
+        """Posições em itens_venda e em vendas de cada item de devolução aprovado."""
+        devolucoes = self.tabelas["devolucoes"]
+        itens_devolucao = self.tabelas["itens_devolucao"]
+        aprovadas = (
+            devolucoes["status_devolucao"].isin(STATUS_DEVOLUCOES_APROVADAS).to_numpy()
+        )
+        pos_devolucao = self._posicoes(
+            "devolucoes", "id_devolucao", itens_devolucao["id_devolucao"]
+        )
+        encontrados = pos_devolucao >= 0
+        encontrados[encontrados] = aprovadas[pos_devolucao[encontrados]]
+        ids_itens = itens_devolucao["id_item_venda"].array[encontrados]
+        # itens_venda é a maior tabela: em vez de indexá-la inteira, isin seleciona as
+        # linhas devolvidas e só elas são indexadas.
+        linhas_devolvidas = np.flatnonzero(
+            self.tabelas["itens_venda"]["id_item_venda"].isin(ids_itens).to_numpy()
+        )
+        pos_item_venda = pd.Index(
+            self.tabelas["itens_venda"]["id_item_venda"].array.take(linhas_devolvidas)
+        ).get_indexer(ids_itens)
+        pos_venda = self._posicoes(
+            "vendas",
+            "id_venda",
+            devolucoes["id_venda"].array.take(pos_devolucao[encontrados]),
+        )
+        vinculados = (pos_item_venda >= 0) & (pos_venda >= 0)
+        return linhas_devolvidas[pos_item_venda[vinculados]], pos_venda[vinculados]
+
+    @cached_property
+    def itens_devolvidos(self):
+        """
+        Máscara sobre itens_venda dos itens com devolução aprovada ou finalizada
+        (vw_itens_devolvidos).
+
+        Returns:
+            np.ndarray: Array booleano com uma posição por linha de itens_venda.
+        """
+        mascara = np.zeros(len(self.tabelas["itens_venda"]), dtype=bool)
+        mascara[self._devolucoes_aprovadas[0]] = True
+        return mascara
+
+    @cached_property
+    def valor_liquido_vendas(self):
+        """
+        Valor líquido de cada venda, com as colunas e a regra de vw_valor_liquido_vendas:
+        o valor devolvido soma o preço de cada unidade devolvida (aprovada ou finalizada)
+        e vendas canceladas têm valor líquido zero. Calculado na primeira chamada.
+
+        Returns:
+            pd.DataFrame: Uma linha por venda.
+        """
+        inicio = time.perf_counter()
+        vendas = self.tabelas["vendas"]
+        pos_item_venda, pos_venda = self._devolucoes_aprovadas
+        precos = self.tabelas["itens_venda"]["preco_unitario"].to_numpy()
+        total_devolvido = np.bincount(
+            pos_venda, weights=precos[pos_item_venda], minlength=len(vendas)
+        )
+        total_bruto = vendas["total_venda"].to_numpy(dtype="float64")
+        canceladas = (vendas["status_venda"] == STATUS_VENDA_CANCELADA).to_numpy()
+
+        df_valor_liquido = pd.DataFrame(
+            {
+                "id_venda": vendas["id_venda"].array,
+                "id_cliente": vendas["id_cliente"].array,
+                "data_venda": vendas["data_venda"].array,
+                "canal_venda": vendas["canal_venda"].array,
+                "status_venda": vendas["status_venda"].array,
+                "total_venda_bruta": total_bruto,
+                "total_devolvido_venda": total_devolvido,
+                "total_venda_liquida": np.where(
+                    canceladas, 0.0, total_bruto - total_devolvido
+                ),
+            }
+        )
+        logging.info(
+            f"Valor líquido de {len(df_valor_liquido)} vendas calculado em {time.perf_counter() - inicio:.3f}s."
+        )
+        return df_valor_liquido
+
+    @cached_property
+    def _vendas_validas(self):
+        """Máscara das vendas concluídas ou devolvidas parcialmente."""
+        return (
+            self.valor_liquido_vendas["status_venda"]
+            .isin(STATUS_VENDAS_VALIDAS)
+            .to_numpy()
+        )
+
+    @cached_property
+    def _codigos_clientes(self):
+        """Código inteiro do cliente de cada venda e os id_cliente de cada código."""
+        return pd.factorize(self.valor_liquido_vendas["id_cliente"], sort=True)
+
+    def _por_cliente(self, coluna, agregacao, nome_resultado, somente_validas=False):
+        """
+        Agrega uma coluna do valor líquido por cliente. O agrupamento usa os códigos
+        inteiros, calculados uma vez, em vez de refatorar as chaves a cada insight.
+        """
+        codigos, ids_clientes = self._codigos_clientes
+        valores = self.valor_liquido_vendas[coluna]
+        if somente_validas:
+            codigos = codigos[self._vendas_validas]
+            valores = valores[self._vendas_validas]
+        agregado = valores.groupby(codigos, sort=True).agg(agregacao)
+        return pd.DataFrame(
+            {
+                "id_cliente": ids_clientes.take(agregado.index.to_numpy()),
+                nome_resultado: agregado.to_numpy(),
+            }
+        )
+
+    def _com_clientes(self, df_por_cliente, colunas_clientes):
+        """Mantém os clientes cadastrados e acrescenta colunas de clientes (JOIN clientes)."""
+        clientes = self.tabelas["clientes"]
+        pos_cliente = self._posicoes(
+            "clientes", "id_cliente", df_por_cliente["id_cliente"]
+        )
+        cadastrados = pos_cliente >= 0
+        return df_por_cliente[cadastrados].assign(
+            **{
+                coluna: clientes[coluna].array.take(pos_cliente[cadastrados])
+                for coluna in colunas_clientes
+            }
+        )
+
+    @cached_property
+    def _itens_com_venda(self):
+        """Itens de venda com o status da venda e a marcação de item devolvido."""
+        itens_venda = self.tabelas["itens_venda"]
+        pos_venda = self._posicoes("vendas", "id_venda", itens_venda["id_venda"])
+        vinculados = pos_venda >= 0
+        return itens_venda.loc[vinculados, ["id_produto", "preco_unitario"]].assign(
+            status_venda=self.tabelas["vendas"]["status_venda"].array.take(
+                pos_venda[vinculados]
+            ),
+            devolvido=self.itens_devolvidos[vinculados],
+        )
+
+    def _com_produtos(self, df_por_produto):
+        """Acrescenta nome e categoria aos agregados por id_produto (JOIN produtos)."""
+        produtos = self.tabelas["produtos"]
+        return df_por_produto.merge(
+            produtos[["id_produto", "nome_produto", "categoria"]],
+            on="id_produto",
+            how="inner",
+        )
+
+    def receita_liquida_por_mes(self):
+        """Receita líquida, vendas válidas e ticket médio líquido por ano/mês."""
+        df = self.valor_liquido_vendas
+        datas = df["data_venda"].dt
+        return (
+            df.assign(
+                ano=datas.year,
+                mes=datas.month,
+                venda_valida=self._vendas_validas,
+            )
+            .groupby(["ano", "mes"], sort=True)
+            .agg(
+                receita_liquida_total=("total_venda_liquida", "sum"),
+                num_vendas_validas=("venda_valida", "sum"),
+                ticket_medio_liquido=("total_venda_liquida", "mean"),
+            )
+            .reset_index()
+        )
+
+    def receita_liquida_por_produto(self):
+        """Receita líquida por produto: itens não devolvidos de vendas não canceladas."""
+        itens = self._itens_com_venda
+        receita = np.where(
+            (itens["status_venda"] == STATUS_VENDA_CANCELADA) | itens["devolvido"],
+            0.0,
+            itens["preco_unitario"],
+        )
+        df = (
+            itens.assign(receita_liquida_produtos=receita)
+            .groupby("id_produto", sort=True, observed=True)["receita_liquida_produtos"]
+            .sum()
+            .reset_index()
+        )
+        df = self._com_produtos(df)[
+            ["id_produto", "nome_produto", "categoria", "receita_liquida_produtos"]
+        ]
+        return _ordenar(df, ["receita_liquida_produtos"], False)
+
+    def receita_liquida_por_canal(self):
+        """Receita líquida, vendas válidas e ticket médio das vendas válidas por canal."""
+        df = self.valor_liquido_vendas
+        return (
+            df.assign(
+                venda_valida=self._vendas_validas,
+                valor_valido=df["total_venda_liquida"].where(self._vendas_validas),
+            )
+            .groupby("canal_venda", sort=True, observed=True)
+            .agg(
+                receita_liquida_canal=("total_venda_liquida", "sum"),
+                num_vendas_canal=("venda_valida", "sum"),
+                ticket_medio_canal=("valor_valido", "mean"),
+            )
+            .reset_index()
+        )
+
+    def top_clientes_por_valor(self, n=N_TOP_CLIENTES):
+        """Clientes com maior valor líquido gasto."""
+        df = self._com_clientes(
+            self._por_cliente(
+                "total_venda_liquida", "sum", "total_liquido_gasto_cliente"
+            ),
+            ["nome_cliente"],
+        )
+        df = df[["id_cliente", "nome_cliente", "total_liquido_gasto_cliente"]]
+        return _ordenar(df, ["total_liquido_gasto_cliente"], False).head(n)
+
+    def top_clientes_por_compras(self, n=N_TOP_CLIENTES):
+        """Clientes com mais compras válidas (empates pelo id_cliente)."""
+        df = self._com_clientes(
+            self._por_cliente(
+                "id_venda", "count", "num_compras_validas_cliente", somente_validas=True
+            ),
+            ["nome_cliente"],
+        )
+        df = df[["id_cliente", "nome_cliente", "num_compras_validas_cliente"]]
+        return _ordenar(
+            df, ["num_compras_validas_cliente", "id_cliente"], [False, True]
+        ).head(n)
+
+    def aov_por_cliente(self):
+        """Valor médio líquido das compras válidas de cada cliente (AOV)."""
+        return self._por_cliente(
+            "total_venda_liquida", "mean", "aov_liquido_cliente", somente_validas=True
+        )
+
+    def ticket_medio_geral(self):
+        """Ticket médio líquido das vendas válidas."""
+        valores = self.valor_liquido_vendas.loc[
+            self._vendas_validas, "total_venda_liquida"
+        ]
+        return pd.DataFrame({"ticket_medio_geral": [valores.mean()]})
+
+    def receita_liquida_por_regiao(self):
+        """Receita líquida por região dos clientes."""
+        df = (
+            self._com_clientes(self.total_liquido_por_cliente(), ["regiao"])
+            .groupby("regiao", sort=True, observed=True)["total_liquido_gasto"]
+            .sum()
+            .rename("receita_liquida_total")
+            .reset_index()
+        )
+        return _ordenar(df, ["receita_liquida_total"], False)
+
+    def receita_liquida_por_idade(self):
+        """Receita líquida por idade dos clientes."""
+        df = (
+            self._com_clientes(self.total_liquido_por_cliente(), ["idade"])
+            .groupby("idade", sort=True)["total_liquido_gasto"]
+            .sum()
+            .rename("receita_por_idade")
+            .reset_index()
+        )
+        return _ordenar(df, ["receita_por_idade"], False)
+
+    def ultima_compra_por_cliente(self):
+        """Data da última compra válida de cada cliente."""
+        df = self._por_cliente(
+            "data_venda", "max", "data_ultima_compra_valida", somente_validas=True
+        )
+        return _ordenar(df, ["data_ultima_compra_valida"], False)
+
+    def frequencia_de_compras(self):
+        """Número de compras válidas de cada cliente."""
+        return self._por_cliente(
+            "id_venda", "count", "num_compras_validas", somente_validas=True
+        )
+
+    def total_liquido_por_cliente(self):
+        """Valor líquido total gasto por cliente (todas as vendas)."""
+        return self._por_cliente("total_venda_liquida", "sum", "total_liquido_gasto")
+
+    def taxa_devolucao_por_produto(self):
+        """
+        Unidades devolvidas (aprovadas ou finalizadas), unidades vendidas líquidas e taxa
+        de devolução (%) por produto, nas vendas válidas.
+        """
+        itens = self._itens_com_venda
+        itens = itens[itens["status_venda"].isin(STATUS_VENDAS_VALIDAS)]
+        df = (
+            itens.assign(nao_devolvido=~itens["devolvido"])
+            .groupby("id_produto", sort=True, observed=True)
+            .agg(
+                unidades_devolvidas_aprovadas=("devolvido", "sum"),
+                unidades_vendidas_liquidas=("nao_devolvido", "sum"),
+            )
+            .reset_index()
+        )
+        total_unidades = (
+            df["unidades_devolvidas_aprovadas"] + df["unidades_vendidas_liquidas"]
+        )
+        df["taxa_devolucao"] = (
+            df["unidades_devolvidas_aprovadas"]
+            / total_unidades.where(total_unidades > 0)
+            * 100
+        ).fillna(0.0)
+        df = self._com_produtos(df)[
+            [
+                "nome_produto",
+                "categoria",
+                "unidades_devolvidas_aprovadas",
+                "unidades_vendidas_liquidas",
+                "taxa_devolucao",
+            ]
+        ]
+        return _ordenar(df, ["taxa_devolucao"], False)
+
+    def executar_todos(self):
+        """Executa todos os insights. Retorna nome do método -> DataFrame."""
+        return {nome: getattr(self, nome)() for nome in CONSULTAS_EQUIVALENTES}
+
+
+def carregar_insights(
+    fonte="csv",
+    tabelas=None,
+    diretorio_parquet=None,
+    diretorio_cache=DIRETORIO_CACHE,
+    caminho_esquema=CAMINHO_ESQUEMA_SQL,
+):
+    """
+    Lê as seis tabelas e cria o InsightsVendas correspondente.
+
+    Args:
+        fonte (str): "csv" (cache Arrow de dataset_cache.py) ou "parquet" (dataset de
+            columnar_output.py).
+        tabelas (dict, optional): Nome da tabela -> caminho do CSV, na fonte "csv".
+            Padrão: config/ingestion.json.
+        diretorio_parquet (str, optional): Pasta do dataset Parquet, na fonte "parquet".
+            Padrão: o de analytics_engine.py.
+        diretorio_cache (str): Pasta do cache Arrow, na fonte "csv".
+        caminho_esquema (str): DDL das tabelas (ex.: sql/create_schema_compact.sql).
+
+    Returns:
+        InsightsVendas: Insights sobre as tabelas lidas.
+    """
+    esquema = ler_esquema_sql(caminho_esquema)
+    if fonte == "csv":
+        dados = carregar_dados(
+            tabelas=tabelas, esquema=esquema, diretorio_cache=diretorio_cache
+        )
+    elif fonte == "parquet":
+        from analytics_engine import DIRETORIO_PARQUET
+        from columnar_output import ler_tabela_parquet
+
+        dados = {
+            nome: ler_tabela_parquet(diretorio_parquet or DIRETORIO_PARQUET, nome)
+            for nome in esquema
+        }
+    else:
+        raise ValueError(f"Fonte '{fonte}' não suportada. Use 'csv' ou 'parquet'.")
+    return InsightsVendas(dados)
+
+
+def _normalizar_resultado(df):
+    """Prepara um resultado para comparação: textos, datas e ordem das linhas."""
+    df = df.copy()
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype("datetime64[s]")
+        elif not pd.api.types.is_numeric_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype(str)
+    return df.sort_values(list(df.columns), kind="mergesort").reset_index(drop=True)
+
+
+def verificar_com_sql(insights, motor):
+    """
+    Compara cada insight com a consulta SQL equivalente executada no motor analítico.
+    As linhas são comparadas sem considerar a ordem (consultas sem ORDER BY, empates) e os
+    valores numéricos com tolerância de TOLERANCIA_VERIFICACAO.
+
+    Args:
+        insights (InsightsVendas): Insights sobre os dados.
+        motor (analytics_engine.MotorAnalitico): Motor com os mesmos dados.
+
+    Returns:
+        dict: Nome do método -> {"consulta", "linhas", "segundos_pandas",
+            "segundos_sql", "divergencia"} (divergencia None quando os resultados batem).
+    """
+    resultados = {}
+    for metodo, consulta in CONSULTAS_EQUIVALENTES.items():
+        inicio = time.perf_counter()
+        df_pandas = getattr(insights, metodo)()
+        segundos_pandas = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        df_sql = motor.executar(consulta)
+        segundos_sql = time.perf_counter() - inicio
+
+        divergencia = None
+        try:
+            pd.testing.assert_frame_equal(
+                _normalizar_resultado(df_pandas),
+                _normalizar_resultado(df_sql),
+                check_dtype=False,
+                check_exact=False,
+                rtol=0,
+                atol=TOLERANCIA_VERIFICACAO,
+            )
+        except AssertionError as e:
+            divergencia = str(e).strip().splitlines()[0]
+        resultados[metodo] = {
+            "consulta": consulta,
+            "linhas": len(df_pandas),
+            "segundos_pandas": round(segundos_pandas, 4),
+            "segundos_sql": round(segundos_sql, 4),
+            "divergencia": divergencia,
+        }
+    return resultados
+
+
+def _ler_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Insights de vendas em pandas, equivalentes às consultas de sql/."
+    )
+    parser.add_argument("--fonte", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--esquema", default=CAMINHO_ESQUEMA_SQL)
+    parser.add_argument(
+        "--insight",
+        action="append",
+        choices=list(CONSULTAS_EQUIVALENTES),
+        help="Insight a calcular. Padrão: todos.",
+    )
+    parser.add_argument(
+        "--listar", action="store_true", help="Lista os insights disponíveis."
+    )
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="Compara cada insight com a consulta SQL equivalente (DuckDB).",
+    )
+    return parser.parse_args()
+
+
+# Fluxo Principal dos Insights
+if __name__ == "__main__":
+    argumentos = _ler_argumentos()
+
+    if argumentos.listar:
+        for metodo, consulta in CONSULTAS_EQUIVALENTES.items():
+            print(f"{metodo}  [{consulta}]")
+        exit()
+
+    insights = carregar_insights(
+        fonte=argumentos.fonte, caminho_esquema=argumentos.esquema
+    )
+
+    if argumentos.verificar:
+        from analytics_engine import MotorAnalitico
+
+        with MotorAnalitico(
+            fonte=argumentos.fonte, caminho_esquema=argumentos.esquema
+        ) as motor:
+            resultados = verificar_com_sql(insights, motor)
+        for metodo, resultado in resultados.items():
+            situacao = resultado["divergencia"] or "ok"
+            logging.info(
+                f"{metodo}: {resultado['linhas']} linhas, pandas {resultado['segundos_pandas']:.4f}s, SQL {resultado['segundos_sql']:.4f}s - {situacao}"
+            )
+        divergentes = [m for m, r in resultados.items() if r["divergencia"]]
+        if divergentes:
+            logging.error(f"Insights divergentes da SQL: {', '.join(divergentes)}.")
+            exit(1)
+        logging.info(f"Todos os {len(resultados)} insights conferem com a SQL.")
+        exit()
+
+    for metodo in argumentos.insight or list(CONSULTAS_EQUIVALENTES):
+        inicio = time.perf_counter()
+        resultado = getattr(insights, metodo)()
+        logging.info(
+            f"Insight {metodo}: {len(resultado)} linhas em {time.perf_counter() - inicio:.3f}s."
+        )
+        print(resultado.head(20).to_string(index=False), end="\n\n")
+    exit()
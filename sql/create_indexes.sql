@@ -0,0 +1,46 @@
+-- Clientes por região e por idade (cobre os agrupamentos por região e faixa etária)
+CREATE INDEX idx_clientes_regiao ON clientes (regiao, id_cliente);
+
+CREATE INDEX idx_clientes_idade ON clientes (idade, id_cliente);
+
+-- Catálogo de produtos (cobre as colunas agrupadas nas consultas por produto)
+CREATE INDEX idx_produtos_nome_categoria ON produtos (id_produto, nome_produto, categoria);
+
+-- Vendas por período e por status (filtros de data das consultas de desempenho)
+CREATE INDEX idx_vendas_data_venda ON vendas (data_venda);
+
+CREATE INDEX idx_vendas_status_data ON vendas (status_venda, data_venda);
+
+-- Vendas por cliente: chave estrangeira vendas -> clientes e cobertura de última compra,
+-- frequência e top 10 por compras (agrupadas por cliente, filtradas por status)
+CREATE INDEX idx_vendas_cliente_status ON vendas (id_cliente, status_venda, data_venda, id_venda);
+
+-- Itens por produto (cobre a receita líquida por produto)
+CREATE INDEX idx_itens_venda_produto ON itens_venda (id_produto, id_venda, preco_unitario, id_item_venda);
+
+-- Chave estrangeira itens_venda -> vendas
+CREATE INDEX idx_itens_venda_venda ON itens_venda (id_venda);
+
+-- Devoluções aprovadas/finalizadas (cobre o filtro e as junções das views)
+CREATE INDEX idx_devolucoes_status ON devolucoes (status_devolucao, id_devolucao, id_venda);
+
+-- Chave estrangeira devolucoes -> vendas (recálculo de valor_liquido_vendas)
+CREATE INDEX idx_devolucoes_venda ON devolucoes (id_venda);
+
+-- Itens devolvidos por devolução (cobre a junção com itens_venda)
+CREATE INDEX idx_itens_devolucao_devolucao ON itens_devolucao (id_devolucao, id_item_venda);
+
+-- Valor líquido por cliente (cobre os rankings e totais por cliente)
+CREATE INDEX idx_valor_liquido_cliente ON valor_liquido_vendas (id_cliente, status_venda, total_venda_liquida);
+
+-- Valor líquido por status (cobre ticket médio e AOV das vendas válidas)
+CREATE INDEX idx_valor_liquido_status ON valor_liquido_vendas (status_venda, id_cliente, total_venda_liquida);
+
+-- Valor líquido por período (cobre a receita mensal)
+CREATE INDEX idx_valor_liquido_data ON valor_liquido_vendas (data_venda, status_venda, total_venda_liquida, id_venda);
+
+-- Valor líquido por canal (cobre o desempenho por canal, já na ordem do agrupamento)
+CREATE INDEX idx_valor_liquido_canal ON valor_liquido_vendas (canal_venda, status_venda, total_venda_liquida, id_venda);
+
+-- Fila de recálculo de valor_liquido_vendas
+CREATE INDEX idx_valor_liquido_pendentes ON valor_liquido_vendas_pendentes (id_venda);
@@ -0,0 +1,65 @@
+CREATE TABLE `clientes` (
+  `id_cliente` bigint PRIMARY KEY,
+  `nome_cliente` varchar(50),
+  `email` varchar(50),
+  `idade` integer,
+  `regiao` enum('Norte','Nordeste','Sudeste','Sul','Centro-Oeste'),
+  `data_cadastro` date,
+  `numero_compras` integer,
+  `total_gasto` decimal(10,2)
+);
+
+CREATE TABLE `produtos` (
+  `id_produto` bigint PRIMARY KEY,
+  `nome_produto` varchar(100),
+  `categoria` enum('Telescópio','Binóculo','Mapas Celestes','Livros de Astronomia','Kits de Observação'),
+  `preco` decimal(10,2)
+);
+
+CREATE TABLE `devolucoes` (
+  `id_devolucao` bigint PRIMARY KEY,
+  `id_venda` bigint,
+  `motivo_geral_devolucao` enum('Produto com defeito','Arrependimento da compra','Tamanho/cor inadequado','Produto diferente do anunciado','Entrega atrasada e não mais necessário'),
+  `data_devolucao` date,
+  `status_devolucao` enum('em processamento','aprovada','rejeitada','finalizada')
+);
+
+CREATE TABLE `vendas` (
+  `id_venda` bigint PRIMARY KEY,
+  `id_cliente` bigint,
+  `data_venda` date,
+  `canal_venda` enum('site','marketplace','app'),
+  `status_venda` enum('concluída','cancelada','devolvida parcialmente','devolvida totalmente'),
+  `total_venda` decimal(10,2)
+);
+
+CREATE TABLE `itens_venda` (
+  `id_item_venda` bigint PRIMARY KEY,
+  `id_venda` bigint,
+  `id_produto` bigint,
+  `quantidade` integer,
+  `preco_unitario` decimal(8,2)
+);
+
+CREATE TABLE `itens_devolucao` (
+  `id_item_devolucao` bigint PRIMARY KEY,
+  `id_devolucao` bigint,
+  `id_item_venda` bigint,
+  `id_produto` bigint,
+  `quantidade_devolvida` integer,
+  `motivo_especifico_item` enum('Cor diferente','Danificado','Tamanho diferente','Não gostei','Produto com defeito','Arrependimento da compra','Tamanho/cor inadequado','Produto diferente do anunciado','Entrega atrasada e não mais necessário')
+);
+
+ALTER TABLE `devolucoes` ADD FOREIGN KEY (`id_venda`) REFERENCES `vendas` (`id_venda`);
+
+ALTER TABLE `vendas` ADD FOREIGN KEY (`id_cliente`) REFERENCES `clientes` (`id_cliente`);
+
+ALTER TABLE `itens_venda` ADD FOREIGN KEY (`id_venda`) REFERENCES `vendas` (`id_venda`);
+
+ALTER TABLE `itens_venda` ADD FOREIGN KEY (`id_produto`) REFERENCES `produtos` (`id_produto`);
+
+ALTER TABLE `itens_devolucao` ADD FOREIGN KEY (`id_devolucao`) REFERENCES `devolucoes` (`id_devolucao`);
+
+ALTER TABLE `itens_devolucao` ADD FOREIGN KEY (`id_item_venda`) REFERENCES `itens_venda` (`id_item_venda`);
+
+ALTER TABLE `itens_devolucao` ADD FOREIGN KEY (`id_produto`) REFERENCES `produtos` (`id_produto`);
@@ -3,7 +3,7 @@ SELECT
         vlv.id_cliente,
         c.nome_cliente,
         SUM(vlv.total_venda_liquida) AS total_liquido_gasto_cliente
-FROM vw_valor_liquido_vendas vlv
+FROM valor_liquido_vendas vlv
 JOIN clientes c ON vlv.id_cliente = c.id_cliente
 GROUP BY vlv.id_cliente, c.nome_cliente
 ORDER BY total_liquido_gasto_cliente DESC
@@ -16,30 +16,30 @@ SELECT
         COUNT(DISTINCT v.id_venda) AS num_compras_validas_cliente
 FROM vendas v
 JOIN clientes c ON v.id_cliente = c.id_cliente
-WHERE v.status_venda IN ('concluida', 'devolvida parcialmente')
-GROUP BY id_cliente, c.nome_cliente
-ORDER BY num_compras_validas_cliente DESC
+WHERE v.status_venda IN ('concluída', 'devolvida parcialmente')
+GROUP BY v.id_cliente, c.nome_cliente
+ORDER BY num_compras_validas_cliente DESC, v.id_cliente
 LIMIT 10;
 
 -- Valor médio de compra por cliente (AOV)
 SELECT
         vlv.id_cliente,
         AVG(vlv.total_venda_liquida) AS aov_liquido_cliente
-FROM vw_valor_liquido_vendas
-WHERE status_venda IN ('concluída', 'devolvida parcialmente')
-GROUP BY id_cliente;
+FROM valor_liquido_vendas vlv
+WHERE vlv.status_venda IN ('concluída', 'devolvida parcialmente')
+GROUP BY vlv.id_cliente;
 
 -- Ticket médio geral
 SELECT
         AVG(total_venda_liquida) AS ticket_medio_geral
-FROM vw_valor_liquido_vendas
+FROM valor_liquido_vendas
 WHERE status_venda IN ('concluída', 'devolvida parcialmente');
 
 -- Distribuição de clientes por região
 SELECT
         c.regiao,
         SUM(vlv.total_venda_liquida) AS receita_liquida_total
-FROM vw_valor_liquido_vendas vlv
+FROM valor_liquido_vendas vlv
 JOIN clientes c ON vlv.id_cliente = c.id_cliente
 GROUP BY c.regiao
 ORDER BY receita_liquida_total DESC;
@@ -48,7 +48,7 @@ ORDER BY receita_liquida_total DESC;
 SELECT
         c.idade,
         SUM(vlv.total_venda_liquida) as receita_por_idade
-FROM vw_valor_liquido_vendas vlv
+FROM valor_liquido_vendas vlv
 JOIN clientes c ON vlv.id_cliente = c.id_cliente
 GROUP BY c.idade
 ORDER BY receita_por_idade DESC;
@@ -73,5 +73,5 @@ GROUP BY id_cliente;
 SELECT
         id_cliente,
         SUM(total_venda_liquida) AS total_liquido_gasto
-FROM vw_valor_liquido_vendas
+FROM valor_liquido_vendas
 GROUP BY id_cliente;
\ No newline at end of file
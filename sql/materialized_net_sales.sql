@@ -0,0 +1,66 @@
+-- Valor líquido das vendas materializado (mesmas colunas de vw_valor_liquido_vendas)
+CREATE TABLE IF NOT EXISTS valor_liquido_vendas (
+        id_venda char(36) PRIMARY KEY,
+        id_cliente char(36),
+        data_venda date,
+        canal_venda varchar(20),
+        status_venda varchar(30),
+        total_venda_bruta decimal(10,2),
+        total_devolvido_venda decimal(10,2),
+        total_venda_liquida decimal(10,2)
+);
+
+-- Vendas pendentes de recálculo (preenchida pela ingestão e pelas cargas incrementais)
+CREATE TABLE IF NOT EXISTS valor_liquido_vendas_pendentes (
+        id_venda char(36)
+);
+
+-- Vendas ainda não materializadas
+INSERT INTO valor_liquido_vendas_pendentes (id_venda)
+SELECT v.id_venda
+FROM vendas v
+WHERE v.id_venda NOT IN (SELECT vlv.id_venda FROM valor_liquido_vendas vlv);
+
+-- Remoção das vendas pendentes
+DELETE FROM valor_liquido_vendas
+WHERE id_venda IN (SELECT p.id_venda FROM valor_liquido_vendas_pendentes p);
+
+-- Recálculo das vendas pendentes (mesma regra de vw_valor_liquido_vendas)
+INSERT INTO valor_liquido_vendas (
+        id_venda,
+        id_cliente,
+        data_venda,
+        canal_venda,
+        status_venda,
+        total_venda_bruta,
+        total_devolvido_venda,
+        total_venda_liquida
+)
+SELECT
+        v.id_venda,
+        v.id_cliente,
+        v.data_venda,
+        v.canal_venda,
+        v.status_venda,
+        v.total_venda AS total_venda_bruta,
+        COALESCE(vida.total_valor_devolvido_aprovado, 0) AS total_devolvido_venda,
+        CASE
+            WHEN v.status_venda = 'cancelada' THEN 0
+            ELSE (v.total_venda - COALESCE(vida.total_valor_devolvido_aprovado, 0))
+        END AS total_venda_liquida
+FROM
+        vendas v
+            LEFT JOIN
+        (SELECT
+                d.id_venda,
+                SUM(iv.preco_unitario) AS total_valor_devolvido_aprovado
+        FROM devolucoes d
+        JOIN itens_devolucao idv ON d.id_devolucao = idv.id_devolucao
+        JOIN itens_venda iv ON idv.id_item_venda = iv.id_item_venda
+        WHERE d.status_devolucao IN ('aprovada', 'finalizada')
+                AND d.id_venda IN (SELECT p.id_venda FROM valor_liquido_vendas_pendentes p)
+        GROUP BY d.id_venda) vida ON v.id_venda = vida.id_venda
+WHERE v.id_venda IN (SELECT p.id_venda FROM valor_liquido_vendas_pendentes p);
+
+-- Limpeza da fila de vendas pendentes
+DELETE FROM valor_liquido_vendas_pendentes;
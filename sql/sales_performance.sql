@@ -9,7 +9,7 @@ SELECT
         END) AS num_vendas_validas,
     AVG(total_venda_liquida) AS ticket_medio_liquido
 FROM
-    vw_valor_liquido_vendas
+    valor_liquido_vendas
 GROUP BY ano, mes;
 
 -- Produtos e categorias que geram mais receita líquida
@@ -46,5 +46,5 @@ SELECT
         ELSE NULL
     END) AS ticket_medio_canal
 FROM
-    vw_valor_liquido_vendas
+    valor_liquido_vendas
 GROUP BY canal_venda;
\ No newline at end of file